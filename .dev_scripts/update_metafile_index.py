@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+# Copyright (c) OpenMMLab. All rights reserved.
+"""This tool is used to update mmagic/apis/metafile_index.json, which is
+loaded by :class:`mmagic.apis.MMagicInferencer` instead of parsing every
+metafile.yml in configs/. It will be automatically called as a pre-commit
+hook once any metafile is changed.
+
+For each algorithm folder in configs/, the index saves the task of the first
+model and the `Name`, `Config` and `Weights` of all models.
+"""
+
+import glob
+import json
+import os.path as osp
+import sys
+
+import yaml
+
+MMagic_ROOT = osp.dirname(osp.dirname(osp.abspath(__file__)))
+INDEX_FILE = osp.join(MMagic_ROOT, 'mmagic', 'apis', 'metafile_index.json')
+SETTING_KEYS = ('Name', 'Config', 'Weights')
+
+
+def parse_metafile(metafile):
+    """Parse the task and settings of models in a metafile.
+
+    Args:
+        metafile (str): Path of the metafile.
+
+    Returns:
+        dict: The task and the settings of the models.
+    """
+    with open(metafile, 'r') as stream:
+        parsed_yaml = yaml.safe_load(stream)
+    models = parsed_yaml['Models']
+    return dict(
+        task=models[0]['Results'][0]['Task'],
+        settings=[{k: model[k]
+                   for k in SETTING_KEYS if k in model} for model in models])
+
+
+def update_metafile_index():
+    """Update the metafile index according to metafile.yml in configs/.
+
+    Returns:
+        Bool: If the updated index is different from the original.
+    """
+    metafiles = glob.glob(
+        osp.join(MMagic_ROOT, 'configs', '*', 'metafile.yml'))
+    index = dict()
+    for metafile in sorted(metafiles):
+        index[osp.basename(osp.dirname(metafile))] = parse_metafile(metafile)
+    content = json.dumps(index, indent=1, sort_keys=True) + '\n'
+
+    if osp.exists(INDEX_FILE):
+        with open(INDEX_FILE, 'r', encoding='utf-8') as f:
+            if f.read() == content:
+                return False
+    with open(INDEX_FILE, 'w', encoding='utf-8') as f:
+        f.write(content)
+    return True
+
+
+if __name__ == '__main__':
+    sys.exit(1 if update_metafile_index() else 0)
@@ -1,5 +1,6 @@
 # Copyright (c) OpenMMLab. All rights reserved.
+from .batch_server import BatchInferenceServer
 from .inferencers.inference_functions import init_model
 from .mmagic_inferencer import MMagicInferencer
 
-__all__ = ['MMagicInferencer', 'init_model']
+__all__ = ['MMagicInferencer', 'BatchInferenceServer', 'init_model']
@@ -0,0 +1,254 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import asyncio
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Dict, Hashable, List, Optional, Union
+
+import torch
+
+from .inferencers import Inferencers
+from .inferencers.base_mmagic_inferencer import BaseMMagicInferencer
+from .mmagic_inferencer import MMagicInferencer
+
+
+class _Request:
+    """A preprocessed request waiting to be batched."""
+
+    def __init__(self, key: Hashable, data: dict, params: List[Dict],
+                 future: asyncio.Future, arrival: float) -> None:
+        self.key = key
+        self.data = data
+        self.params = params
+        self.future = future
+        self.arrival = arrival
+
+    def __len__(self) -> int:
+        return len(self.data['inputs'])
+
+
+class BatchInferenceServer:
+    """Asyncio serving facade which batches concurrent requests of an
+    inferencer.
+
+    Each request is preprocessed in a thread pool, and put into the bucket of
+    its input shape. A bucket is sent to the model as one batch once it has
+    ``max_batch_size`` samples, or once its oldest request has waited for
+    ``max_wait_time`` seconds. Batches are forwarded one by one in a worker
+    thread, and visualized and postprocessed per request in the thread pool.
+
+    The inferencer must return a dict with lists of ``inputs`` and
+    ``data_samples`` in :meth:`preprocess`, and a list of predictions in
+    :meth:`forward`, e.g.,
+    :class:`~mmagic.apis.inferencers.ImageSuperResolutionInferencer`.
+
+    ``extra_parameters`` (e.g. ``tile_size``) are states of the inferencer
+    shared by all requests, so they should be set when the inferencer is
+    built, and requests with ``extra_parameters`` are rejected.
+
+    Args:
+        inferencer (MMagicInferencer | Inferencers | BaseMMagicInferencer):
+            The inferencer to serve.
+        max_batch_size (int): Maximum number of samples in a batch.
+            Defaults to 8.
+        max_wait_time (float): Maximum seconds a request waits for others
+            to be batched with. Defaults to 0.01.
+        num_workers (int): Number of threads to preprocess and postprocess
+            requests. Defaults to 4.
+
+    Examples:
+        >>> inferencer = MMagicInferencer('esrgan')
+        >>> async def main(imgs):
+        >>>     async with BatchInferenceServer(inferencer) as server:
+        >>>         return await asyncio.gather(
+        >>>             *[server.infer(img=img) for img in imgs])
+        >>> results = asyncio.run(main(['a.png', 'b.png']))
+    """
+
+    def __init__(self,
+                 inferencer: Union[MMagicInferencer, Inferencers,
+                                   BaseMMagicInferencer],
+                 max_batch_size: int = 8,
+                 max_wait_time: float = 0.01,
+                 num_workers: int = 4) -> None:
+        if isinstance(inferencer, MMagicInferencer):
+            inferencer = inferencer.inferencer
+        if isinstance(inferencer, Inferencers):
+            inferencer = inferencer.inferencer
+        assert max_batch_size > 0, (
+            '\'max_batch_size\' must be positive, but receive '
+            f'\'{max_batch_size}\'.')
+        self.inferencer = inferencer
+        self.max_batch_size = max_batch_size
+        self.max_wait_time = max_wait_time
+        self.num_workers = num_workers
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._batcher: Optional[asyncio.Task] = None
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._forward_pool: Optional[ThreadPoolExecutor] = None
+        self._active = set()
+
+    async def start(self) -> None:
+        """Start the batching loop in the running event loop."""
+        assert self._batcher is None, 'The server has been started.'
+        self._queue = asyncio.Queue()
+        self._pool = ThreadPoolExecutor(self.num_workers)
+        # the model is run by one thread at a time
+        self._forward_pool = ThreadPoolExecutor(1)
+        self._batcher = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Finish the accepted requests and stop the server."""
+        if self._batcher is None:
+            return
+        self._batcher.cancel()
+        try:
+            await self._batcher
+        except asyncio.CancelledError:
+            pass
+        # requests still in preprocessing are forwarded without batching
+        await asyncio.gather(*self._active, return_exceptions=True)
+        self._batcher = None
+        self._forward_pool.shutdown()
+        self._pool.shutdown()
+
+    async def __aenter__(self) -> 'BatchInferenceServer':
+        await self.start()
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.stop()
+
+    def _dispatch_kwargs(self, **kwargs) -> List[Dict]:
+        """Dispatch kwargs to each step of the inferencer in the same way as
+        :meth:`BaseMMagicInferencer.__call__`."""
+        params = self.inferencer._dispatch_kwargs(**kwargs)
+        results = []
+        for base_params, call_params in zip(self.inferencer.base_params,
+                                            params):
+            step_params = base_params.copy()
+            step_params.update(call_params)
+            results.append(step_params)
+        return results
+
+    @staticmethod
+    def _get_bucket_key(data: dict, forward_kwargs: Dict) -> Hashable:
+        """Requests with the same input shapes and forward arguments can be
+        stacked in one batch."""
+        shapes = tuple(
+            tuple(inputs.shape) if isinstance(inputs, torch.Tensor) else None
+            for inputs in data['inputs'])
+        return shapes, repr(sorted(forward_kwargs.items()))
+
+    async def infer(self, **kwargs) -> Any:
+        """Infer a request with the same arguments as
+        :meth:`MMagicInferencer.infer` except ``extra_parameters``.
+
+        Returns:
+            Any: The same results as calling the inferencer.
+        """
+        assert self._batcher is not None and not self._batcher.done(), (
+            'The server is not running.')
+        assert not kwargs.get('extra_parameters'), (
+            '\'extra_parameters\' are shared by all requests and can not be '
+            'changed per request, please set them when building the '
+            'inferencer.')
+        task = asyncio.current_task()
+        self._active.add(task)
+        try:
+            return await self._infer(**kwargs)
+        finally:
+            self._active.discard(task)
+
+    async def _infer(self, **kwargs) -> Any:
+        loop = asyncio.get_running_loop()
+        params = self._dispatch_kwargs(**kwargs)
+        data = await loop.run_in_executor(
+            self._pool, partial(self.inferencer.preprocess, **params[0]))
+        assert isinstance(data, dict) and 'inputs' in data, (
+            f'{type(self.inferencer).__name__} does not support batching.')
+
+        request = _Request(
+            self._get_bucket_key(data, params[1]), data, params,
+            loop.create_future(), loop.time())
+        if self._batcher.done():  # the server is stopping
+            self._dispatch([request])
+        else:
+            self._queue.put_nowait(request)
+        preds = await request.future
+        return await loop.run_in_executor(
+            self._pool, partial(self._postprocess, preds, params))
+
+    async def _run(self) -> None:
+        """Collect requests into buckets and dispatch full or expired
+        buckets."""
+        loop = asyncio.get_running_loop()
+        buckets = OrderedDict()
+        try:
+            while True:
+                timeout = None
+                if buckets:
+                    deadline = min(bucket[0].arrival
+                                   for bucket in buckets.values())
+                    timeout = max(deadline + self.max_wait_time - loop.time(),
+                                  0)
+                try:
+                    request = await asyncio.wait_for(self._queue.get(),
+                                                     timeout)
+                except asyncio.TimeoutError:
+                    request = None
+
+                if request is not None:
+                    bucket = buckets.setdefault(request.key, [])
+                    bucket.append(request)
+                    if sum(len(r) for r in bucket) >= self.max_batch_size:
+                        self._dispatch(buckets.pop(request.key))
+
+                now = loop.time()
+                for key in list(buckets.keys()):
+                    if buckets[key][0].arrival + self.max_wait_time <= now:
+                        self._dispatch(buckets.pop(key))
+        except asyncio.CancelledError:
+            while not self._queue.empty():
+                request = self._queue.get_nowait()
+                buckets.setdefault(request.key, []).append(request)
+            for bucket in buckets.values():
+                self._dispatch(bucket)
+            raise
+
+    def _dispatch(self, requests: List[_Request]) -> None:
+        """Forward a batch of requests in the worker thread."""
+        loop = asyncio.get_running_loop()
+        batch = loop.run_in_executor(self._forward_pool,
+                                     partial(self._forward, requests))
+
+        def set_results(batch: asyncio.Future) -> None:
+            if batch.exception() is not None:
+                for request in requests:
+                    if not request.future.done():
+                        request.future.set_exception(batch.exception())
+                return
+            preds, start = batch.result(), 0
+            for request in requests:
+                if not request.future.done():
+                    request.future.set_result(preds[start:start +
+                                                    len(request)])
+                start += len(request)
+
+        batch.add_done_callback(set_results)
+
+    def _forward(self, requests: List[_Request]) -> list:
+        """Stack the requests and forward them to the model."""
+        data = dict()
+        for key in requests[0].data.keys():
+            data[key] = [
+                item for request in requests for item in request.data[key]
+            ]
+        with torch.no_grad():
+            return self.inferencer.forward(data, **requests[0].params[1])
+
+    def _postprocess(self, preds: list, params: List[Dict]) -> Any:
+        """Visualize and postprocess the predictions of a request."""
+        imgs = self.inferencer.visualize(preds, **params[2])
+        return self.inferencer.postprocess(preds, imgs, **params[3])
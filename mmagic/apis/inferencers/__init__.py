@@ -1,30 +1,106 @@
 # Copyright (c) OpenMMLab. All rights reserved.
+from importlib import import_module
 from typing import Dict, List, Optional, Union
 
 import torch
 
 from mmagic.utils import ConfigType
-from .colorization_inferencer import ColorizationInferencer
-from .conditional_inferencer import ConditionalInferencer
-from .controlnet_animation_inferencer import ControlnetAnimationInferencer
-from .eg3d_inferencer import EG3DInferencer
-from .image_super_resolution_inferencer import ImageSuperResolutionInferencer
-from .inpainting_inferencer import InpaintingInferencer
-from .matting_inferencer import MattingInferencer
-from .text2image_inferencer import Text2ImageInferencer
-from .translation_inferencer import TranslationInferencer
-from .unconditional_inferencer import UnconditionalInferencer
-from .video_interpolation_inferencer import VideoInterpolationInferencer
-from .video_restoration_inferencer import VideoRestorationInferencer
-
-__all__ = [
-    'ColorizationInferencer', 'ConditionalInferencer', 'EG3DInferencer',
-    'InpaintingInferencer', 'MattingInferencer',
-    'ImageSuperResolutionInferencer', 'Text2ImageInferencer',
-    'TranslationInferencer', 'UnconditionalInferencer',
-    'VideoInterpolationInferencer', 'VideoRestorationInferencer',
-    'ControlnetAnimationInferencer'
-]
+
+# inferencers are imported lazily by name, since importing all of them
+# pulls in the model stacks of every task
+_INFERENCER_MODULES = dict(
+    ColorizationInferencer='colorization_inferencer',
+    ConditionalInferencer='conditional_inferencer',
+    ControlnetAnimationInferencer='controlnet_animation_inferencer',
+    EG3DInferencer='eg3d_inferencer',
+    ImageSuperResolutionInferencer='image_super_resolution_inferencer',
+    InpaintingInferencer='inpainting_inferencer',
+    MattingInferencer='matting_inferencer',
+    Text2ImageInferencer='text2image_inferencer',
+    TranslationInferencer='translation_inferencer',
+    UnconditionalInferencer='unconditional_inferencer',
+    VideoInterpolationInferencer='video_interpolation_inferencer',
+    VideoRestorationInferencer='video_restoration_inferencer')
+
+# names of tasks in the metafiles and their aliases
+_TASK_INFERENCERS = {
+    'conditional':
+    'ConditionalInferencer',
+    'Conditional GANs':
+    'ConditionalInferencer',
+    'colorization':
+    'ColorizationInferencer',
+    'Colorization':
+    'ColorizationInferencer',
+    'unconditional':
+    'UnconditionalInferencer',
+    'Unconditional GANs':
+    'UnconditionalInferencer',
+    'matting':
+    'MattingInferencer',
+    'Matting':
+    'MattingInferencer',
+    'inpainting':
+    'InpaintingInferencer',
+    'Inpainting':
+    'InpaintingInferencer',
+    'translation':
+    'TranslationInferencer',
+    'Image2Image':
+    'TranslationInferencer',
+    'Image super-resolution':
+    'ImageSuperResolutionInferencer',
+    'Image Super-Resolution':
+    'ImageSuperResolutionInferencer',
+    'video_restoration':
+    'VideoRestorationInferencer',
+    'Video Super-Resolution':
+    'VideoRestorationInferencer',
+    'video_interpolation':
+    'VideoInterpolationInferencer',
+    'Video Interpolation':
+    'VideoInterpolationInferencer',
+    'text2image':
+    'Text2ImageInferencer',
+    'Text2Image':
+    'Text2ImageInferencer',
+    'Text2Image, Image2Image':
+    'Text2ImageInferencer',
+    '3D_aware_generation':
+    'EG3DInferencer',
+    '3D-aware Generation':
+    'EG3DInferencer',
+    'controlnet_animation':
+    'ControlnetAnimationInferencer',
+    'Image Restoration':
+    'ImageSuperResolutionInferencer',
+    'Denoising, Deblurring, Deraining':
+    'ImageSuperResolutionInferencer',
+    'Image Super-Resolution, Image denoising, JPEG compression '
+    'artifact reduction':
+    'ImageSuperResolutionInferencer',
+}
+
+__all__ = list(_INFERENCER_MODULES.keys())
+
+
+def get_inferencer_class(name: str) -> type:
+    """Import an inferencer class by its name.
+
+    Args:
+        name (str): Name of the inferencer class.
+
+    Returns:
+        type: The inferencer class.
+    """
+    if name not in _INFERENCER_MODULES:
+        raise AttributeError(f'Unknown inferencer: {name}')
+    module = import_module(f'{__name__}.{_INFERENCER_MODULES[name]}')
+    return getattr(module, name)
+
+
+def __getattr__(name: str) -> type:
+    return get_inferencer_class(name)
 
 
 class Inferencers:
@@ -47,52 +123,17 @@ class Inferencers:
                  extra_parameters: Optional[Dict] = None,
                  seed: int = 2022) -> None:
         self.task = task
-        if self.task in ['conditional', 'Conditional GANs']:
-            self.inferencer = ConditionalInferencer(
-                config, ckpt, device, extra_parameters, seed=seed)
-        elif self.task in ['colorization', 'Colorization']:
-            self.inferencer = ColorizationInferencer(
-                config, ckpt, device, extra_parameters, seed=seed)
-        elif self.task in ['unconditional', 'Unconditional GANs']:
-            self.inferencer = UnconditionalInferencer(
-                config, ckpt, device, extra_parameters, seed=seed)
-        elif self.task in ['matting', 'Matting']:
-            self.inferencer = MattingInferencer(
-                config, ckpt, device, extra_parameters, seed=seed)
-        elif self.task in ['inpainting', 'Inpainting']:
-            self.inferencer = InpaintingInferencer(
-                config, ckpt, device, extra_parameters, seed=seed)
-        elif self.task in ['translation', 'Image2Image']:
-            self.inferencer = TranslationInferencer(
-                config, ckpt, device, extra_parameters, seed=seed)
-        elif self.task in ['Image super-resolution', 'Image Super-Resolution']:
-            self.inferencer = ImageSuperResolutionInferencer(
-                config, ckpt, device, extra_parameters, seed=seed)
-        elif self.task in ['video_restoration', 'Video Super-Resolution']:
-            self.inferencer = VideoRestorationInferencer(
-                config, ckpt, device, extra_parameters, seed=seed)
-        elif self.task in ['video_interpolation', 'Video Interpolation']:
-            self.inferencer = VideoInterpolationInferencer(
-                config, ckpt, device, extra_parameters)
-        elif self.task in [
-                'text2image', 'Text2Image', 'Text2Image, Image2Image'
-        ]:
-            self.inferencer = Text2ImageInferencer(
-                config, ckpt, device, extra_parameters, seed=seed)
-        elif self.task in ['3D_aware_generation', '3D-aware Generation']:
-            self.inferencer = EG3DInferencer(
-                config, ckpt, device, extra_parameters, seed=seed)
-        elif self.task in ['controlnet_animation']:
-            self.inferencer = ControlnetAnimationInferencer(config)
-        elif self.task in [
-                'Image Restoration', 'Denoising, Deblurring, Deraining',
-                'Image Super-Resolution, Image denoising, JPEG compression '
-                'artifact reduction'
-        ]:
-            self.inferencer = ImageSuperResolutionInferencer(
-                config, ckpt, device, extra_parameters, seed=seed)
-        else:
+        if self.task not in _TASK_INFERENCERS:
             raise ValueError(f'Unknown inferencer task: {self.task}')
+        inferencer_cls = get_inferencer_class(_TASK_INFERENCERS[self.task])
+        if inferencer_cls.__name__ == 'ControlnetAnimationInferencer':
+            self.inferencer = inferencer_cls(config)
+        elif inferencer_cls.__name__ == 'VideoInterpolationInferencer':
+            self.inferencer = inferencer_cls(config, ckpt, device,
+                                             extra_parameters)
+        else:
+            self.inferencer = inferencer_cls(
+                config, ckpt, device, extra_parameters, seed=seed)
 
     def __call__(self, **kwargs) -> Union[Dict, List[Dict]]:
         """Call the inferencer.
@@ -88,6 +88,8 @@ class BaseMMagicInferencer(BaseInferencer):
 
     def _init_extra_parameters(self, extra_parameters: Dict) -> None:
         """Initialize extra_parameters of each kind of inferencer."""
+        # do not share the defaults of the class among instances
+        self.extra_parameters = self.extra_parameters.copy()
         if extra_parameters is not None:
             for key in self.extra_parameters.keys():
                 if key in extra_parameters.keys():
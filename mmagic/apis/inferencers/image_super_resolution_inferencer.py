@@ -1,6 +1,7 @@
 # Copyright (c) OpenMMLab. All rights reserved.
+import copy
 import os
-from typing import Dict, List
+from typing import Dict, List, Tuple
 
 import mmcv
 import numpy as np
@@ -8,12 +9,54 @@ import torch
 from mmengine import mkdir_or_exist
 from mmengine.dataset import Compose
 
+from mmagic.structures import DataSample
 from mmagic.utils import tensor2img
 from .base_mmagic_inferencer import BaseMMagicInferencer, InputsType, PredType
 
 
+def _get_tile_starts(length: int, tile: int, stride: int) -> List[int]:
+    """Get start positions of tiles along an axis. The last tile is aligned
+    to the end, so that all tiles have the same size."""
+    if length <= tile:
+        return [0]
+    starts = list(range(0, length - tile, stride))
+    starts.append(length - tile)
+    return starts
+
+
+def _get_feather_weight(size: int, ramp: int, ramp_start: bool,
+                        ramp_end: bool) -> torch.Tensor:
+    """Get the 1D blending weight of a tile, which linearly ramps up in the
+    first ``ramp`` pixels and ramps down in the last ``ramp`` pixels if the
+    tile overlaps with its neighbour on that side."""
+    weight = torch.ones(size)
+    ramp = min(ramp, size // 2)
+    if ramp > 0:
+        values = (torch.arange(ramp) + 0.5) / ramp
+        if ramp_start:
+            weight[:ramp] = values
+        if ramp_end:
+            weight[size - ramp:] = values.flip(0)
+    return weight
+
+
 class ImageSuperResolutionInferencer(BaseMMagicInferencer):
-    """inferencer that predicts with restoration models."""
+    """inferencer that predicts with restoration models.
+
+    Large images can be restored tile by tile by setting ``tile_size`` in
+    ``extra_parameters``. Overlapping tiles are blended with feathered
+    weights and written into a preallocated output, and ``tile_batch_size``
+    tiles are fed to the model at a time. Thus the memory of the activations
+    is bounded by the tile size instead of the image size.
+
+    Extra parameters:
+        tile_size (int, optional): Size of the tiles of the input image. If
+            None, the whole image is fed to the model. Defaults to None.
+        tile_overlap (int): Overlap between adjacent tiles of the input
+            image. Defaults to 16.
+        tile_batch_size (int): Number of tiles fed to the model at a time.
+            Defaults to 4.
+    """
 
     func_kwargs = dict(
         preprocess=['img', 'ref'],
@@ -21,6 +64,8 @@ class ImageSuperResolutionInferencer(BaseMMagicInferencer):
         visualize=['result_out_dir'],
         postprocess=[])
 
+    extra_parameters = dict(tile_size=None, tile_overlap=16, tile_batch_size=4)
+
     def preprocess(self, img: InputsType, ref: InputsType = None) -> Dict:
         """Process the inputs into a model-feedable format.
 
@@ -32,9 +77,29 @@ class ImageSuperResolutionInferencer(BaseMMagicInferencer):
         Returns:
             data(Dict): Results of preprocess.
         """
+        test_pipeline = self._get_test_pipeline()
+
+        # prepare data
+        if ref:  # Ref-SR
+            data = dict(img_path=img, ref_path=ref)
+        else:  # SISR
+            data = dict(img_path=img)
+        _data = test_pipeline(data)
+
+        data = dict()
+        data['inputs'] = [_data['inputs']]
+        data['data_samples'] = [_data['data_samples']]
+
+        return data
+
+    def _get_test_pipeline(self) -> Compose:
+        """Build the data pipeline without the ground truth once, which is
+        shared by the following calls."""
+        if getattr(self, '_test_pipeline', None) is not None:
+            return self._test_pipeline
         cfg = self.model.cfg
 
-        # select the data pipeline
+        # select the data pipeline, copied to keep the config unchanged
         if cfg.get('inference_pipeline', None):
             test_pipeline = cfg.inference_pipeline
         elif cfg.get('demo_pipeline', None):
@@ -43,6 +108,7 @@ class ImageSuperResolutionInferencer(BaseMMagicInferencer):
             test_pipeline = cfg.test_pipeline
         else:
             test_pipeline = cfg.val_pipeline
+        test_pipeline = copy.deepcopy(test_pipeline)
 
         keys_to_remove = ['gt', 'gt_path']
         for key in keys_to_remove:
@@ -57,28 +123,103 @@ class ImageSuperResolutionInferencer(BaseMMagicInferencer):
                     pipeline['meta_keys'].remove(key)
 
         # build the data pipeline
-        test_pipeline = Compose(test_pipeline)
-
-        # prepare data
-        if ref:  # Ref-SR
-            data = dict(img_path=img, ref_path=ref)
-        else:  # SISR
-            data = dict(img_path=img)
-        _data = test_pipeline(data)
-
-        data = dict()
-        data['inputs'] = [_data['inputs']]
-        data['data_samples'] = [_data['data_samples']]
-
-        return data
+        self._test_pipeline = Compose(test_pipeline)
+        return self._test_pipeline
 
     def forward(self, inputs: InputsType) -> PredType:
         """Forward the inputs to the model."""
         inputs = self.model.data_preprocessor(inputs)
         with torch.no_grad():
-            result = self.model(mode='predict', **inputs)
+            if self.extra_parameters['tile_size']:
+                result = self.forward_tiled(**inputs)
+            else:
+                result = self.model(mode='predict', **inputs)
         return result
 
+    def forward_tiled(self, inputs: torch.Tensor,
+                      data_samples: DataSample) -> PredType:
+        """Forward the preprocessed inputs to the model tile by tile.
+
+        Args:
+            inputs (torch.Tensor): Batch of images preprocessed by the data
+                preprocessor, in shape (N, C, H, W).
+            data_samples (DataSample): Data samples of the inputs.
+
+        Returns:
+            PredType: Results of forwarding, the same as the model in
+                'predict' mode.
+        """
+        assert isinstance(inputs, torch.Tensor), (
+            'Tiled inference only supports single image super-resolution '
+            'models, whose inputs are a batch of images.')
+        tile_size = self.extra_parameters['tile_size']
+        overlap = self.extra_parameters['tile_overlap']
+        assert 0 <= overlap < tile_size, (
+            '\'tile_overlap\' must be in range [0, tile_size), but receive '
+            f'\'{overlap}\'.')
+
+        h, w = inputs.shape[-2:]
+        tile_h, tile_w = min(tile_size, h), min(tile_size, w)
+        tops = _get_tile_starts(h, tile_h, tile_size - overlap)
+        lefts = _get_tile_starts(w, tile_w, tile_size - overlap)
+        tiles = [(top, left) for top in tops for left in lefts]
+
+        batch_size = self.extra_parameters['tile_batch_size']
+        output, weight_sum, scale, weights = None, None, None, dict()
+        for idx in range(len(inputs)):
+            for start in range(0, len(tiles), batch_size):
+                batch_tiles = tiles[start:start + batch_size]
+                batch = torch.stack([
+                    inputs[idx, :, top:top + tile_h, left:left + tile_w]
+                    for top, left in batch_tiles
+                ])
+                feats = self.model(inputs=batch, mode='tensor')
+
+                if output is None:
+                    scale = self._get_scale(feats.shape[-2:], (tile_h, tile_w))
+                    output = feats.new_zeros(
+                        (len(inputs), feats.size(1), h * scale, w * scale))
+                    weight_sum = feats.new_zeros((h * scale, w * scale))
+
+                for (top, left), feat in zip(batch_tiles, feats):
+                    # tiles only fade out on the sides with neighbours
+                    key = (top > 0, top + tile_h < h, left > 0,
+                           left + tile_w < w)
+                    if key not in weights:
+                        weight_h = _get_feather_weight(tile_h * scale,
+                                                       overlap * scale,
+                                                       *key[:2])
+                        weight_w = _get_feather_weight(tile_w * scale,
+                                                       overlap * scale,
+                                                       *key[2:])
+                        weights[key] = torch.outer(weight_h, weight_w).to(feat)
+                    weight = weights[key]
+                    top, left = top * scale, left * scale
+                    bottom = top + tile_h * scale
+                    right = left + tile_w * scale
+                    output[idx, :, top:bottom,
+                           left:right].addcmul_(feat, weight)
+                    if idx == 0:
+                        weight_sum[top:bottom, left:right].add_(weight)
+        output.div_(weight_sum)
+
+        feats = self.model.data_preprocessor.destruct(output, data_samples)
+        predictions = DataSample(pred_img=feats.cpu())
+        return self.model.convert_to_datasample(predictions, data_samples,
+                                                inputs)
+
+    @staticmethod
+    def _get_scale(out_shape: Tuple[int, int], in_shape: Tuple[int,
+                                                               int]) -> int:
+        """Get the upsampling scale of the model from shapes of a tile."""
+        scale = out_shape[0] // in_shape[0]
+        assert tuple(out_shape) == (
+            in_shape[0] * scale, in_shape[1] * scale), (
+                'The model must upsample the tiles by an integer scale, but '
+                f'receive tiles of shape \'{tuple(in_shape)}\' and '
+                f'\'{tuple(out_shape)}\'.')
+        return scale
+
     def visualize(self,
                   preds: PredType,
                   result_out_dir: str = None) -> List[np.ndarray]:
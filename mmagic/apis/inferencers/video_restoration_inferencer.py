@@ -2,7 +2,7 @@
 import glob
 import os
 import os.path as osp
-from typing import Dict, List, Optional, Tuple, Union
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
 import cv2
 import mmcv
@@ -19,12 +19,70 @@ from .base_mmagic_inferencer import (BaseMMagicInferencer, InputsType,
 from .inference_functions import VIDEO_EXTENSIONS, pad_sequence
 
 
+def _iter_chunks(frames: Iterable,
+                 chunk_size: int,
+                 overlap: int,
+                 min_length: int = 1) -> Iterator[Tuple[list, int, int]]:
+    """Split a stream of frames into chunks with overlapping margins.
+
+    Each chunk has ``chunk_size`` valid frames (fewer in the last chunk),
+    with ``overlap`` frames of context before and after them. Chunks at both
+    ends of the video are extended with more context frames to have at least
+    ``min_length`` frames, e.g. the window size of sliding-window models,
+    unless the video is shorter. Only ``chunk_size + 2 * overlap +
+    min_length`` frames are kept at a time at most.
+
+    Args:
+        frames (Iterable): Frames of the video.
+        chunk_size (int): Number of valid frames in each chunk.
+        overlap (int): Number of context frames on each side.
+        min_length (int): Minimum number of frames of the last chunk, unless
+            the video is shorter. Defaults to 1.
+
+    Yields:
+        Tuple[list, int, int]: Frames of the chunk, start and end indices of
+            the valid frames in the chunk.
+    """
+
+    def last(items: list, num: int) -> list:
+        return items[max(len(items) - num, 0):] if num > 0 else []
+
+    num_history = max(overlap, min_length - 1)
+    history, pending = [], []
+    for frame in frames:
+        pending.append(frame)
+        context = last(history, overlap)
+        # the first chunk waits for more frames after it to be long enough
+        while (len(pending) >= chunk_size + overlap
+               and len(context) + len(pending) >= min_length):
+            yield context + pending, len(context), len(context) + chunk_size
+            history = last(history + pending[:chunk_size], num_history)
+            pending = pending[chunk_size:]
+            context = last(history, overlap)
+    if pending:
+        context = last(history, max(overlap, min_length - len(pending)))
+        yield context + pending, len(context), len(context) + len(pending)
+
+
 class VideoRestorationInferencer(BaseMMagicInferencer):
-    """inferencer that predicts with video restoration models."""
+    """inferencer that predicts with video restoration models.
+
+    In the sliding-window framework (``window_size > 0``),
+    ``window_batch_size`` windows are stacked and fed to the model at a time.
+    On GPUs, the next batch of windows is copied to the device while the
+    current one is being processed.
+
+    Long videos can be split into chunks of ``max_seq_len`` frames. Each
+    chunk is extended by ``chunk_overlap`` frames of context on both sides,
+    whose outputs are discarded, so that the propagation of recurrent models
+    does not restart at the chunk boundaries. With ``streaming=True``, frames
+    are read, restored and written to ``result_out_dir`` chunk by chunk, and
+    the memory does not grow with the length of the video.
+    """
 
     func_kwargs = dict(
         preprocess=['video'],
-        forward=[],
+        forward=['result_out_dir'],
         visualize=['result_out_dir'],
         postprocess=[])
 
@@ -32,7 +90,10 @@ class VideoRestorationInferencer(BaseMMagicInferencer):
         start_idx=0,
         filename_tmpl='{:08d}.png',
         window_size=0,
-        max_seq_len=None)
+        window_batch_size=1,
+        max_seq_len=None,
+        chunk_overlap=0,
+        streaming=False)
 
     def preprocess(self, video: InputsType) -> Dict:
         """Process the inputs into a model-feedable format.
@@ -51,6 +112,9 @@ class VideoRestorationInferencer(BaseMMagicInferencer):
         else:
             test_pipeline = self.model.cfg.val_pipeline
 
+        if self.extra_parameters['streaming']:
+            return self._preprocess_streaming(video, test_pipeline)
+
         # check if the input is a video
         file_extension = osp.splitext(video)[1]
         if file_extension in VIDEO_EXTENSIONS:
@@ -98,45 +162,205 @@ class VideoRestorationInferencer(BaseMMagicInferencer):
 
         return results
 
-    def forward(self, inputs: InputsType) -> PredType:
+    def _preprocess_streaming(self, video: str, test_pipeline: list) -> Dict:
+        """Prepare a lazy reader of frames for streaming inference.
+
+        Args:
+            video (str): Path of the video or the folder of frames.
+            test_pipeline (list): Config of the data pipeline.
+
+        Returns:
+            Dict: The frame generator, the data pipeline without loading
+                transforms, the key and the fps of the video.
+        """
+        # frames are read by the inferencer
+        load_pipeline = [
+            pipeline for pipeline in test_pipeline
+            if pipeline['type'] == 'LoadImageFromFile'
+            and pipeline.get('key') == 'img'
+        ]
+        test_pipeline = Compose([
+            pipeline for pipeline in test_pipeline if pipeline['type'] not in
+            ['GenerateSegmentIndices', 'LoadImageFromFile']
+        ])
+
+        if osp.splitext(video)[1] in VIDEO_EXTENSIONS:
+            video_reader = mmcv.VideoReader(video)
+            frames = (np.flip(frame, axis=2) for frame in video_reader)
+            fps = video_reader.fps
+        else:
+            # frames are named by `filename_tmpl` from `start_idx` and loaded
+            # in the same way as `GenerateSegmentIndices` and
+            # `LoadImageFromFile` in the pipeline
+            files = []
+            frame_idx = self.extra_parameters['start_idx']
+            filename_tmpl = self.extra_parameters['filename_tmpl']
+            while osp.exists(osp.join(video, filename_tmpl.format(frame_idx))):
+                files.append(osp.join(video, filename_tmpl.format(frame_idx)))
+                frame_idx += 1
+            assert len(files) > 0, (
+                f'Cannot find frames named by \'{filename_tmpl}\' from '
+                f'index {self.extra_parameters["start_idx"]} in \'{video}\'.')
+            load_pipeline = Compose(load_pipeline or [
+                dict(type='LoadImageFromFile', key='img', channel_order='rgb')
+            ])
+            frames = (
+                load_pipeline(dict(img_path=file))['img'] for file in files)
+            fps = 25
+
+        return dict(frames=frames, pipeline=test_pipeline, key=video, fps=fps)
+
+    def forward(self,
+                inputs: InputsType,
+                result_out_dir: str = '') -> PredType:
         """Forward the inputs to the model.
 
         Args:
             inputs (InputsType): Images array of input video.
+            result_out_dir (str): Output directory of video, only used in
+                streaming inference. Defaults to ''.
 
         Returns:
             PredType: Results of forwarding
         """
         with torch.no_grad():
-            if self.extra_parameters[
-                    'window_size'] > 0:  # sliding window framework
-                data = pad_sequence(inputs,
-                                    self.extra_parameters['window_size'])
+            if self.extra_parameters['streaming']:
+                result = self.forward_streaming(inputs, result_out_dir)
+            elif self.extra_parameters['max_seq_len'] is None:
+                result = self._forward_chunk(inputs)
+            else:
                 result = []
-                # yapf: disable
-                for i in range(0, data.size(1) - 2 * (self.extra_parameters['window_size'] // 2)):  # noqa
-                    # yapf: enable
-                    data_i = data[:, i:i +
-                                  self.extra_parameters['window_size']].to(
-                                      self.device)
+                for chunk, start, end in _iter_chunks(
+                        inputs.unbind(1), self.extra_parameters['max_seq_len'],
+                        self._get_chunk_overlap(),
+                        self._get_min_chunk_length()):
                     result.append(
-                        self.model(inputs=data_i, mode='tensor').cpu())
-                result = torch.stack(result, dim=1)
-            else:  # recurrent framework
-                if self.extra_parameters['max_seq_len'] is None:
-                    result = self.model(
-                        inputs=inputs.to(self.device), mode='tensor').cpu()
+                        self._forward_chunk(torch.stack(chunk,
+                                                        dim=1))[:, start:end])
+                result = torch.cat(result, dim=1)
+        return result
+
+    def _get_chunk_overlap(self) -> int:
+        """Get the number of context frames on each side of chunks. Sliding
+        windows at the valid frames need ``window_size // 2`` frames."""
+        return max(self.extra_parameters['chunk_overlap'],
+                   self.extra_parameters['window_size'] // 2)
+
+    def _get_min_chunk_length(self) -> int:
+        """Get the minimum number of frames of chunks. Sliding windows are
+        padded by reflection within each chunk, which needs a complete
+        window."""
+        window_size = self.extra_parameters['window_size']
+        return 2 * (window_size // 2) + 1 if window_size > 0 else 1
+
+    def _forward_chunk(self, inputs: torch.Tensor) -> torch.Tensor:
+        """Forward a chunk of frames to the model."""
+        if self.extra_parameters['window_size'] > 0:  # sliding window
+            return self.forward_sliding_window(inputs)
+        # recurrent framework
+        return self.model(inputs=inputs.to(self.device), mode='tensor').cpu()
+
+    def forward_streaming(self, inputs: Dict, result_out_dir: str) -> None:
+        """Restore the frames chunk by chunk and write the outputs once each
+        chunk is finished.
+
+        Args:
+            inputs (Dict): Results of :meth:`_preprocess_streaming`.
+            result_out_dir (str): Output directory of video.
+        """
+        assert result_out_dir, (
+            '\'result_out_dir\' must be given in streaming inference.')
+        chunk_size = self.extra_parameters['max_seq_len']
+        assert chunk_size is not None and chunk_size > 0, (
+            '\'max_seq_len\' must be positive in streaming inference, but '
+            f'receive \'{chunk_size}\'.')
+
+        to_video = osp.splitext(result_out_dir)[1] in VIDEO_EXTENSIONS
+        mmengine.utils.mkdir_or_exist(
+            osp.dirname(result_out_dir) if to_video else result_out_dir)
+        video_writer = None
+        frame_idx = self.extra_parameters['start_idx']
+        filename_tmpl = self.extra_parameters['filename_tmpl']
+
+        for chunk, start, end in _iter_chunks(inputs['frames'], chunk_size,
+                                              self._get_chunk_overlap(),
+                                              self._get_min_chunk_length()):
+            data = inputs['pipeline'](
+                dict(img=chunk, img_path=None, key=inputs['key']))
+            chunk_inputs = data['inputs']
+            if chunk_inputs.ndim == 3:  # a chunk with one frame
+                chunk_inputs = chunk_inputs[None]
+            outputs = self._forward_chunk(chunk_inputs[None] / 255.0)
+
+            for i in range(start, end):
+                img = tensor2img(outputs[:, i])
+                if to_video:
+                    if video_writer is None:
+                        h, w = img.shape[:2]
+                        fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+                        video_writer = cv2.VideoWriter(result_out_dir, fourcc,
+                                                       inputs['fps'], (w, h))
+                    video_writer.write(img.astype(np.uint8))
                 else:
-                    result = []
-                    for i in range(0, inputs.size(1),
-                                   self.extra_parameters['max_seq_len']):
-                        result.append(
-                            self.model(
-                                inputs=inputs[:, i:i + self.
-                                              extra_parameters['max_seq_len']].
-                                to(self.device),
-                                mode='tensor').cpu())
-                    result = torch.cat(result, dim=1)
+                    mmcv.imwrite(
+                        img,
+                        f'{result_out_dir}/{filename_tmpl.format(frame_idx)}')
+                frame_idx += 1
+
+        if video_writer is not None:
+            video_writer.release()
+        logger: MMLogger = MMLogger.get_current_instance()
+        logger.info(f'Output video is save at {result_out_dir}.')
+
+    def forward_sliding_window(self, inputs: torch.Tensor) -> torch.Tensor:
+        """Forward the inputs to the model in batches of sliding windows.
+
+        Args:
+            inputs (torch.Tensor): Frames of input video in shape
+                (n, t, c, h, w).
+
+        Returns:
+            torch.Tensor: Outputs of all windows, stacked in dim 1.
+        """
+        window_size = self.extra_parameters['window_size']
+        batch_size = self.extra_parameters['window_batch_size']
+        assert batch_size > 0, (
+            '\'window_batch_size\' must be positive, but receive '
+            f'\'{batch_size}\'.')
+
+        data = pad_sequence(inputs, window_size)
+        n = data.size(0)
+        num_windows = data.size(1) - 2 * (window_size // 2)
+        # (n, num_windows, window_size, c, h, w) view of all windows
+        windows = data.unfold(1, window_size, 1).permute(0, 1, 5, 2, 3, 4)
+
+        device = torch.device(self.device)
+        stream = torch.cuda.Stream(device) if device.type == 'cuda' else None
+
+        def load(start):
+            batch = windows[:, start:start + batch_size].flatten(0, 1)
+            if stream is None:
+                return batch.to(device)
+            batch = batch.pin_memory()
+            with torch.cuda.stream(stream):
+                return batch.to(device, non_blocking=True)
+
+        result = None
+        next_batch = load(0)
+        for start in range(0, num_windows, batch_size):
+            batch = next_batch
+            if stream is not None:
+                torch.cuda.current_stream(device).wait_stream(stream)
+                batch.record_stream(torch.cuda.current_stream(device))
+            if start + batch_size < num_windows:
+                next_batch = load(start + batch_size)
+
+            output = self.model(inputs=batch, mode='tensor')
+            output = output.view(n, -1, *output.shape[1:])
+            if result is None:
+                result = torch.empty((n, num_windows, *output.shape[2:]),
+                                     dtype=output.dtype)
+            result[:, start:start + output.size(1)].copy_(output)
         return result
 
     def visualize(self,
@@ -154,6 +378,10 @@ class VideoRestorationInferencer(BaseMMagicInferencer):
         Returns:
             List[np.ndarray]: Result of visualize
         """
+        if self.extra_parameters['streaming']:
+            # frames have been written by `forward_streaming`
+            return []
+
         file_extension = os.path.splitext(result_out_dir)[1]
         mmengine.utils.mkdir_or_exist(osp.dirname(result_out_dir))
         prog_bar = ProgressBar(preds.size(1))
@@ -1,4 +1,5 @@
 # Copyright (c) OpenMMLab. All rights reserved.
+import json
 import os.path as osp
 import warnings
 from typing import Dict, List, Optional, Union
@@ -10,6 +11,9 @@ from mmengine.registry import init_default_scope
 from .inferencers import Inferencers
 from .inferencers.base_mmagic_inferencer import InputsType
 
+# prebuilt by `.dev_scripts/update_metafile_index.py`
+METAFILE_INDEX = osp.join(osp.dirname(__file__), 'metafile_index.json')
+
 
 class MMagicInferencer:
     """MMagicInferencer API for mmagic models inference.
@@ -239,7 +243,17 @@ class MMagicInferencer:
 
     @staticmethod
     def init_inference_supported_models_cfg() -> None:
+        """Initialize the task and settings of supported models.
+
+        They are loaded from the prebuilt metafile index, and only models
+        missing in the index are parsed from their metafiles.
+        """
         if not MMagicInferencer.inference_supported_models_cfg_inited:
+            index = dict()
+            if osp.exists(METAFILE_INDEX):
+                with open(METAFILE_INDEX, 'r', encoding='utf-8') as f:
+                    index = json.load(f)
+
             if osp.exists(
                     osp.join(osp.dirname(__file__), '..', '..', 'configs')):
                 all_cfgs_dir = osp.join(
@@ -248,6 +262,10 @@ class MMagicInferencer:
                 all_cfgs_dir = osp.join(
                     osp.dirname(__file__), '..', '.mim', 'configs')
             for model_name in MMagicInferencer.inference_supported_models:
+                if model_name in index:
+                    MMagicInferencer.inference_supported_models_cfg[
+                        model_name] = index[model_name]
+                    continue
                 meta_file_dir = osp.join(all_cfgs_dir, model_name,
                                          'metafile.yml')
                 with open(meta_file_dir, 'r') as stream:
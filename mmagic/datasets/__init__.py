@@ -3,6 +3,7 @@ from .basic_conditional_dataset import BasicConditionalDataset
 from .basic_frames_dataset import BasicFramesDataset
 from .basic_image_dataset import BasicImageDataset
 from .cifar10_dataset import CIFAR10
+from .collate import packed_collate
 from .comp1k_dataset import AdobeComp1kDataset
 from .controlnet_dataset import ControlNetDataset
 from .dreambooth_dataset import DreamBoothDataset
@@ -10,6 +11,8 @@ from .grow_scale_image_dataset import GrowScaleImgDataset
 from .imagenet_dataset import ImageNet
 from .mscoco_dataset import MSCoCoDataset
 from .paired_image_dataset import PairedImageDataset
+from .shard_backend import ShardBackend, write_shards
+from .shard_sampler import ShardShuffleSampler
 from .singan_dataset import SinGANDataset
 from .textual_inversion_dataset import TextualInversionDataset
 from .unpaired_image_dataset import UnpairedImageDataset
@@ -19,5 +22,6 @@ __all__ = [
     'BasicConditionalDataset', 'UnpairedImageDataset', 'PairedImageDataset',
     'ImageNet', 'CIFAR10', 'GrowScaleImgDataset', 'SinGANDataset',
     'MSCoCoDataset', 'ControlNetDataset', 'DreamBoothDataset',
-    'ControlNetDataset', 'SDFinetuneDataset', 'TextualInversionDataset'
+    'ControlNetDataset', 'SDFinetuneDataset', 'TextualInversionDataset',
+    'ShardBackend', 'ShardShuffleSampler', 'write_shards', 'packed_collate'
 ]
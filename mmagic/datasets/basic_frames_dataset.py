@@ -3,10 +3,12 @@ import os
 import os.path as osp
 from typing import Callable, List, Optional, Union
 
+import numpy as np
 from mmengine.dataset import BaseDataset
 from mmengine.fileio import get_file_backend, list_from_file
 
 from ..registry import DATASETS
+from .data_utils import load_or_build_index
 
 
 @DATASETS.register_module()
@@ -65,6 +67,13 @@ class BasicFramesDataset(BaseDataset):
             Default: None.
         load_frames_list (dict): Load frames list for each key.
             Default: dict().
+        index_cache_dir (str, optional): Directory to cache the paths and
+            sequence lengths scanned from the folder or annotation file, so
+            that they are scanned only once (by rank 0) instead of each time
+            the dataset is built. The cache is invalidated when the arguments,
+            the annotation file or the folder of ``search_key`` is modified.
+            Note that adding frames to an existing sequence does not modify
+            the folder, remove the cache in this case. Default: None.
 
     Examples:
 
@@ -141,6 +150,7 @@ class BasicFramesDataset(BaseDataset):
                  num_output_frames: Optional[int] = None,
                  fixed_seq_len: Optional[int] = None,
                  load_frames_list: dict = dict(),
+                 index_cache_dir: Optional[str] = None,
                  **kwargs):
 
         for key in data_prefix:
@@ -162,6 +172,7 @@ class BasicFramesDataset(BaseDataset):
         self.num_input_frames = num_input_frames
         self.num_output_frames = num_output_frames
         self.load_frames_list = load_frames_list
+        self.index_cache_dir = index_cache_dir
         self.file_backend = get_file_backend(
             uri=data_root, backend_args=backend_args)
 
@@ -181,8 +192,11 @@ class BasicFramesDataset(BaseDataset):
             list[dict]: A list of annotation.
         """
 
-        path_list = self._get_path_list()
-        self._set_seq_lens()
+        if self.index_cache_dir is None:
+            path_list = self._get_path_list()
+            self._set_seq_lens()
+        else:
+            path_list = self._load_index()
 
         data_list = []
         for path in path_list:
@@ -214,6 +228,48 @@ class BasicFramesDataset(BaseDataset):
 
         return data_list
 
+    def _build_index(self):
+        """Scan the paths and sequence lengths to cache.
+
+        Returns:
+            dict[str, np.ndarray]: Arrays of paths, names of sequences and
+                corresponding sequence lengths.
+        """
+
+        path_list = self._get_path_list()
+        self._set_seq_lens()
+        seq_names = [k for k in self.seq_lens if k != 'fixed_seq_len']
+        return dict(
+            paths=np.array(path_list, dtype=str),
+            seq_names=np.array(seq_names, dtype=str),
+            seq_lens=np.array([self.seq_lens[k] for k in seq_names],
+                              dtype=np.int64))
+
+    def _load_index(self):
+        """Load the paths and sequence lengths from the index cache.
+
+        Returns:
+            list[str]: A list of paths.
+        """
+
+        folder = self.data_prefix[self.search_key]
+        key_info = dict(
+            ann_file=self.ann_file if self.use_ann_file else '',
+            folder=folder,
+            filename_tmpl=self.filename_tmpl[self.search_key],
+            depth=self.depth,
+            fixed_seq_len=self.seq_lens['fixed_seq_len'])
+        watch_paths = [folder]
+        if self.use_ann_file:
+            watch_paths.append(self.ann_file)
+        index = load_or_build_index(self.index_cache_dir,
+                                    self.__class__.__name__, key_info,
+                                    self._build_index, watch_paths)
+
+        self.seq_lens.update(
+            zip(index['seq_names'].tolist(), index['seq_lens'].tolist()))
+        return index['paths'].tolist()
+
     def _get_path_list(self):
         """Get list of paths from annotation file or folder of dataset.
 
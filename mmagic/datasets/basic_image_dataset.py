@@ -4,10 +4,12 @@ import os.path as osp
 import re
 from typing import Callable, List, Optional, Tuple, Union
 
+import numpy as np
 from mmengine.dataset import BaseDataset
 from mmengine.fileio import get_file_backend, list_from_file
 
 from mmagic.registry import DATASETS
+from .data_utils import load_or_build_index
 
 IMG_EXTENSIONS = ('.jpg', '.JPG', '.jpeg', '.JPEG', '.png', '.PNG', '.ppm',
                   '.PPM', '.bmp', '.BMP', '.tif', '.TIF', '.tiff', '.TIFF')
@@ -65,6 +67,14 @@ class BasicImageDataset(BaseDataset):
             that we are interested in. Default: None.
         recursive (bool): If set to True, recursively scan the
             directory. Default: False.
+        index_cache_dir (str, optional): Directory to cache the manifest of
+            paths scanned from the folder or annotation file. The manifest is
+            built by rank 0 only and memory-mapped by all ranks, so that huge
+            folders are not listed each time the dataset is built. It is
+            invalidated when the arguments, the annotation file or the folder
+            of ``search_key`` is modified. Note that only the top folder is
+            watched with ``recursive=True``, remove the cache after modifying
+            sub-folders. Default: None.
 
     Note:
 
@@ -142,6 +152,7 @@ class BasicImageDataset(BaseDataset):
                  backend_args: Optional[dict] = None,
                  img_suffix: Optional[Union[str, Tuple[str]]] = IMG_EXTENSIONS,
                  recursive: bool = False,
+                 index_cache_dir: Optional[str] = None,
                  **kwards):
 
         for key in data_prefix:
@@ -160,6 +171,7 @@ class BasicImageDataset(BaseDataset):
             self.backend_args = backend_args.copy()
         self.img_suffix = img_suffix
         self.recursive = recursive
+        self.index_cache_dir = index_cache_dir
         self.file_backend = get_file_backend(
             uri=data_root, backend_args=backend_args)
 
@@ -179,7 +191,10 @@ class BasicImageDataset(BaseDataset):
             list[dict]: A list of annotation.
         """
 
-        path_list = self._get_path_list()
+        if self.index_cache_dir is None:
+            path_list = self._get_path_list()
+        else:
+            path_list = self._load_index()
 
         data_list = []
         for file in path_list:
@@ -197,6 +212,38 @@ class BasicImageDataset(BaseDataset):
 
         return data_list
 
+    def _build_index(self):
+        """Scan the paths to cache.
+
+        Returns:
+            dict[str, np.ndarray]: Paths encoded in utf-8, which is more
+                compact than unicode arrays.
+        """
+
+        paths = [path.encode('utf-8') for path in self._get_path_list()]
+        return dict(paths=np.array(paths, dtype=bytes))
+
+    def _load_index(self):
+        """Load the paths from the index cache.
+
+        Returns:
+            list[str]: A list of paths.
+        """
+
+        folder = self.data_prefix[self.search_key]
+        key_info = dict(
+            ann_file=self.ann_file if self.use_ann_file else '',
+            folder=folder,
+            filename_tmpl=self.filename_tmpl[self.search_key],
+            img_suffix=self.img_suffix,
+            recursive=self.recursive)
+        watch_paths = [self.ann_file] if self.use_ann_file else [folder]
+        index = load_or_build_index(self.index_cache_dir,
+                                    self.__class__.__name__, key_info,
+                                    self._build_index, watch_paths)
+
+        return [path.decode('utf-8') for path in index['paths'].tolist()]
+
     def _get_path_list(self):
         """Get list of paths from annotation file or folder of dataset.
 
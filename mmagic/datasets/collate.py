@@ -0,0 +1,117 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+from typing import List, Sequence, Union
+
+import numpy as np
+import torch
+from torch import Tensor
+
+from mmagic.registry import FUNCTIONS
+from mmagic.utils import all_to_tensor, can_convert_to_image
+
+ImageType = Union[np.ndarray, Tensor, Sequence[np.ndarray]]
+
+
+def _image_to_chw_view(img: Union[np.ndarray, Tensor]) -> Tensor:
+    """Convert an (H, W) or (H, W, C) array to a (C, H, W) tensor without
+    copying. Tensors are assumed to be packed as (C, H, W) already."""
+    if isinstance(img, Tensor):
+        return img
+    if img.ndim == 2:
+        img = img[..., None]
+    if any(stride < 0 for stride in img.strides):
+        # e.g. flipped by `np.flip`, which can not be viewed by torch
+        img = np.ascontiguousarray(img)
+    return torch.from_numpy(img).permute(2, 0, 1)
+
+
+def _sample_to_views(value: ImageType) -> List[Tensor]:
+    """Convert an image or a sequence of frames to (C, H, W) views.
+
+    A sequence with one frame is regarded as an image, which is the same as
+    :func:`mmagic.utils.all_to_tensor`.
+    """
+    if isinstance(value, (list, tuple)):
+        return [_image_to_chw_view(frame) for frame in value]
+    return [_image_to_chw_view(value)]
+
+
+def _collate_images(values: Sequence[ImageType]) -> Union[Tensor, list]:
+    """Collate images of a batch into one tensor.
+
+    Images of different shapes or dtypes can not be collated in one tensor,
+    and are returned as a list of tensors.
+    """
+    if not all(can_convert_to_image(value) for value in values):
+        return list(values)
+
+    views = [_sample_to_views(value) for value in values]
+    frame = views[0][0]
+    num_frames = len(views[0])
+    if not all(
+            len(frames) == num_frames and all(
+                f.shape == frame.shape and f.dtype == frame.dtype
+                for f in frames) for frames in views):
+        return [all_to_tensor(value) for value in values]
+
+    shape = (len(values), num_frames, *frame.shape)
+    if torch.utils.data.get_worker_info() is not None:
+        # write to shared memory directly in the worker to avoid another copy
+        # when the batch is sent to the main process
+        batch = torch.empty(shape, dtype=frame.dtype).share_memory_()
+    else:
+        batch = torch.empty(shape, dtype=frame.dtype)
+
+    for idx, frames in enumerate(views):
+        for t, f in enumerate(frames):
+            batch[idx, t].copy_(f)
+
+    if num_frames == 1:
+        batch = batch.squeeze(1)
+    return batch
+
+
+@FUNCTIONS.register_module()
+def packed_collate(data_batch: Sequence[dict]) -> dict:
+    """Collate images of a batch into one contiguous tensor.
+
+    Compared to ``pseudo_collate``, images in ``inputs`` are written into one
+    batch tensor with the final (N, C, H, W) or (N, t, C, H, W) layout, in
+    shared memory when called in the dataloader workers. Together with
+    ``PackInputs(pack_tensor=False)``, (H, W, C) uint8 images from the
+    pipeline are copied only once before being pinned, and
+    :class:`~mmagic.models.DataPreprocessor` transfers the whole batch to the
+    device at once and converts it to float there.
+
+    Images with different shapes are returned as a list of tensors and padded
+    by the data preprocessor as before, since the padding size is recorded in
+    the metainfo by the data preprocessor. The batch is not pinned here, as
+    memory can not be pinned in the workers. Set ``pin_memory=True`` of the
+    dataloader to pin it. The channel order conversion is fused with the
+    conversion to float in the data preprocessor. ``data_samples`` are not
+    collated.
+
+    Use it in the dataloader config by
+    ``collate_fn=dict(type='mmagic.packed_collate')``.
+
+    Args:
+        data_batch (Sequence[dict]): Samples packed by
+            :class:`~mmagic.datasets.transforms.PackInputs`.
+
+    Returns:
+        dict: The collated batch with 'inputs' and 'data_samples'.
+    """
+    inputs = [data['inputs'] for data in data_batch]
+    if isinstance(inputs[0], dict):
+        inputs = {
+            key: _collate_images([inp[key] for inp in inputs])
+            for key in inputs[0]
+        }
+    else:
+        inputs = _collate_images(inputs)
+
+    collated = dict(inputs=inputs)
+    if 'data_samples' in data_batch[0]:
+        collated['data_samples'] = [
+            data['data_samples'] for data in data_batch
+        ]
+    return collated
@@ -1,4 +1,5 @@
 # Copyright (c) OpenMMLab. All rights reserved.
+import getpass
 import gzip
 import hashlib
 import os
@@ -10,11 +11,20 @@ import tempfile
 import urllib.error
 import urllib.request
 import zipfile
+from contextlib import contextmanager
 from os import PathLike
-from typing import Callable, Dict, List, Tuple
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
 
+import numpy as np
+from mmengine import mkdir_or_exist
+from mmengine.dist import barrier, get_dist_info
 from mmengine.fileio.backends import BaseStorageBackend
 
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
 
 # TODO: we can use FileClient.infer_client to replace this function
 def infer_io_backend(data_root: str) -> str:
@@ -373,3 +383,285 @@ def get_samples(root: str, folder_to_idx: Dict[str, int],
     empty_folders = set(folder_to_idx.keys()) - available_classes
 
     return samples, empty_folders
+
+
+def _get_user() -> str:
+    """Get the name of the current user to separate caches of users."""
+    try:
+        return getpass.getuser()
+    except Exception:
+        return str(os.getpid())
+
+
+class SharedFileCache:
+    """A size-capped LRU cache of bytes shared by all processes on a node.
+
+    Each entry is saved as a file under ``cache_dir``, which is the in-memory
+    file system ``/dev/shm`` by default. Therefore all DataLoader workers (and
+    all ranks on the same node) read the same entries instead of building
+    their own copy. Reading an entry updates its modification time. Once the
+    total size exceeds ``max_size``, the least recently used entries are
+    evicted until the size is below 90% of ``max_size``, so that the
+    directory is not scanned on every write of a full cache.
+
+    Args:
+        cache_dir (str, optional): Directory of the cache. If not passed,
+            ``mmagic_cache_<user>`` under ``/dev/shm`` is used if available,
+            otherwise under the temporary directory. Defaults to None.
+        max_size (int): The max total size of the cache in bytes. It is
+            clamped to the space available on the file system of
+            ``cache_dir``. Defaults to 4GB.
+        namespace (str): Prefix of all keys, e.g. the name of the dataset or
+            the job, to separate entries of caches sharing ``cache_dir``.
+            Caches of all namespaces share the same ``max_size``.
+            Defaults to ''.
+    """
+
+    # ratio of ``max_size`` the cache is evicted to once it is full
+    low_water_ratio = 0.9
+
+    def __init__(self,
+                 cache_dir: Optional[str] = None,
+                 max_size: int = 4 * 1024**3,
+                 namespace: str = '') -> None:
+        if cache_dir is None:
+            root = '/dev/shm' if osp.isdir(
+                '/dev/shm') else tempfile.gettempdir()
+            cache_dir = osp.join(root, f'mmagic_cache_{_get_user()}')
+        mkdir_or_exist(cache_dir)
+        self.cache_dir = cache_dir
+        self.namespace = namespace
+        self._lock_path = osp.join(cache_dir, '.lock')
+        self._size_path = osp.join(cache_dir, '.size')
+        # e.g. /dev/shm of docker containers is only 64MB by default
+        available = shutil.disk_usage(cache_dir).free + self._read_size()
+        self.max_size = min(max_size, available)
+
+    @property
+    def _prefix(self) -> str:
+        """Prefix of the files of entries in the namespace."""
+        return hashlib.md5(self.namespace.encode('utf-8')).hexdigest()[:8]
+
+    def _get_path(self, key: str) -> str:
+        key = hashlib.md5(key.encode('utf-8')).hexdigest()
+        return osp.join(self.cache_dir, f'{self._prefix}-{key}')
+
+    def __contains__(self, key: str) -> bool:
+        return osp.exists(self._get_path(key))
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Get the value of key.
+
+        Args:
+            key (str): The key.
+
+        Returns:
+            bytes | None: The cached value. None if the key is not cached.
+        """
+        path = self._get_path(key)
+        try:
+            with open(path, 'rb') as f:
+                value = f.read()
+            # mark as recently used
+            os.utime(path)
+        except FileNotFoundError:
+            # not cached or evicted by other processes
+            return None
+        return value
+
+    def put(self, key: str, value: bytes) -> bool:
+        """Put a value to the cache. The least recently used entries will be
+        evicted if the cache is full.
+
+        Args:
+            key (str): The key.
+            value (bytes): The value.
+
+        Returns:
+            bool: Whether the value is cached. Values larger than
+                ``max_size`` or failed to be written (e.g. the file system is
+                full) are not cached.
+        """
+        if len(value) > self.max_size:
+            return False
+        path = self._get_path(key)
+        with self._lock():
+            if osp.exists(path):
+                return True
+            total = self._read_size()
+            if total + len(value) > self.max_size:
+                total = self._evict(
+                    min(
+                        int(self.max_size * self.low_water_ratio),
+                        self.max_size - len(value)))
+            # write to a temporary file first, so that other processes never
+            # read an incomplete entry
+            tmp_path = f'{path}.{os.getpid()}.tmp'
+            try:
+                with open(tmp_path, 'wb') as f:
+                    f.write(value)
+                os.replace(tmp_path, path)
+            except OSError:
+                # e.g. ENOSPC, the cache is skipped instead of crashing
+                if osp.exists(tmp_path):
+                    os.remove(tmp_path)
+                self._write_size(total)
+                return False
+            self._write_size(total + len(value))
+        return True
+
+    def clear(self) -> None:
+        """Remove all entries of the namespace. Entries of other namespaces
+        sharing ``cache_dir`` are kept."""
+        with self._lock():
+            total = self._read_size()
+            for _, path, size in self._scan(f'{self._prefix}-'):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    continue
+                total -= size
+            self._write_size(max(total, 0))
+
+    @contextmanager
+    def _lock(self):
+        """Lock the cache across processes when writing."""
+        with open(self._lock_path, 'a') as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _read_size(self) -> int:
+        try:
+            with open(self._size_path) as f:
+                return int(f.read() or 0)
+        except FileNotFoundError:
+            return 0
+
+    def _write_size(self, size: int) -> None:
+        with open(self._size_path, 'w') as f:
+            f.write(str(size))
+
+    def _scan(self, prefix: str = '') -> List[Tuple[float, str, int]]:
+        """Scan the entries with the prefix in the order of access time.
+
+        Returns:
+            List[Tuple[float, str, int]]: The modification time, path and
+                size of each entry.
+        """
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if (entry.name.startswith('.') or entry.name.endswith('.tmp')
+                    or not entry.name.startswith(prefix)):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, entry.path, stat.st_size))
+        entries.sort()
+        return entries
+
+    def _evict(self, target_size: int) -> int:
+        """Evict the least recently used entries until the total size is not
+        larger than ``target_size``.
+
+        Returns:
+            int: The total size after eviction.
+        """
+        entries = self._scan()
+
+        # recount the total size in case of entries removed externally
+        total = sum([size for _, _, size in entries])
+        for _, path, size in entries:
+            if total <= target_size:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+        self._write_size(total)
+        return total
+
+
+def _get_index_dir(cache_dir: str, name: str, key_info: dict,
+                   watch_paths: Sequence[str]) -> str:
+    """Get the directory of an index, which changes with ``key_info`` and
+    the modification time of ``watch_paths``."""
+    mtimes = []
+    for path in watch_paths:
+        try:
+            mtimes.append(os.stat(path).st_mtime_ns)
+        except (OSError, ValueError):
+            # e.g. paths of remote backends, only the path is recorded
+            mtimes.append(None)
+    key = repr((sorted(key_info.items()), list(watch_paths), mtimes))
+    return osp.join(cache_dir,
+                    f'{name}_{hashlib.md5(key.encode()).hexdigest()}')
+
+
+def load_or_build_index(
+    cache_dir: str,
+    name: str,
+    key_info: dict,
+    build_fn: Callable[[], Dict[str, np.ndarray]],
+    watch_paths: Sequence[str] = ()
+) -> Dict[str, np.ndarray]:
+    """Load an array-backed index from the cache, or build and save it.
+
+    The index is saved as one ``.npy`` file per array under a directory
+    named by ``name`` and the md5 of ``key_info`` and the modification time
+    of ``watch_paths``, so that the cache is rebuilt once the arguments or
+    the watched folders change. Arrays are loaded with ``mmap_mode='r'``.
+
+    In distributed training, only rank 0 builds the index and the other
+    ranks load it after a barrier. If the cache is not visible to them, e.g.
+    ``cache_dir`` is not on a shared file system, they build their own.
+
+    Args:
+        cache_dir (str): Directory to save the index.
+        name (str): Prefix of the index directory.
+        key_info (dict): Arguments deciding the content of the index.
+        build_fn (Callable): Function returning a dict of arrays.
+        watch_paths (Sequence[str]): Paths whose modification time
+            invalidates the cache, e.g. the data folder and the annotation
+            file. Defaults to ().
+
+    Returns:
+        Dict[str, np.ndarray]: The memory-mapped arrays.
+    """
+    index_dir = _get_index_dir(cache_dir, name, key_info, watch_paths)
+    rank, world_size = get_dist_info()
+
+    if rank == 0 and not osp.isdir(index_dir):
+        _save_index(index_dir, build_fn())
+    if world_size > 1:
+        barrier()
+    if not osp.isdir(index_dir):
+        _save_index(index_dir, build_fn())
+
+    return {
+        osp.splitext(filename)[0]:
+        np.load(osp.join(index_dir, filename), mmap_mode='r')
+        for filename in os.listdir(index_dir)
+    }
+
+
+def _save_index(index_dir: str, arrays: Dict[str, np.ndarray]) -> None:
+    """Save arrays to a temporary directory and rename it to ``index_dir``,
+    so that readers never see a partial index."""
+    parent = osp.dirname(index_dir)
+    mkdir_or_exist(parent)
+    tmp_dir = tempfile.mkdtemp(dir=parent, prefix='.tmp_')
+    for name, array in arrays.items():
+        np.save(osp.join(tmp_dir, f'{name}.npy'), np.asarray(array))
+    try:
+        os.rename(tmp_dir, index_dir)
+    except OSError:
+        # saved by another process
+        shutil.rmtree(tmp_dir)
@@ -0,0 +1,231 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import mmap
+import os
+import os.path as osp
+from pathlib import Path
+from typing import Iterator, List, Optional, Sequence, Tuple, Union
+
+from mmengine import mkdir_or_exist
+from mmengine.fileio import register_backend
+from mmengine.fileio.backends import BaseStorageBackend
+
+SHARD_INDEX_FILE = 'index.txt'
+SHARD_TMPL = 'shard_{:05d}.bin'
+
+
+def write_shards(root: str,
+                 files: Sequence[str],
+                 out_dir: str,
+                 shard_size: int = 1024**3) -> List[str]:
+    """Pack files into large sequential shards with an offset index.
+
+    Files are written in the given order, so files read together (e.g. frames
+    of a clip) should be adjacent in ``files``. The index file has one line
+    per file in the format of ``<path> <shard index> <offset> <size>``, where
+    ``<path>`` is relative to ``root`` with '/' as separator.
+
+    Args:
+        root (str): Root directory of the files.
+        files (Sequence[str]): Paths of files relative to ``root``.
+        out_dir (str): Directory to save the shards and the index file.
+        shard_size (int): A new shard is started once the current shard is
+            larger than ``shard_size`` bytes. Defaults to 1024**3.
+
+    Returns:
+        List[str]: Filenames of the shards.
+    """
+    mkdir_or_exist(out_dir)
+    shards = []
+    shard, offset = None, 0
+    with open(osp.join(out_dir, SHARD_INDEX_FILE), 'w') as index:
+        for file in files:
+            if shard is None or offset >= shard_size:
+                if shard is not None:
+                    shard.close()
+                shards.append(SHARD_TMPL.format(len(shards)))
+                shard = open(osp.join(out_dir, shards[-1]), 'wb')
+                offset = 0
+            with open(osp.join(root, file), 'rb') as f:
+                content = f.read()
+            shard.write(content)
+            path = file.replace(os.sep, '/')
+            index.write(f'{path} {len(shards) - 1} {offset} {len(content)}\n')
+            offset += len(content)
+    if shard is not None:
+        shard.close()
+    return shards
+
+
+class ShardBackend(BaseStorageBackend):
+    """Storage backend reading files from memory-mapped shards.
+
+    The shards and the index file are generated by :func:`write_shards` or
+    ``tools/dataset_converters/shards/pack_shards.py``. Compared to a folder
+    with millions of small files, reading samples by offset from a few large
+    shards avoids per-file metadata operations and lets the kernel read ahead
+    sequentially, which is much faster on network file systems.
+
+    Paths under ``shard_dir`` are mapped to the packed files, so a dataset can
+    be switched to shards by setting ``data_root`` to ``shard_dir`` and
+    ``backend_args=dict(backend='shard', shard_dir=shard_dir)`` for both the
+    dataset and the loading transforms.
+
+    Args:
+        shard_dir (str): Directory of the shards and the index file.
+        index_file (str): Filename of the index file. Defaults to 'index.txt'.
+        sequential (bool): Whether to advise the kernel to read ahead the
+            shards sequentially. Suggested when the samples are read with
+            :class:`~mmagic.datasets.ShardShuffleSampler`. Defaults to True.
+    """
+
+    def __init__(self,
+                 shard_dir: Union[str, Path],
+                 index_file: str = SHARD_INDEX_FILE,
+                 sequential: bool = True) -> None:
+        self.shard_dir = str(shard_dir)
+        self.sequential = sequential
+
+        self._index = dict()
+        self._tree = {'': dict()}
+        num_shards = 0
+        with open(osp.join(self.shard_dir, index_file)) as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                path, shard, offset, size = line.rsplit(' ', 3)
+                self._index[path] = (int(shard), int(offset), int(size))
+                num_shards = max(num_shards, int(shard) + 1)
+                self._add_to_tree(path)
+        self._shard_files = [
+            osp.join(self.shard_dir, SHARD_TMPL.format(idx))
+            for idx in range(num_shards)
+        ]
+        # shards are memory-mapped lazily in each process
+        self._shards = dict()
+
+    def _add_to_tree(self, path: str) -> None:
+        """Add a file to the directory tree used for listing."""
+        parent = ''
+        parts = path.split('/')
+        for idx, name in enumerate(parts):
+            is_file = idx == len(parts) - 1
+            self._tree[parent][name] = is_file
+            if is_file:
+                break
+            parent = f'{parent}/{name}' if parent else name
+            self._tree.setdefault(parent, dict())
+
+    def _parse_path(self, filepath: Union[str, Path]) -> str:
+        """Convert a path to the key in the index."""
+        filepath = osp.normpath(str(filepath))
+        rel_path = osp.relpath(filepath, self.shard_dir)
+        if not rel_path.startswith(os.pardir):
+            filepath = rel_path
+        filepath = filepath.replace(os.sep, '/')
+        return '' if filepath == '.' else filepath
+
+    def _get_shard(self, idx: int) -> mmap.mmap:
+        if idx not in self._shards:
+            with open(self._shard_files[idx], 'rb') as f:
+                shard = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            if self.sequential and hasattr(mmap, 'MADV_SEQUENTIAL'):
+                shard.madvise(mmap.MADV_SEQUENTIAL)
+            self._shards[idx] = shard
+        return self._shards[idx]
+
+    def get(self, filepath: Union[str, Path]) -> bytes:
+        """Read bytes of a packed file.
+
+        Args:
+            filepath (str or Path): Path to read data.
+
+        Returns:
+            bytes: Expected bytes object.
+        """
+        path = self._parse_path(filepath)
+        if path not in self._index:
+            raise FileNotFoundError(
+                f'\'{filepath}\' is not found in the shards of '
+                f'\'{self.shard_dir}\'.')
+        shard, offset, size = self._index[path]
+        return self._get_shard(shard)[offset:offset + size]
+
+    def get_text(self,
+                 filepath: Union[str, Path],
+                 encoding: str = 'utf-8') -> str:
+        """Read text of a packed file.
+
+        Args:
+            filepath (str or Path): Path to read data.
+            encoding (str): The encoding format used to open the ``filepath``.
+                Defaults to 'utf-8'.
+
+        Returns:
+            str: Expected text reading from ``filepath``.
+        """
+        return self.get(filepath).decode(encoding)
+
+    def exists(self, filepath: Union[str, Path]) -> bool:
+        path = self._parse_path(filepath)
+        return path in self._index or path in self._tree
+
+    def isdir(self, filepath: Union[str, Path]) -> bool:
+        return self._parse_path(filepath) in self._tree
+
+    def isfile(self, filepath: Union[str, Path]) -> bool:
+        return self._parse_path(filepath) in self._index
+
+    def join_path(self, filepath: Union[str, Path],
+                  *filepaths: Union[str, Path]) -> str:
+        return osp.join(filepath, *filepaths)
+
+    def list_dir_or_file(self,
+                         dir_path: Union[str, Path],
+                         list_dir: bool = True,
+                         list_file: bool = True,
+                         suffix: Optional[Union[str, Tuple[str]]] = None,
+                         recursive: bool = False) -> Iterator[str]:
+        """Scan a packed directory to find the interested directories or
+        files in the packing order. The arguments are the same as
+        :meth:`mmengine.fileio.LocalBackend.list_dir_or_file`.
+
+        Yields:
+            Iterable[str]: A relative path to ``dir_path``.
+        """
+        if list_dir and suffix is not None:
+            raise TypeError('`suffix` should be None when `list_dir` is True')
+
+        if (suffix is not None) and not isinstance(suffix, (str, tuple)):
+            raise TypeError('`suffix` must be a string or tuple of strings')
+
+        dir_path = self._parse_path(dir_path)
+        if dir_path not in self._tree:
+            raise FileNotFoundError(
+                f'\'{dir_path}\' is not a directory in the shards of '
+                f'\'{self.shard_dir}\'.')
+
+        def _list_dir_or_file(dir_path, prefix):
+            for name, is_file in self._tree[dir_path].items():
+                rel_path = osp.join(prefix, name)
+                if is_file:
+                    if (suffix is None
+                            or rel_path.endswith(suffix)) and list_file:
+                        yield rel_path
+                else:
+                    if list_dir:
+                        yield rel_path
+                    if recursive:
+                        sub_dir = f'{dir_path}/{name}' if dir_path else name
+                        yield from _list_dir_or_file(sub_dir, rel_path)
+
+        return _list_dir_or_file(dir_path, '')
+
+    def __getstate__(self) -> dict:
+        # memory maps can not be pickled, they are reopened in workers
+        state = self.__dict__.copy()
+        state['_shards'] = dict()
+        return state
+
+
+register_backend('shard', ShardBackend)
@@ -0,0 +1,72 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import math
+from typing import Iterator, Optional, Sized
+
+import torch
+from mmengine.dataset import DefaultSampler
+
+from mmagic.registry import DATA_SAMPLERS
+
+
+@DATA_SAMPLERS.register_module()
+class ShardShuffleSampler(DefaultSampler):
+    """Sampler shuffling blocks of consecutive samples.
+
+    Samples packed by :func:`~mmagic.datasets.shard_backend.write_shards` are
+    stored in the order of the dataset, so consecutive samples are adjacent in
+    the shards. This sampler shuffles the order of blocks and the samples
+    within each block, instead of the whole dataset, so that each block is
+    read from a contiguous region of a shard and the disks keep streaming.
+
+    Args:
+        dataset (Sized): The dataset.
+        shuffle (bool): Whether shuffle the dataset or not. Defaults to True.
+        seed (int, optional): Random seed used to shuffle the sampler if
+            :attr:`shuffle=True`. This number should be identical across all
+            processes in the distributed group. Defaults to None.
+        round_up (bool): Whether to add extra samples to make the number of
+            samples evenly divisible by the world size. Defaults to True.
+        block_size (int): Number of consecutive samples in each block. A
+            block about the size of the readahead window, or of a shard, is
+            suggested. Defaults to 1024.
+    """
+
+    def __init__(self,
+                 dataset: Sized,
+                 shuffle: bool = True,
+                 seed: Optional[int] = None,
+                 round_up: bool = True,
+                 block_size: int = 1024) -> None:
+        super().__init__(
+            dataset=dataset, shuffle=shuffle, seed=seed, round_up=round_up)
+        assert block_size > 0, (
+            f'\'block_size\' must be positive, but got {block_size}.')
+        self.block_size = block_size
+
+    def __iter__(self) -> Iterator[int]:
+        """Iterate the indices."""
+        num_samples = len(self.dataset)
+        if self.shuffle:
+            # deterministically shuffle based on epoch and seed
+            g = torch.Generator()
+            g.manual_seed(self.seed + self.epoch)
+            num_blocks = math.ceil(num_samples / self.block_size)
+            indices = []
+            for block in torch.randperm(num_blocks, generator=g).tolist():
+                start = block * self.block_size
+                block_len = min(self.block_size, num_samples - start)
+                perm = torch.randperm(block_len, generator=g) + start
+                indices.extend(perm.tolist())
+        else:
+            indices = torch.arange(num_samples).tolist()
+
+        # add extra samples to make it evenly divisible
+        if self.round_up:
+            indices = (
+                indices *
+                int(self.total_size / len(indices) + 1))[:self.total_size]
+
+        # subsample
+        indices = indices[self.rank:self.total_size:self.world_size]
+
+        return iter(indices)
@@ -2,6 +2,10 @@
 # Reference: https://github.com/xinntao/BasicSR/blob/master/basicsr/data/degradations.py  # noqa
 # Original license: Copyright (c) 2020 xinntao, under the Apache 2.0 license.
 
+import hashlib
+import os
+import os.path as osp
+
 import numpy as np
 from scipy import special
 
@@ -534,3 +538,181 @@ def random_mixed_kernels(kernel_list,
         kernel = random_circular_lowpass_kernel(omega_range, kernel_size)
 
     return kernel
+
+
+def _sample_beta(beta_range, size):
+    """Sample shape parameters below and above 1 with equal probability, as
+    the random kernel functions do."""
+    low = np.random.uniform(beta_range[0], 1, size)
+    high = np.random.uniform(1, beta_range[1], size)
+    return np.where(np.random.uniform(size=size) <= 0.5, low, high)
+
+
+def random_mixed_kernels_batch(num_kernels,
+                               kernel_list,
+                               kernel_prob,
+                               kernel_size,
+                               sigma_x_range=[0.6, 5],
+                               sigma_y_range=[0.6, 5],
+                               rotation_range=[-np.pi, np.pi],
+                               beta_gaussian_range=[0.5, 8],
+                               beta_plateau_range=[1, 2],
+                               omega_range=[0, np.pi],
+                               noise_range=None):
+    """Randomly generate a batch of kernels with vectorized operations.
+
+    The kernels follow the same distribution as :func:`random_mixed_kernels`,
+    but the parameters of all kernels are sampled at once and the kernels are
+    computed on a shared mesh grid.
+
+    Args:
+        num_kernels (int): Number of kernels.
+        kernel_list (list): A list of kernel types. Choices are
+            'iso', 'aniso', 'generalized_iso', 'generalized_aniso',
+            'plateau_iso', 'plateau_aniso', 'sinc'.
+        kernel_prob (list): The probability of choosing of the corresponding
+            kernel.
+        kernel_size (int): The size of the kernel. It must be an odd number.
+        sigma_x_range (list, optional): The range of the standard deviation
+            along  the horizontal direction. Default: (0.6, 5).
+        sigma_y_range (list, optional): The range of the standard deviation
+            along the vertical direction. Default: (0.6, 5).
+        rotation_range (list, optional): Range of rotation in radian.
+            Default: (-np.pi, np.pi).
+        beta_gaussian_range (list, optional): The range of the shape parameter
+            for generalized Gaussian. Default: (0.5, 8).
+        beta_plateau_range (list, optional): The range of the shape parameter
+            for plateau kernel. Default: (1, 2).
+        omega_range (list, optional): The range of omega used in Sinc kernel.
+            Default: (0, np.pi).
+        noise_range (list, optional): Multiplicative kernel noise. Only
+            applied to Gaussian and generalized Gaussian kernels.
+            Default: None.
+
+    Returns:
+        kernels (np.ndarray): The kernels with shape
+            (num_kernels, kernel_size, kernel_size).
+    """
+
+    assert kernel_size % 2 == 1, 'Kernel size must be an odd number.'
+    supported = [
+        'iso', 'aniso', 'generalized_iso', 'generalized_aniso', 'plateau_iso',
+        'plateau_aniso', 'sinc'
+    ]
+    for kernel_type in kernel_list:
+        assert kernel_type in supported, (
+            f'Kernel type {kernel_type} is not supported.')
+    kernel_types = np.random.choice(kernel_list, num_kernels, p=kernel_prob)
+
+    # parameters of all kernels, only part of which are used by each type
+    is_iso = np.isin(kernel_types, ['iso', 'generalized_iso', 'plateau_iso'])
+    sigma_x = np.random.uniform(sigma_x_range[0], sigma_x_range[1],
+                                num_kernels)
+    sigma_y = np.random.uniform(sigma_y_range[0], sigma_y_range[1],
+                                num_kernels)
+    rotation = np.random.uniform(rotation_range[0], rotation_range[1],
+                                 num_kernels)
+    sigma_y = np.where(is_iso, sigma_x, sigma_y)
+    rotation = np.where(is_iso, 0, rotation)
+    beta = np.ones(num_kernels)
+    is_generalized = np.char.startswith(kernel_types, 'generalized')
+    is_plateau = np.char.startswith(kernel_types, 'plateau')
+    beta[is_generalized] = _sample_beta(beta_gaussian_range,
+                                        is_generalized.sum())
+    beta[is_plateau] = _sample_beta(beta_plateau_range, is_plateau.sum())
+
+    # inverse of the rotated sigma matrices, with shape (N, 2, 2)
+    cos, sin = np.cos(rotation), np.sin(rotation)
+    rot = np.stack([np.stack([cos, -sin], -1), np.stack([sin, cos], -1)], -2)
+    inv_diag = np.zeros((num_kernels, 2, 2))
+    inv_diag[:, 0, 0] = 1 / sigma_x**2
+    inv_diag[:, 1, 1] = 1 / sigma_y**2
+    inverse_sigma = rot @ inv_diag @ rot.transpose(0, 2, 1)
+
+    # quadratic forms of the grid, with shape (N, K, K)
+    grid, _, _ = _mesh_grid(kernel_size)
+    quad = np.einsum('hwi,nij,hwj->nhw', grid, inverse_sigma, grid)
+    beta = beta[:, None, None]
+    kernels = np.where(is_plateau[:, None, None],
+                       np.reciprocal(np.power(quad, beta) + 1),
+                       np.exp(-0.5 * np.power(quad, beta)))
+
+    if noise_range is not None:
+        assert noise_range[0] <= noise_range[1], 'Wrong noise range.'
+        noise = np.random.uniform(noise_range[0], noise_range[1],
+                                  kernels.shape)
+        is_gaussian = ~(is_plateau | (kernel_types == 'sinc'))
+        kernels = np.where(is_gaussian[:, None, None], kernels * noise,
+                           kernels)
+
+    is_sinc = kernel_types == 'sinc'
+    if is_sinc.any():
+        omega = np.random.uniform(omega_range[0], omega_range[-1],
+                                  is_sinc.sum())[:, None, None]
+        radius = np.sqrt(np.sum(grid**2, axis=-1))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            sinc = omega * special.j1(omega * radius) / (2 * np.pi * radius)
+        center = kernel_size // 2
+        sinc[:, center, center] = omega[:, 0, 0]**2 / (4 * np.pi)
+        kernels[is_sinc] = sinc
+
+    kernels = kernels / np.sum(kernels, axis=(1, 2), keepdims=True)
+
+    return kernels
+
+
+def generate_kernel_bank(num_kernels,
+                         kernel_list,
+                         kernel_prob,
+                         kernel_size,
+                         bank_dir=None,
+                         **kwargs):
+    """Generate a bank of random kernels with
+    :func:`random_mixed_kernels_batch`.
+
+    Sampling kernels from a precomputed bank is much faster than generating
+    a kernel for each sample. If ``bank_dir`` is given, the bank is saved to
+    it and memory-mapped, so that the bank is generated only once and shared
+    by all processes.
+
+    Args:
+        num_kernels (int): Number of kernels in the bank.
+        kernel_list (list): A list of kernel types.
+        kernel_prob (list): The probability of choosing of the corresponding
+            kernel.
+        kernel_size (int): The size of the kernel.
+        bank_dir (str, optional): The directory to save the bank. The bank
+            is reused if a bank with the same arguments exists.
+            Default: None.
+        kwargs (dict): Other arguments of :func:`random_mixed_kernels_batch`.
+
+    Returns:
+        np.ndarray: The kernels in float32 with shape
+            (num_kernels, kernel_size, kernel_size).
+    """
+
+    args = dict(
+        num_kernels=num_kernels,
+        kernel_list=list(kernel_list),
+        kernel_prob=list(kernel_prob),
+        kernel_size=kernel_size,
+        **kwargs)
+
+    if bank_dir is not None:
+        key = hashlib.md5(repr(sorted(args.items())).encode()).hexdigest()
+        filename = osp.join(bank_dir, f'kernel_bank_{key}.npy')
+        if osp.exists(filename):
+            return np.load(filename, mmap_mode='r')
+
+    kernels = random_mixed_kernels_batch(**args).astype(np.float32)
+
+    if bank_dir is not None:
+        os.makedirs(bank_dir, exist_ok=True)
+        # write to a temporary file first since other processes may be
+        # generating the same bank
+        tmp_filename = f'{filename[:-4]}_{os.getpid()}.tmp.npy'
+        np.save(tmp_filename, kernels)
+        os.replace(tmp_filename, filename)
+        kernels = np.load(filename, mmap_mode='r')
+
+    return kernels
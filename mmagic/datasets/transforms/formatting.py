@@ -26,6 +26,11 @@ class PackInputs(BaseTransform):
         meta_keys Tuple[List[str], str, None]: The meta keys to saved
             in `metainfo` of the `data_samples`. All the other data will
             be packed into the data of the `data_samples`
+        pack_tensor (bool): Whether to convert the inputs to tensors. If
+            False, images in inputs are kept as (H, W, C) arrays and are
+            written into the batch tensor by
+            :func:`~mmagic.datasets.packed_collate` directly, which must be
+            used as the collate function. Defaults to True.
     """
 
     def __init__(
@@ -33,6 +38,7 @@ class PackInputs(BaseTransform):
         keys: Tuple[List[str], str] = ['merged', 'img'],
         meta_keys: Tuple[List[str], str] = [],
         data_keys: Tuple[List[str], str] = [],
+        pack_tensor: bool = True,
     ) -> None:
 
         assert keys is not None, \
@@ -47,6 +53,7 @@ class PackInputs(BaseTransform):
                                                  List) else [data_keys]
         self.meta_keys = meta_keys if isinstance(meta_keys,
                                                  List) else [meta_keys]
+        self.pack_tensor = pack_tensor
 
     def transform(self, results: dict) -> dict:
         """Method to pack the input data.
@@ -70,7 +77,7 @@ class PackInputs(BaseTransform):
         for k in self.keys:
             value = results.get(k, None)
             if value is not None:
-                inputs[k] = all_to_tensor(value)
+                inputs[k] = all_to_tensor(value) if self.pack_tensor else value
 
         # return the inputs as tensor, if it has only one item
         if len(inputs.values()) == 1:
@@ -76,13 +76,11 @@ class GenerateFrameIndices(BaseTransform):
             range(center_frame_idx - num_half_frames * interval,
                   center_frame_idx + num_half_frames * interval + 1, interval))
 
-        img_path_root = results['img_path']
-        gt_path_root = results['gt_path']
-        img_path = [
-            osp.join(img_path_root, clip_name, f'{v:08d}.png')
-            for v in neighbor_list
-        ]
-        gt_path = [osp.join(gt_path_root, clip_name, f'{frame_name}.png')]
+        # join the clip folder once, which is the same as joining each path
+        img_prefix = osp.join(results['img_path'], clip_name, '')
+        gt_prefix = osp.join(results['gt_path'], clip_name, '')
+        img_path = [f'{img_prefix}{v:08d}.png' for v in neighbor_list]
+        gt_path = [f'{gt_prefix}{frame_name}.png']
 
         results['img_path'] = img_path
         results['gt_path'] = gt_path
@@ -183,14 +181,13 @@ class GenerateFrameIndiceswithPadding(BaseTransform):
                 pad_idx = i
             frame_list.append(pad_idx)
 
-        img_path_root = results['img_path']
-        gt_path_root = results['gt_path']
+        img_prefix = osp.join(results['img_path'], clip_name, '')
+        gt_prefix = osp.join(results['gt_path'], clip_name, '')
         img_paths = [
-            osp.join(img_path_root, clip_name,
-                     f'{self.filename_tmpl.format(idx)}.png')
+            f'{img_prefix}{self.filename_tmpl.format(idx)}.png'
             for idx in frame_list
         ]
-        gt_paths = [osp.join(gt_path_root, clip_name, f'{frame_name}.png')]
+        gt_paths = [f'{gt_prefix}{frame_name}.png']
 
         results['img_path'] = img_paths
         results['gt_path'] = gt_paths
@@ -274,17 +271,12 @@ class GenerateSegmentIndices(BaseTransform):
         neighbor_list = list(range(start_frame_idx, end_frame_idx, interval))
         neighbor_list = [v + self.start_idx for v in neighbor_list]
 
-        # add the corresponding file paths
-        img_path_root = results['img_path']
-        gt_path_root = results['gt_path']
-        img_path = [
-            osp.join(img_path_root, clip_name, self.filename_tmpl.format(v))
-            for v in neighbor_list
-        ]
-        gt_path = [
-            osp.join(gt_path_root, clip_name, self.filename_tmpl.format(v))
-            for v in neighbor_list
-        ]
+        # add the corresponding file paths, the clip folders are joined once
+        filenames = [self.filename_tmpl.format(v) for v in neighbor_list]
+        img_prefix = osp.join(results['img_path'], clip_name, '')
+        gt_prefix = osp.join(results['gt_path'], clip_name, '')
+        img_path = [img_prefix + filename for filename in filenames]
+        gt_path = [gt_prefix + filename for filename in filenames]
 
         results['img_path'] = img_path
         results['gt_path'] = gt_path
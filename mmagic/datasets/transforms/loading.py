@@ -1,15 +1,54 @@
 # Copyright (c) OpenMMLab. All rights reserved.
+import io
+import json
+import os
 import os.path as osp
-from typing import List, Optional, Tuple
+from typing import Callable, List, Optional, Tuple
 
 import mmcv
 import numpy as np
 from mmcv.transforms import BaseTransform
-from mmengine.fileio import get_file_backend, list_from_file
+from mmengine.fileio import LocalBackend, get_file_backend, list_from_file
 
 from mmagic.registry import TRANSFORMS
 from mmagic.utils import (bbox2mask, brush_stroke_mask, get_irregular_mask,
                           random_bbox)
+from ..data_utils import SharedFileCache
+
+
+class LazyImage:
+    """An image whose pixels are only read and converted when it is indexed.
+
+    It wraps a memory-mapped array, so the shape is known from the header and
+    slicing (e.g. ``img[top:bottom, left:right, ...]`` in crop transforms)
+    only reads the required region from disk.
+
+    Args:
+        array (np.ndarray): Memory-mapped array with shape (H, W) or
+            (H, W, C).
+        convert (Callable): Function to convert the read region to the
+            required format.
+    """
+
+    def __init__(self, array: np.ndarray, convert: Callable) -> None:
+        self.array = array
+        self.convert = convert
+        # infer the number of channels after conversion with one pixel
+        channels = convert(np.array(array[:1, :1])).shape[2]
+        self.shape = (*array.shape[:2], channels)
+        self.ndim = 3
+
+    def __getitem__(self, index) -> np.ndarray:
+        if not isinstance(index, tuple):
+            index = (index, )
+        if not all(isinstance(i, slice) for i in index[:2]):
+            return np.asarray(self)[index]
+        img = self.convert(np.array(self.array[index[:2]]))
+        return img[(slice(None), ) * 2 + index[2:]]
+
+    def __array__(self, dtype=None) -> np.ndarray:
+        img = self.convert(np.array(self.array))
+        return img if dtype is None else img.astype(dtype)
 
 
 @TRANSFORMS.register_module()
@@ -34,7 +73,10 @@ class LoadImageFromFile(BaseTransform):
             See :func:``mmcv.imfrombytes`` for details.
             candidates are 'cv2', 'turbojpeg', 'pillow', and 'tifffile'.
             Defaults to None.
-        use_cache (bool): If True, load all images at once. Default: False.
+        use_cache (bool): If True, cache the images in a
+            :class:`~mmagic.datasets.data_utils.SharedFileCache`, which is
+            shared by all DataLoader workers on the node and bounded in size.
+            Default: False.
         to_float32 (bool): Whether to convert the loaded image to a float32
             numpy array. If set to False, the loaded image is an uint8 array.
             Defaults to False.
@@ -43,6 +85,22 @@ class LoadImageFromFile(BaseTransform):
             Defaults to False.
         backend_args (dict, optional): Arguments to instantiate the prefix of
             uri corresponding backend. Defaults to None.
+        lazy (bool): If True, local '.npy' files and uncompressed TIFF files
+            are memory-mapped and loaded as :class:`LazyImage`. Only the
+            header is read at loading, and the region selected by the
+            following crop transform (e.g. :class:`PairedRandomCrop`) is read
+            and converted. Images in '.npy' are assumed to be stored in 'bgr'
+            order, and TIFF files in 'rgb' order. Other files are decoded as
+            usual. Note that crop transforms should directly follow the
+            loading. Defaults to False.
+        cache_cfg (dict, optional): Arguments of the
+            :class:`~mmagic.datasets.data_utils.SharedFileCache`, e.g.
+            ``dict(cache_dir='/dev/shm/div2k', max_size=8 * 1024**3,
+            namespace='div2k')``. Only works when ``use_cache`` is True.
+            Defaults to None.
+        cache_decoded (bool): Whether to cache the decoded arrays instead of
+            the encoded bytes, so that images are decoded only once per node.
+            Defaults to False.
     """
 
     def __init__(
@@ -56,6 +114,9 @@ class LoadImageFromFile(BaseTransform):
         to_y_channel: bool = False,
         save_original_img: bool = False,
         backend_args: Optional[dict] = None,
+        lazy: bool = False,
+        cache_cfg: Optional[dict] = None,
+        cache_decoded: bool = False,
     ) -> None:
 
         self.key = key
@@ -74,12 +135,18 @@ class LoadImageFromFile(BaseTransform):
 
         # cache
         self.use_cache = use_cache
-        self.cache = dict()
+        self.cache_decoded = cache_decoded
+        self.cache = SharedFileCache(
+            **(cache_cfg or dict())) if use_cache else None
 
         # convert
         self.to_float32 = to_float32
         self.to_y_channel = to_y_channel
 
+        assert not (lazy and save_original_img), (
+            '\'save_original_img\' is not supported for lazy loading.')
+        self.lazy = lazy
+
     def transform(self, results: dict) -> dict:
         """Functions to load image or frames.
 
@@ -104,8 +171,10 @@ class LoadImageFromFile(BaseTransform):
             ori_imgs = []
 
         for filename in filenames:
-            img = self._load_image(filename)
-            img = self._convert(img)
+            img = self._load_lazy_image(filename) if self.lazy else None
+            if img is None:
+                img = self._load_image(filename)
+                img = self._convert(img)
             images.append(img)
             shapes.append(img.shape)
             if self.save_original_img:
@@ -142,12 +211,18 @@ class LoadImageFromFile(BaseTransform):
                 'backend', None) == 'lmdb'):
             filename, _ = osp.splitext(osp.basename(filename))
 
-        if filename in self.cache:
-            img_bytes = self.cache[filename]
-        else:
+        img_bytes = None
+        if self.use_cache:
+            cache_key = self._get_cache_key(filename)
+            cached = self.cache.get(cache_key)
+            if cached is not None and self.cache_decoded:
+                return np.load(io.BytesIO(cached))
+            img_bytes = cached
+
+        if img_bytes is None:
             img_bytes = self.file_backend.get(filename)
-            if self.use_cache:
-                self.cache[filename] = img_bytes
+            if self.use_cache and not self.cache_decoded:
+                self.cache.put(cache_key, img_bytes)
 
         img = mmcv.imfrombytes(
             content=img_bytes,
@@ -155,8 +230,102 @@ class LoadImageFromFile(BaseTransform):
             channel_order=self.channel_order,
             backend=self.imdecode_backend)
 
+        if self.use_cache and self.cache_decoded:
+            buffer = io.BytesIO()
+            np.save(buffer, img)
+            self.cache.put(cache_key, buffer.getvalue())
+
         return img
 
+    def _get_cache_key(self, filename) -> str:
+        """Get the key of an image in the cache. The modification time and
+        size of local files are included, so modified files are reloaded. The
+        key is prefixed with the backend and its arguments (e.g. ``db_path``
+        of lmdb), since names in different databases may be the same.
+
+        Args:
+            filename (str): Path of image file.
+        Returns:
+            str: The key.
+        """
+        key = str(filename)
+        if isinstance(self.file_backend, LocalBackend) and osp.exists(key):
+            stat = os.stat(key)
+            key = f'{osp.abspath(key)}:{stat.st_mtime_ns}:{stat.st_size}'
+        backend_args = json.dumps(
+            self.backend_args, sort_keys=True, default=str)
+        key = f'{type(self.file_backend).__name__}:{backend_args}:{key}'
+        if self.cache_decoded:
+            key = (f'{key}:{self.color_type}:{self.channel_order}:'
+                   f'{self.imdecode_backend}')
+        return key
+
+    def _load_lazy_image(self, filename) -> Optional[LazyImage]:
+        """Memory-map an image from a local '.npy' or uncompressed TIFF file.
+
+        Args:
+            filename (str): Path of image file.
+        Returns:
+            LazyImage | None: The lazy image. None if the file can not be
+                memory-mapped.
+        """
+        if self.file_backend is None:
+            self.file_backend = get_file_backend(
+                uri=filename, backend_args=self.backend_args)
+        if not isinstance(self.file_backend, LocalBackend):
+            return None
+
+        ext = osp.splitext(filename)[1].lower()
+        if ext == '.npy':
+            array = np.load(filename, mmap_mode='r')
+        elif ext in ['.tif', '.tiff']:
+            try:
+                import tifffile
+                array = tifffile.memmap(filename, mode='r')
+            except (ImportError, ValueError):
+                # compressed or tiled files can not be memory-mapped
+                return None
+            # TIFF files are stored in 'rgb' order
+            return LazyImage(array, self._convert_rgb_region)
+        else:
+            return None
+
+        return LazyImage(array, self._convert_region)
+
+    def _convert_rgb_region(self, img: np.ndarray) -> np.ndarray:
+        """Convert a region of a memory-mapped image in 'rgb' order to the
+        require format.
+
+        Args:
+            img (np.ndarray): The region of original image.
+        Returns:
+            np.ndarray: The converted region.
+        """
+        if img.ndim == 3 and img.shape[2] == 3:
+            img = img[..., ::-1]
+        return self._convert_region(img)
+
+    def _convert_region(self, img: np.ndarray) -> np.ndarray:
+        """Convert a region of a memory-mapped image in 'bgr' order to the
+        require format, the same as decoding with :func:`mmcv.imfrombytes`.
+
+        Args:
+            img (np.ndarray): The region of original image.
+        Returns:
+            np.ndarray: The converted region.
+        """
+        if img.ndim == 3 and img.shape[2] == 1:
+            img = img[..., 0]
+        if self.color_type == 'grayscale':
+            if img.ndim == 3:
+                img = mmcv.bgr2gray(img)
+        elif self.color_type == 'color' and img.ndim == 2:
+            img = mmcv.gray2bgr(img)
+        if (img.ndim == 3 and img.shape[2] == 3
+                and self.channel_order.lower() == 'rgb'):
+            img = mmcv.bgr2rgb(img)
+        return self._convert(img)
+
     def _convert(self, img: np.ndarray):
         """Convert an image to the require format.
 
@@ -195,7 +364,8 @@ class LoadImageFromFile(BaseTransform):
                     f'to_float32={self.to_float32}, '
                     f'to_y_channel={self.to_y_channel}, '
                     f'save_original_img={self.save_original_img}, '
-                    f'backend_args={self.backend_args})')
+                    f'backend_args={self.backend_args}, '
+                    f'lazy={self.lazy})')
 
         return repr_str
 
@@ -2,8 +2,11 @@
 # Reference:
 # https://github.com/fatheral/matlab_imresize/blob/master/imresize.py
 # Original license: Copyright (c) 2020 fatheral, under the MIT License.
+from functools import lru_cache
+
 import numpy as np
 from mmcv.transforms import BaseTransform
+from scipy import sparse
 
 from mmagic.registry import TRANSFORMS
 
@@ -124,6 +127,80 @@ def get_weights_indices(input_length, output_length, scale, kernel,
     return weights, indices
 
 
+@lru_cache(maxsize=64)
+def get_resize_matrix(input_length,
+                      output_length,
+                      scale,
+                      kernel,
+                      kernel_width,
+                      num_channels=1):
+    """Get the sparse interpolation matrix, which maps the input sequence to
+    the output sequence. The matrices are cached since they only depend on
+    the arguments.
+
+    Args:
+        input_length (int): Length of the input sequence.
+        output_length (int): Length of the output sequence.
+        scale (float): Scale factor.
+        kernel (func): The kernel used for resizing.
+        kernel_width (int): The width of the kernel.
+        num_channels (int): Number of interleaved channels of each element in
+            the sequence. The matrix is expanded to resize all channels at
+            once. Default: 1.
+
+    Returns:
+        scipy.sparse.csr_matrix: The interpolation matrix with shape
+            (output_length * num_channels, input_length * num_channels).
+    """
+    weights, indices = get_weights_indices(input_length, output_length, scale,
+                                           kernel, kernel_width)
+    weights = weights.reshape(output_length, -1)
+    indices = indices.reshape(output_length, -1)
+    if num_channels > 1:
+        # the k-th channel of each pixel is mapped to the same channel
+        channels = np.arange(num_channels)
+        weights = np.repeat(weights, num_channels, axis=0)
+        indices = (
+            np.repeat(indices, num_channels, axis=0) * num_channels +
+            np.tile(channels, output_length)[:, np.newaxis])
+    # the matrix is built from the entries directly, so that the weights of
+    # the same (mirrored) input pixel are not summed and the entries keep the
+    # order of :func:`resize_along_dim`, which gives bit-exact results
+    indptr = np.arange(0, weights.size + 1, weights.shape[1])
+    return sparse.csr_matrix(
+        (weights.ravel(), indices.ravel(), indptr),
+        shape=(output_length * num_channels, input_length * num_channels))
+
+
+def resize_along_dim_vectorized(img_in, matrix, dim):
+    """Resize along a specific dimension with one sparse matrix
+    multiplication instead of a loop over output pixels.
+
+    The output is bit-exact with :func:`resize_along_dim`, since the
+    products are computed in float32 and summed in the same order.
+
+    Args:
+        img_in (np.ndarray): The input image.
+        matrix (scipy.sparse.csr_matrix): The interpolation matrix computed
+            from [get_resize_matrix]. For ``dim=1``, ``num_channels`` should
+            be the number of elements of each pixel.
+        dim (int): Which dimension to undergo interpolation, 0 or 1.
+
+    Returns:
+        np.ndarray: Interpolated (along one dimension) image.
+    """
+
+    img_in = img_in.astype(np.float32)
+    h, w = img_in.shape[:2]
+    img_2d = img_in.reshape(h, -1)
+    if dim == 0:
+        img_out = (matrix @ img_2d).reshape(-1, *img_in.shape[1:])
+    else:
+        img_out = (matrix @ img_2d.T).T.reshape(h, -1, *img_in.shape[2:])
+
+    return img_out.astype(np.float64)
+
+
 def resize_along_dim(img_in, weights, indices, dim):
     """Resize along a specific dimension.
 
@@ -188,6 +265,10 @@ class MATLABLikeResize(BaseTransform):
             Currently support 'bicubic' only. Default: 'bicubic'.
         kernel_width (float): The kernel width. Currently support 4.0 only.
             Default: 4.0.
+        vectorized (bool): Whether to resize with cached sparse interpolation
+            matrices, one matrix multiplication per dimension, which is much
+            faster for large images. The results are the same as the loop
+            over output pixels. Default: False.
     """
 
     def __init__(self,
@@ -195,7 +276,8 @@ class MATLABLikeResize(BaseTransform):
                  scale=None,
                  output_shape=None,
                  kernel='bicubic',
-                 kernel_width=4.0):
+                 kernel_width=4.0,
+                 vectorized=False):
 
         if kernel.lower() != 'bicubic':
             raise ValueError('Currently support bicubic kernel only.')
@@ -212,6 +294,7 @@ class MATLABLikeResize(BaseTransform):
         self.output_shape = output_shape
         self.kernel = kernel
         self.kernel_width = kernel_width
+        self.vectorized = vectorized
 
     def _resize(self, img):
         """resize an image to the require size.
@@ -235,6 +318,16 @@ class MATLABLikeResize(BaseTransform):
 
         # apply cubic interpolation along two dimensions
         order = np.argsort(np.array(scale))
+        if self.vectorized:
+            output = img if img.ndim == 3 else img[:, :, np.newaxis]
+            for dim in order:
+                num_channels = int(np.prod(output.shape[2:])) if dim else 1
+                matrix = get_resize_matrix(img.shape[dim], output_size[dim],
+                                           scale[dim], self.kernel_func,
+                                           self.kernel_width, num_channels)
+                output = resize_along_dim_vectorized(output, matrix, dim)
+            return output
+
         for k in range(2):
             key = (img.shape[k], output_size[k], scale[k], self.kernel_func,
                    self.kernel_width)
@@ -288,6 +381,7 @@ class MATLABLikeResize(BaseTransform):
         repr_str += (
             f'(keys={self.keys}, scale={self.scale}, '
             f'output_shape={self.output_shape}, '
-            f'kernel={self.kernel}, kernel_width={self.kernel_width})')
+            f'kernel={self.kernel}, kernel_width={self.kernel_width}, '
+            f'vectorized={self.vectorized})')
 
         return repr_str
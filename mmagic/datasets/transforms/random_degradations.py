@@ -2,6 +2,8 @@
 import io
 import logging
 import random
+from fractions import Fraction
+from functools import lru_cache
 
 import cv2
 import numpy as np
@@ -22,6 +24,15 @@ class RandomBlur:
 
     Modified keys are the attributed specified in "keys".
 
+    If ``params['kernel_bank']`` is given, e.g.
+    ``dict(num_kernels=10000, bank_dir=None)``, a bank of kernels is generated
+    for each kernel size by :func:`blur_kernels.generate_kernel_bank` when
+    the transform is built, and kernels are randomly drawn from the bank
+    instead of generated for each sample. The shape parameters of the kernels
+    in the bank follow :func:`blur_kernels.random_mixed_kernels`. Kernel steps
+    are not supported with the bank, all frames of a sequence share the same
+    kernel.
+
     Args:
         params (dict): A dictionary specifying the degradation settings.
         keys (list[str]): A list specifying the keys whose values are
@@ -32,6 +43,49 @@ class RandomBlur:
         self.keys = keys
         self.params = params
 
+        self.kernel_banks = None
+        if params.get('kernel_bank', None) is not None:
+            self.kernel_banks = {
+                kernel_size: self._build_kernel_bank(kernel_size)
+                for kernel_size in params['kernel_size']
+            }
+
+    def _build_kernel_bank(self, kernel_size: int):
+        """Generate the kernel bank of the given kernel size.
+
+        Args:
+            kernel_size (int): The size of the kernels.
+
+        Returns:
+            np.ndarray: Kernels with shape (N, kernel_size, kernel_size).
+        """
+        for step in [
+                'sigma_x_step', 'sigma_y_step', 'rotate_angle_step',
+                'beta_gaussian_step', 'beta_plateau_step', 'omega_step'
+        ]:
+            assert self.params.get(
+                step,
+                0) == 0, (f'\'{step}\' is not supported with the kernel bank.')
+
+        omega_range = self.params.get('omega', None)
+        if omega_range is None:  # follow Real-ESRGAN settings if not specified
+            if kernel_size < 13:
+                omega_range = [np.pi / 3., np.pi]
+            else:
+                omega_range = [np.pi / 5., np.pi]
+
+        return blur_kernels.generate_kernel_bank(
+            kernel_list=self.params['kernel_list'],
+            kernel_prob=self.params['kernel_prob'],
+            kernel_size=kernel_size,
+            sigma_x_range=self.params.get('sigma_x', [0, 0]),
+            sigma_y_range=self.params.get('sigma_y', [0, 0]),
+            rotation_range=self.params.get('rotate_angle', [-np.pi, np.pi]),
+            beta_gaussian_range=self.params.get('beta_gaussian', [0.5, 4]),
+            beta_plateau_range=self.params.get('beta_plateau', [1, 2]),
+            omega_range=omega_range,
+            **self.params['kernel_bank'])
+
     def get_kernel(self, num_kernels: int):
         """This is the function to create kernel.
 
@@ -39,8 +93,13 @@ class RandomBlur:
             num_kernels (int): the number of kernels
 
         Returns:
-            _type_: _description_
+            list[np.ndarray]: The kernels.
         """
+        if self.kernel_banks is not None:
+            bank = self.kernel_banks[random.choice(self.params['kernel_size'])]
+            kernel = bank[np.random.randint(len(bank))]
+            return [kernel] * num_kernels
+
         kernel_type = np.random.choice(
             self.params['kernel_list'], p=self.params['kernel_prob'])
         kernel_size = random.choice(self.params['kernel_size'])
@@ -365,30 +424,25 @@ class RandomResize:
             area=cv2.INTER_AREA,
             lanczos=cv2.INTER_LANCZOS4)
 
-    def _random_resize(self, imgs):
-        """This is the function used to randomly resize images for training
-        augmentation.
+    def get_resize_params(self, h, w, num_imgs):
+        """Randomly sample the interpolation method and the target size of
+        each image.
 
         Args:
-            imgs (Tensor): training images.
+            h (int): Height of the first image.
+            w (int): Width of the first image.
+            num_imgs (int): Number of images.
 
         Returns:
-            Tensor: images after randomly resized
+            tuple(str, list[tuple[int]]): The interpolation method and the
+                target size (h, w) of each image.
         """
-        is_single_image = False
-        if isinstance(imgs, np.ndarray):
-            is_single_image = True
-            imgs = [imgs]
-
-        h, w = imgs[0].shape[:2]
-
         resize_opt = self.params['resize_opt']
         resize_prob = self.params['resize_prob']
         resize_opt = np.random.choice(resize_opt, p=resize_prob).lower()
         if resize_opt not in self.resize_dict:
             raise NotImplementedError(f'resize_opt [{resize_opt}] is not '
                                       'implemented')
-        resize_opt = self.resize_dict[resize_opt]
 
         resize_step = self.params.get('resize_step', 0)
 
@@ -413,29 +467,51 @@ class RandomResize:
         else:
             resize_step = 0
 
-        # resize the input
         if resize_step == 0:  # same target_size for all input images
-            outputs = [
-                cv2.resize(img, target_size[::-1], interpolation=resize_opt)
-                for img in imgs
-            ]
-        else:  # different target_size for each input image
-            outputs = []
-            for img in imgs:
-                img = cv2.resize(
-                    img, target_size[::-1], interpolation=resize_opt)
-                outputs.append(img)
+            return resize_opt, [target_size] * num_imgs
+
+        # different target_size for each input image
+        target_sizes = []
+        for _ in range(num_imgs):
+            target_sizes.append(target_size)
+
+            # update scale
+            scale_factor += np.random.uniform(-resize_step, resize_step)
+            scale_factor = np.clip(scale_factor, resize_scale[0],
+                                   resize_scale[1])
 
-                # update scale
-                scale_factor += np.random.uniform(-resize_step, resize_step)
-                scale_factor = np.clip(scale_factor, resize_scale[0],
-                                       resize_scale[1])
+            # determine output size
+            h_out, w_out = h * scale_factor, w * scale_factor
+            if self.params.get('is_size_even', False):
+                h_out, w_out = 2 * (h_out // 2), 2 * (w_out // 2)
+            target_size = (int(h_out), int(w_out))
 
-                # determine output size
-                h_out, w_out = h * scale_factor, w * scale_factor
-                if self.params.get('is_size_even', False):
-                    h_out, w_out = 2 * (h_out // 2), 2 * (w_out // 2)
-                target_size = (int(h_out), int(w_out))
+        return resize_opt, target_sizes
+
+    def _random_resize(self, imgs):
+        """This is the function used to randomly resize images for training
+        augmentation.
+
+        Args:
+            imgs (Tensor): training images.
+
+        Returns:
+            Tensor: images after randomly resized
+        """
+        is_single_image = False
+        if isinstance(imgs, np.ndarray):
+            is_single_image = True
+            imgs = [imgs]
+
+        h, w = imgs[0].shape[:2]
+        resize_opt, target_sizes = self.get_resize_params(h, w, len(imgs))
+        resize_opt = self.resize_dict[resize_opt]
+
+        # resize the input
+        outputs = [
+            cv2.resize(img, target_size[::-1], interpolation=resize_opt)
+            for img, target_size in zip(imgs, target_sizes)
+        ]
 
         if is_single_image:
             outputs = outputs[0]
@@ -457,12 +533,37 @@ class RandomResize:
         return repr_str
 
 
+@lru_cache()
+def _get_decoder_name(codec_id):
+    """Get the name of the software decoder of a codec id, since encoders
+    such as 'libx264' have no decoder of the same name."""
+    names = []
+    for name in av.codecs_available:
+        try:
+            codec = av.Codec(name, 'r')
+        except Exception:
+            continue
+        # `Codec.hardware` is not available in all versions of PyAV
+        if codec.id == codec_id and not getattr(codec, 'hardware', False):
+            names.append(name)
+    assert len(names) > 0, f'Cannot find the decoder of codec {codec_id}.'
+    # e.g. prefer 'h264' to other implementations such as 'h264_v4l2m2m'
+    return min(names, key=lambda name: (len(name), name))
+
+
 @TRANSFORMS.register_module()
 class RandomVideoCompression:
     """Apply random video compression to the input.
 
     Modified keys are the attributed specified in "keys".
 
+    By default, the frames are muxed to an in-memory mp4 container and
+    demuxed again. If ``params['pooled']`` is True, the raw packets of the
+    encoder are fed to the decoder directly without any container, the
+    decoders are reused across clips in each process, and the frames are
+    decoded into a preallocated uint8 buffer. The encoder is still created
+    for each clip since it can not be reused once flushed.
+
     Args:
         params (dict): A dictionary specifying the degradation settings.
         keys (list[str]): A list specifying the keys whose values are
@@ -476,6 +577,69 @@ class RandomVideoCompression:
         self.params = params
         logging.getLogger('libav').setLevel(50)
 
+        # decoders reused by the pooled path, created lazily in each process
+        self._decoders = dict()
+
+    def _get_decoder(self, codec_name):
+        """Get the pooled decoder of a codec.
+
+        Args:
+            codec_name (str): Name of the codec, e.g. 'h264'.
+
+        Returns:
+            av.CodecContext: The decoder.
+        """
+        if codec_name not in self._decoders:
+            self._decoders[codec_name] = av.CodecContext.create(
+                codec_name, 'r')
+        return self._decoders[codec_name]
+
+    def _apply_pooled_compression(self, imgs, codec, bitrate):
+        """Compress images by raw packets with the pooled decoders.
+
+        Args:
+            imgs (list[np.ndarray]): Training images.
+            codec (str): Name of the encoder.
+            bitrate (int): Bitrate of the encoder.
+
+        Returns:
+            list[np.ndarray]: Images after compressed.
+        """
+        height, width = imgs[0].shape[:2]
+        encoder = av.CodecContext.create(codec, 'w')
+        encoder.height = height
+        encoder.width = width
+        encoder.pix_fmt = 'yuv420p'
+        encoder.bit_rate = bitrate
+        encoder.time_base = Fraction(1, 1)
+        encoder.framerate = Fraction(1, 1)
+
+        packets = []
+        for idx, img in enumerate(imgs):
+            img = img.astype(np.uint8)
+            frame = av.VideoFrame.from_ndarray(img, format='rgb24')
+            frame.pts = idx
+            packets.extend(encoder.encode(frame))
+        # Flush encoder
+        packets.extend(encoder.encode(None))
+
+        decoder = self._get_decoder(_get_decoder_name(encoder.codec.id))
+        outputs = np.empty((len(imgs), height, width, 3), dtype=np.float32)
+        num_frames = 0
+        # the trailing None flushes the decoder
+        for packet in packets + [None]:
+            for frame in decoder.decode(packet):
+                # convert to float32 in the copy to the outputs
+                np.copyto(
+                    outputs[num_frames],
+                    frame.to_ndarray(format='rgb24'),
+                    casting='unsafe')
+                num_frames += 1
+        # reset the decoder from the end of stream for the next clip
+        decoder.flush_buffers()
+
+        return list(outputs[:num_frames])
+
     def _apply_random_compression(self, imgs):
         """This is the function to apply random compression on images.
 
@@ -490,6 +654,9 @@ class RandomVideoCompression:
         bitrate = self.params['bitrate']
         bitrate = np.random.randint(bitrate[0], bitrate[1] + 1)
 
+        if self.params.get('pooled', False):
+            return self._apply_pooled_compression(imgs, codec, bitrate)
+
         buf = io.BytesIO()
         with av.open(buf, 'w', 'mp4') as container:
             stream = container.add_stream(codec, rate=1)
@@ -527,6 +694,12 @@ class RandomVideoCompression:
 
         return results
 
+    def __getstate__(self):
+        # codec contexts can not be pickled, they are recreated in workers
+        state = self.__dict__.copy()
+        state['_decoders'] = dict()
+        return state
+
     def __repr__(self):
         repr_str = self.__class__.__name__
         repr_str += (f'(params={self.params}, keys={self.keys})')
@@ -1,6 +1,6 @@
 # Copyright (c) OpenMMLab. All rights reserved.
 import warnings
-from typing import Dict, List, Sequence, Union
+from typing import Dict, List, Optional, Sequence, Union
 
 import torch
 from mmengine.evaluator import BaseMetric, Evaluator
@@ -8,6 +8,7 @@ from mmengine.runner.amp import autocast
 from mmengine.runner.base_loop import BaseLoop
 from torch.utils.data import DataLoader
 
+from mmagic.evaluation.sample_pool import GenerativeSamplePool
 from mmagic.registry import LOOPS
 from .loop_utils import is_evaluator, update_and_check_evaluator
 
@@ -74,19 +75,26 @@ class MultiValLoop(BaseLoop):
         evaluator (Evaluator or dict or list): A evaluator object or a dict to
             build the evaluator or a list of evaluator object or a list of
             config dicts.
+        sample_pool (dict, optional): The config of
+            :class:`~mmagic.evaluation.sample_pool.GenerativeSamplePool`.
+            If passed, generated samples are shared across the generative
+            metrics of all evaluators in one evaluation. Defaults to None.
     """
 
     def __init__(self,
                  runner,
                  dataloader: DATALOADER_TYPE,
                  evaluator: EVALUATOR_TYPE,
-                 fp16: bool = False):
+                 fp16: bool = False,
+                 sample_pool: Optional[dict] = None):
         self._runner = runner
 
         self.dataloaders = self._build_dataloaders(dataloader)
         self.evaluators = self._build_evaluators(evaluator)
 
         self.fp16 = fp16
+        self.sample_pool = GenerativeSamplePool(
+            **sample_pool) if sample_pool is not None else None
 
         assert len(self.dataloaders) == len(self.evaluators), (
             'Length of dataloaders and evaluators must be same, but receive '
@@ -231,8 +239,10 @@ class MultiValLoop(BaseLoop):
             # 2.3 generate images
             metrics_sampler_list = metrics_sampler_lists[idx]
             for metrics, sampler in metrics_sampler_list:
+                pool_key = self.sample_pool.begin(
+                    metrics) if self.sample_pool is not None else None
                 for data in sampler:
-                    self.run_iter(idx_counter, data, metrics)
+                    self.run_iter(idx_counter, data, metrics, pool_key)
                     idx_counter += 1
 
             # 2.4 evaluate metrics and update multi_metric
@@ -244,11 +254,17 @@ class MultiValLoop(BaseLoop):
                 multi_metric.update(metrics)
 
         # 3. finish evaluation and call hooks
+        if self.sample_pool is not None:
+            self.sample_pool.clear()
         self._runner.call_hook('after_val_epoch', metrics=multi_metric)
         self._runner.call_hook('after_val')
 
     @torch.no_grad()
-    def run_iter(self, idx, data_batch: dict, metrics: Sequence[BaseMetric]):
+    def run_iter(self,
+                 idx,
+                 data_batch: dict,
+                 metrics: Sequence[BaseMetric],
+                 pool_key: Optional[str] = None):
         """Iterate one mini-batch and feed the output to corresponding
         `metrics`.
 
@@ -256,12 +272,19 @@ class MultiValLoop(BaseLoop):
             idx (int): Current idx for the input data.
             data_batch (dict): Batch of data from dataloader.
             metrics (Sequence[BaseMetric]): Specific metrics to evaluate.
+            pool_key (str, optional): The key of :attr:`sample_pool` to take
+                the samples from. If None, the samples are directly generated
+                by the model. Defaults to None.
         """
         self._runner.call_hook(
             'before_val_iter', batch_idx=idx, data_batch=data_batch)
         # outputs should be sequence of BaseDataElement
         with autocast(enabled=self.fp16):
-            outputs = self._runner.model.val_step(data_batch)
+            if pool_key is not None:
+                outputs = self.sample_pool.sample(pool_key, data_batch,
+                                                  self._runner.model.val_step)
+            else:
+                outputs = self._runner.model.val_step(data_batch)
         self.evaluator.process(outputs, data_batch, metrics)
         self._runner.call_hook(
             'after_val_iter',
@@ -329,15 +352,26 @@ class MultiTestLoop(BaseLoop):
         evaluator (Evaluator or dict or list): A evaluator object or a dict to
             build the evaluator or a list of evaluator object or a list of
             config dicts.
+        sample_pool (dict, optional): The config of
+            :class:`~mmagic.evaluation.sample_pool.GenerativeSamplePool`.
+            If passed, generated samples are shared across the generative
+            metrics of all evaluators in one evaluation. Defaults to None.
     """
 
-    def __init__(self, runner, dataloader, evaluator, fp16=False):
+    def __init__(self,
+                 runner,
+                 dataloader: DATALOADER_TYPE,
+                 evaluator: EVALUATOR_TYPE,
+                 fp16: bool = False,
+                 sample_pool: Optional[dict] = None):
         self._runner = runner
 
         self.dataloaders = self._build_dataloaders(dataloader)
         self.evaluators = self._build_evaluators(evaluator)
 
         self.fp16 = fp16
+        self.sample_pool = GenerativeSamplePool(
+            **sample_pool) if sample_pool is not None else None
 
         assert len(self.dataloaders) == len(self.evaluators), (
             'Length of dataloaders and evaluators must be same, but receive '
@@ -482,8 +516,10 @@ class MultiTestLoop(BaseLoop):
             # 2.3 generate images
             metrics_sampler_list = metrics_sampler_lists[idx]
             for metrics, sampler in metrics_sampler_list:
+                pool_key = self.sample_pool.begin(
+                    metrics) if self.sample_pool is not None else None
                 for data in sampler:
-                    self.run_iter(idx_counter, data, metrics)
+                    self.run_iter(idx_counter, data, metrics, pool_key)
                     idx_counter += 1
 
             # 2.4 evaluate metrics and update multi_metric
@@ -495,11 +531,17 @@ class MultiTestLoop(BaseLoop):
                 multi_metric.update(metrics)
 
         # 3. finish evaluation and call hooks
+        if self.sample_pool is not None:
+            self.sample_pool.clear()
         self._runner.call_hook('after_test_epoch', metrics=multi_metric)
         self._runner.call_hook('after_test')
 
     @torch.no_grad()
-    def run_iter(self, idx, data_batch: dict, metrics: Sequence[BaseMetric]):
+    def run_iter(self,
+                 idx,
+                 data_batch: dict,
+                 metrics: Sequence[BaseMetric],
+                 pool_key: Optional[str] = None):
         """Iterate one mini-batch and feed the output to corresponding
         `metrics`.
 
@@ -507,12 +549,19 @@ class MultiTestLoop(BaseLoop):
             idx (int): Current idx for the input data.
             data_batch (dict): Batch of data from dataloader.
             metrics (Sequence[BaseMetric]): Specific metrics to evaluate.
+            pool_key (str, optional): The key of :attr:`sample_pool` to take
+                the samples from. If None, the samples are directly generated
+                by the model. Defaults to None.
         """
         self._runner.call_hook(
             'before_test_iter', batch_idx=idx, data_batch=data_batch)
         # outputs should be sequence of BaseDataElement
         with autocast(enabled=self.fp16):
-            outputs = self._runner.model.test_step(data_batch)
+            if pool_key is not None:
+                outputs = self.sample_pool.sample(pool_key, data_batch,
+                                                  self._runner.model.test_step)
+            else:
+                outputs = self._runner.model.test_step(data_batch)
         self.evaluator.process(outputs, data_batch, metrics)
         self._runner.call_hook(
             'after_test_iter',
@@ -7,9 +7,11 @@ from .metrics import (MAE, MSE, NIQE, PSNR, SAD, SNR, SSIM, ConnectivityError,
                       MultiScaleStructureSimilarity, PerceptualPathLength,
                       PrecisionAndRecall, SlicedWassersteinDistance, TransFID,
                       TransIS, niqe, psnr, snr, ssim)
+from .sample_pool import GenerativeSamplePool
 
 __all__ = [
     'Evaluator',
+    'GenerativeSamplePool',
     'gauss_gradient',
     'ConnectivityError',
     'GradientError',
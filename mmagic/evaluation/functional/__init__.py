@@ -1,4 +1,5 @@
 # Copyright (c) OpenMMLab. All rights reserved.
+from .feature_cache import FeatureIndex, ShardedFeatureCache
 from .fid_inception import InceptionV3
 from .gaussian_funcs import gauss_gradient
 from .inception_utils import (disable_gpu_fuser_on_pt19, load_inception,
@@ -6,5 +7,6 @@ from .inception_utils import (disable_gpu_fuser_on_pt19, load_inception,
 
 __all__ = [
     'gauss_gradient', 'InceptionV3', 'disable_gpu_fuser_on_pt19',
-    'load_inception', 'prepare_vgg_feat', 'prepare_inception_feat'
+    'load_inception', 'prepare_vgg_feat', 'prepare_inception_feat',
+    'ShardedFeatureCache', 'FeatureIndex'
 ]
@@ -0,0 +1,521 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import json
+import os
+import os.path as osp
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import mmengine
+import numpy as np
+from mmengine.dist import (all_gather_object, barrier, gather_object,
+                           get_dist_info)
+
+
+def _dump_json_atomic(obj: dict, path: str) -> None:
+    """Dump ``obj`` to ``path`` atomically, so an interrupted job never leaves
+    a broken json file."""
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w') as file:
+        json.dump(obj, file, default=str)
+    os.replace(tmp_path, path)
+
+
+def _calc_mean_cov(
+    get_blocks: Callable[[], Iterable[np.ndarray]]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Calculate the mean and covariance of features block by block in
+    float64. The results are the same as `np.mean` and `np.cov`.
+
+    Args:
+        get_blocks (Callable[[], Iterable[np.ndarray]]): Function returns an
+            iterable of feature blocks. It is called twice, once for the mean
+            and once for the centered covariance.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The mean and covariance.
+    """
+    feat_sum, num = 0, 0
+    for feat in get_blocks():
+        feat_sum = feat_sum + feat.sum(axis=0, dtype=np.float64)
+        num += feat.shape[0]
+    mean = feat_sum / num
+
+    cov = 0
+    for feat in get_blocks():
+        feat = feat.astype(np.float64) - mean
+        cov = cov + feat.T @ feat
+    cov = cov / (num - 1)
+
+    return mean, cov
+
+
+class ShardedFeatureCache:
+    """Feature cache stored as per-rank ``.npy`` shards with a manifest.
+
+    During extraction, each rank buffers its features and writes a shard
+    every ``shard_size`` items. The written shards of a rank are recorded in
+    ``rank{RANK}-manifest.json`` so that an interrupted extraction can be
+    resumed from the last complete shard with the same world size. After all
+    ranks finish, :meth:`merge` writes all shards into a single
+    ``feature.npy`` in the order of the dataset and records it in
+    ``manifest.json``. If the shards of other ranks are not visible to rank 0
+    (e.g. multiple nodes without a shared file system), they are gathered to
+    rank 0 shard by shard, and only rank 0 holds the merged features. The
+    features
+    are then read with ``np.load(mmap_mode='r')`` and never loaded into
+    memory as a whole.
+
+    The layout of ``cache_dir`` is as follows:
+
+    .. code-block:: none
+
+        cache_dir
+        ├── manifest.json
+        ├── feature.npy
+        ├── mean_cov.npz  # optional, see :meth:`get_mean_cov`
+        ├── rank0-manifest.json  # removed after merging
+        ├── rank0-00000.npy  # removed after merging
+        ├── ...
+
+    Args:
+        cache_dir (str): Directory of the cache.
+        cache_key (str): Key of the cache, e.g., the name returned by
+            :func:`get_inception_feat_cache_name_and_args`. Shards and
+            manifests with a different key are ignored.
+        shard_size (int): Number of items in each shard. Defaults to 10000.
+        meta (dict, optional): Meta information saved to the manifest.
+            Defaults to None.
+    """
+
+    def __init__(self,
+                 cache_dir: str,
+                 cache_key: str,
+                 shard_size: int = 10000,
+                 meta: Optional[dict] = None) -> None:
+        assert shard_size > 0, (
+            f'\'shard_size\' must be positive, but receive {shard_size}.')
+        self.cache_dir = cache_dir
+        self.cache_key = cache_key
+        self.shard_size = shard_size
+        self.meta = dict() if meta is None else meta
+        self.rank, self.world_size = get_dist_info()
+
+        self._buffer: List[np.ndarray] = []
+        self._num_buffered = 0
+        self._shards = self._load_rank_shards()
+
+    @property
+    def manifest_path(self) -> str:
+        return osp.join(self.cache_dir, 'manifest.json')
+
+    @property
+    def feature_path(self) -> str:
+        return osp.join(self.cache_dir, 'feature.npy')
+
+    @property
+    def rank_manifest_path(self) -> str:
+        return self._get_rank_manifest_path(self.rank)
+
+    def _get_rank_manifest_path(self, rank: int) -> str:
+        return osp.join(self.cache_dir, f'rank{rank}-manifest.json')
+
+    @property
+    def is_complete(self) -> bool:
+        """Whether the merged features of this cache exist."""
+        if not osp.exists(self.manifest_path):
+            return False
+        with open(self.manifest_path, 'r') as file:
+            manifest = json.load(file)
+        return manifest.get('cache_key') == self.cache_key and osp.exists(
+            self.feature_path)
+
+    @property
+    def num_finished(self) -> int:
+        """Number of items of the current rank stored in complete shards."""
+        return sum([shard['num'] for shard in self._shards])
+
+    def _load_rank_shards(self) -> List[dict]:
+        """Load the complete shards of the current rank from its manifest.
+
+        Returns:
+            List[dict]: Information of the complete shards.
+        """
+        if not osp.exists(self.rank_manifest_path):
+            return []
+        with open(self.rank_manifest_path, 'r') as file:
+            manifest = json.load(file)
+        if manifest.get('cache_key') != self.cache_key:
+            return []
+        if manifest.get('world_size') != self.world_size:
+            # items are assigned to ranks by the world size, so shards
+            # extracted with another world size can not be resumed
+            for shard in manifest['shards']:
+                path = osp.join(self.cache_dir, shard['file'])
+                if osp.exists(path):
+                    os.remove(path)
+            return []
+        shards = []
+        for shard in manifest['shards']:
+            # only keep the consecutive shards on disk
+            if not osp.exists(osp.join(self.cache_dir, shard['file'])):
+                break
+            shards.append(shard)
+        return shards
+
+    def add(self, feat: np.ndarray) -> None:
+        """Add a batch of features of the current rank. A shard is written
+        once ``shard_size`` items are buffered.
+
+        Args:
+            feat (np.ndarray): Features with shape like (N, C).
+        """
+        self._buffer.append(feat)
+        self._num_buffered += feat.shape[0]
+        while self._num_buffered >= self.shard_size:
+            buffer = np.concatenate(self._buffer, axis=0)
+            self._write_shard(buffer[:self.shard_size])
+            self._buffer = [buffer[self.shard_size:]]
+            self._num_buffered -= self.shard_size
+
+    def flush(self) -> None:
+        """Write all buffered features of the current rank as a shard."""
+        if self._num_buffered > 0:
+            self._write_shard(np.concatenate(self._buffer, axis=0))
+        elif not osp.exists(self.rank_manifest_path):
+            # ranks without any item still record an empty manifest
+            mmengine.mkdir_or_exist(self.cache_dir)
+            self._dump_rank_manifest()
+        self._buffer = []
+        self._num_buffered = 0
+
+    def _dump_rank_manifest(self) -> None:
+        _dump_json_atomic(
+            dict(
+                cache_key=self.cache_key,
+                world_size=self.world_size,
+                shards=self._shards), self.rank_manifest_path)
+
+    def _write_shard(self, feat: np.ndarray) -> None:
+        """Write a shard and record it in the manifest of current rank."""
+        mmengine.mkdir_or_exist(self.cache_dir)
+        filename = f'rank{self.rank}-{len(self._shards):05d}.npy'
+        # `np.save` appends '.npy' to the filename without this suffix
+        tmp_path = osp.join(self.cache_dir, f'{filename}.tmp.npy')
+        np.save(tmp_path, feat)
+        os.replace(tmp_path, osp.join(self.cache_dir, filename))
+
+        self._shards.append(dict(file=filename, num=feat.shape[0]))
+        self._dump_rank_manifest()
+
+    def merge(self, num_items: int) -> None:
+        """Merge the shards of all ranks into ``feature.npy``.
+
+        The i-th item of rank r is the ``(i * world_size + r)``-th item of
+        the dataset, which is the same as the sampler used for extraction.
+        Items padded to make ranks even are dropped. Must be called by all
+        ranks.
+
+        Args:
+            num_items (int): Number of items in the dataset.
+        """
+        self.flush()
+        barrier()
+
+        manifest_paths = [
+            self._get_rank_manifest_path(rank)
+            for rank in range(self.world_size)
+        ]
+        # shards of other nodes are not visible without a shared file system
+        is_shared = all(
+            all_gather_object(all(osp.exists(p) for p in manifest_paths)))
+        feature = None
+        if is_shared and self.rank == 0:
+            for rank, path in enumerate(manifest_paths):
+                with open(path, 'r') as file:
+                    manifest = json.load(file)
+                assert manifest['world_size'] == self.world_size, (
+                    f'Shards in \'{self.cache_dir}\' are extracted with '
+                    f'world size {manifest["world_size"]}, but the current '
+                    f'world size is {self.world_size}.')
+                offset = 0
+                for shard in manifest['shards']:
+                    feat = np.load(
+                        osp.join(self.cache_dir, shard['file']), mmap_mode='r')
+                    feature = self._write_rank_feat(feature, feat, rank,
+                                                    offset, num_items)
+                    offset += feat.shape[0]
+        elif not is_shared:
+            offsets = [0] * self.world_size
+            num_shards = max(all_gather_object(len(self._shards)))
+            for idx in range(num_shards):
+                feat = None
+                if idx < len(self._shards):
+                    feat = np.load(
+                        osp.join(self.cache_dir, self._shards[idx]['file']))
+                rank_feats = gather_object(feat, dst=0)
+                if self.rank != 0:
+                    continue
+                for rank, feat in enumerate(rank_feats):
+                    if feat is None:
+                        continue
+                    feature = self._write_rank_feat(feature, feat, rank,
+                                                    offsets[rank], num_items)
+                    offsets[rank] += feat.shape[0]
+
+        if self.rank == 0:
+            if feature is None:
+                # no shard is written, e.g. the dataset is empty
+                assert num_items == 0, (
+                    f'No feature is found in \'{self.cache_dir}\' for '
+                    f'{num_items} items.')
+                np.save(self._tmp_feature_path, np.empty((0, 0), np.float32))
+            else:
+                feature.flush()
+                del feature
+            os.replace(self._tmp_feature_path, self.feature_path)
+            _dump_json_atomic(
+                dict(
+                    cache_key=self.cache_key,
+                    num_items=num_items,
+                    world_size=self.world_size,
+                    meta=self.meta), self.manifest_path)
+        barrier()
+
+        # each rank removes its own shards
+        for shard in self._shards:
+            os.remove(osp.join(self.cache_dir, shard['file']))
+        os.remove(self.rank_manifest_path)
+        self._shards = []
+        barrier()
+
+    @property
+    def _tmp_feature_path(self) -> str:
+        return f'{self.feature_path}.tmp.npy'
+
+    def _write_rank_feat(self, feature: Optional[np.ndarray], feat: np.ndarray,
+                         rank: int, offset: int, num_items: int) -> np.ndarray:
+        """Write the features of a rank to the merged features, which are
+        created by the first call.
+
+        Args:
+            feature (np.ndarray, optional): The memory-mapped merged features.
+            feat (np.ndarray): Features of a shard of ``rank``.
+            rank (int): The rank of the shard.
+            offset (int): Number of items of ``rank`` before the shard.
+            num_items (int): Number of items in the dataset.
+
+        Returns:
+            np.ndarray: The memory-mapped merged features.
+        """
+        if feature is None:
+            feature = np.lib.format.open_memmap(
+                self._tmp_feature_path,
+                mode='w+',
+                dtype=feat.dtype,
+                shape=(num_items, *feat.shape[1:]))
+        index = np.arange(offset, offset + feat.shape[0])
+        index = index * self.world_size + rank
+        valid = index < num_items
+        feature[index[valid]] = feat[valid]
+        return feature
+
+    def load(self, mmap_mode: Optional[str] = 'r') -> np.ndarray:
+        """Load the merged features.
+
+        Args:
+            mmap_mode (str, optional): Memory-map mode passed to `np.load`.
+                Defaults to 'r'.
+
+        Returns:
+            np.ndarray: The memory-mapped features.
+        """
+        assert self.is_complete, (
+            f'Feature cache \'{self.cache_dir}\' is not complete.')
+        return np.load(self.feature_path, mmap_mode=mmap_mode)
+
+    def get_mean_cov(self,
+                     chunk_size: int = 10000) -> Tuple[np.ndarray, np.ndarray]:
+        """Get the mean and covariance of the merged features. The results
+        are the same as `np.mean` and `np.cov`, but calculated chunk by chunk
+        and saved to ``mean_cov.npz`` for the next call.
+
+        Args:
+            chunk_size (int): Number of items loaded in each step.
+                Defaults to 10000.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: The mean and covariance.
+        """
+        mean_cov_path = osp.join(self.cache_dir, 'mean_cov.npz')
+        if osp.exists(mean_cov_path):
+            mean_cov = np.load(mean_cov_path)
+            return mean_cov['mean'], mean_cov['cov']
+
+        feature = self.load()
+        mean, cov = _calc_mean_cov(
+            lambda: (feature[idx:idx + chunk_size]
+                     for idx in range(0, feature.shape[0], chunk_size)))
+
+        if self.rank == 0:
+            tmp_path = f'{mean_cov_path}.tmp.npz'
+            np.savez(tmp_path, mean=mean, cov=cov)
+            os.replace(tmp_path, mean_cov_path)
+        return mean, cov
+
+    def remove(self) -> None:
+        """Remove the merged features, and the directory if it is empty."""
+        for name in ['manifest.json', 'feature.npy', 'mean_cov.npz']:
+            path = osp.join(self.cache_dir, name)
+            if osp.exists(path):
+                os.remove(path)
+        if osp.isdir(self.cache_dir) and len(os.listdir(self.cache_dir)) == 0:
+            os.rmdir(self.cache_dir)
+
+
+class FeatureIndex:
+    """Feature store indexed by the content hash of each item.
+
+    Features are appended as ``.npy`` chunks and ``index.json`` maps the
+    content hash of each item to its chunk and row. When a dataset grows or
+    some files change, only the features of the new hashes need to be
+    extracted, and the features of the unchanged files are reused. The index
+    also records :attr:`stats`, the content hash of each item keyed by the
+    path, size and modification time of its files, so that unchanged files
+    are not read again to be hashed.
+
+    The layout of ``index_dir`` is as follows:
+
+    .. code-block:: none
+
+        index_dir
+        ├── index.json
+        ├── chunk-00000.npy
+        ├── chunk-00001.npy
+        ├── ...
+
+    Args:
+        index_dir (str): Directory of the index.
+        cache_key (str): Key of the index. It should only depend on the
+            arguments that influence the feature of a single item, e.g., the
+            pipeline and the feature extractor. If the key of the index on
+            disk is different, the index is rebuilt from scratch.
+    """
+
+    def __init__(self, index_dir: str, cache_key: str) -> None:
+        self.index_dir = index_dir
+        self.cache_key = cache_key
+        self.chunks: List[str] = []
+        self.rows = dict()
+        self.stats = dict()
+
+        if osp.exists(self.index_path):
+            with open(self.index_path, 'r') as file:
+                index = json.load(file)
+            if index.get('cache_key') == cache_key:
+                self.chunks = index['chunks']
+                self.rows = index['rows']
+                self.stats = index.get('stats', dict())
+
+    @property
+    def index_path(self) -> str:
+        return osp.join(self.index_dir, 'index.json')
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.rows
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def add(self, keys: List[str], feat: np.ndarray) -> None:
+        """Append the features of new items. Keys already in the index are
+        skipped. Should be called by only one process.
+
+        Args:
+            keys (List[str]): Content hash of each item.
+            feat (np.ndarray): Features with shape like (N, C).
+        """
+        assert len(keys) == feat.shape[0], (
+            'The number of keys and features should be the same, but '
+            f'receive {len(keys)} and {feat.shape[0]}.')
+        new_rows = dict()
+        for row, key in enumerate(keys):
+            if key not in self.rows and key not in new_rows:
+                new_rows[key] = row
+        if len(new_rows) == 0:
+            return
+
+        mmengine.mkdir_or_exist(self.index_dir)
+        chunk_idx = len(self.chunks)
+        filename = f'chunk-{chunk_idx:05d}.npy'
+        tmp_path = osp.join(self.index_dir, f'{filename}.tmp.npy')
+        np.save(tmp_path, feat[list(new_rows.values())])
+        os.replace(tmp_path, osp.join(self.index_dir, filename))
+
+        self.chunks.append(filename)
+        for row, key in enumerate(new_rows):
+            self.rows[key] = [chunk_idx, row]
+        self._dump()
+
+    def update_stats(self, stats: Dict[str, str]) -> None:
+        """Record the content hash of items keyed by the stat of their files.
+        Should be called by only one process.
+
+        Args:
+            stats (Dict[str, str]): Content hash of each item keyed by the
+                path, size and modification time of its files.
+        """
+        if len(stats) == 0:
+            return
+        mmengine.mkdir_or_exist(self.index_dir)
+        self.stats.update(stats)
+        self._dump()
+
+    def _dump(self) -> None:
+        _dump_json_atomic(
+            dict(
+                cache_key=self.cache_key,
+                chunks=self.chunks,
+                rows=self.rows,
+                stats=self.stats), self.index_path)
+
+    def iter_features(self,
+                      keys: List[str],
+                      chunk_size: int = 10000) -> Iterable[np.ndarray]:
+        """Iterate the features of the given keys block by block. Chunks are
+        memory-mapped and only the rows of the current block are loaded.
+
+        Args:
+            keys (List[str]): Content hash of each item.
+            chunk_size (int): Number of items in each block.
+                Defaults to 10000.
+
+        Yields:
+            np.ndarray: Features of a block of keys.
+        """
+        chunks = [
+            np.load(osp.join(self.index_dir, name), mmap_mode='r')
+            for name in self.chunks
+        ]
+        for start in range(0, len(keys), chunk_size):
+            locs = np.array(
+                [self.rows[key] for key in keys[start:start + chunk_size]])
+            feat = np.empty((locs.shape[0], *chunks[0].shape[1:]),
+                            dtype=chunks[0].dtype)
+            for chunk_idx in np.unique(locs[:, 0]):
+                mask = locs[:, 0] == chunk_idx
+                feat[mask] = chunks[chunk_idx][locs[mask, 1]]
+            yield feat
+
+    def get_mean_cov(self,
+                     keys: List[str],
+                     chunk_size: int = 10000) -> Tuple[np.ndarray, np.ndarray]:
+        """Get the mean and covariance of the features of the given keys.
+
+        Args:
+            keys (List[str]): Content hash of each item.
+            chunk_size (int): Number of items loaded in each step.
+                Defaults to 10000.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: The mean and covariance.
+        """
+        return _calc_mean_cov(lambda: self.iter_features(keys, chunk_size))
@@ -6,15 +6,16 @@ import pickle
 import sys
 from contextlib import contextmanager
 from copy import deepcopy
-from typing import Optional, Tuple
+from typing import Callable, List, Optional, Tuple
 
 import mmengine
 import numpy as np
 import torch
 import torch.nn as nn
-from mmengine import is_filepath, print_log
+from mmengine import fileio, is_filepath, print_log
 from mmengine.dataset import BaseDataset, Compose, pseudo_collate
-from mmengine.dist import (all_gather, get_dist_info, get_world_size,
+from mmengine.dist import (all_gather, barrier, broadcast_object_list,
+                           gather_object, get_dist_info, get_world_size,
                            is_main_process)
 from mmengine.evaluator import BaseMetric
 from torch.utils.data.dataloader import DataLoader
@@ -23,6 +24,7 @@ from torchvision.models.inception import inception_v3
 
 from mmagic.utils import MMAGIC_CACHE_DIR, download_from_url
 from . import InceptionV3
+from .feature_cache import FeatureIndex, ShardedFeatureCache
 
 ALLOWED_INCEPTION = ['StyleGAN', 'PyTorch']
 TERO_INCEPTION_URL = 'https://nvlabs-fi-cdn.nvidia.com/stylegan2-ada-pytorch/pretrained/metrics/inception-2015-12-05.pt'  # noqa
@@ -226,6 +228,41 @@ def get_inception_feat_cache_name_and_args(dataloader: DataLoader,
     return cache_tag, args
 
 
+def get_inception_feat_index_name_and_args(dataloader: DataLoader,
+                                           metric: BaseMetric
+                                           ) -> Tuple[str, dict]:
+    """Get the name and meta info of the per-item inception feature index
+    corresponding to the input dataloader and metric.
+
+    Different from :func:`get_inception_feat_cache_name_and_args`, the meta
+    info only includes the arguments that influence the feature of a single
+    image, i.e., 'pipeline' of the dataset, and 'inception_style',
+    'inception_args' and 'real_key' of the metric. Therefore, datasets with
+    different roots or sizes share the same index.
+
+    Args:
+        dataloader (Dataloader): The dataloader of real images.
+        metric (BaseMetric): The metric which needs inception features.
+    Returns:
+        Tuple[str, dict]: Name and meta info dict of the inception feature
+            index.
+    """
+
+    dataset: BaseDataset = dataloader.dataset
+    assert isinstance(dataset, Dataset), (
+        f'Only support normal dataset, but receive {type(dataset)}.')
+
+    real_key = 'gt_img' if metric.real_key is None else metric.real_key
+    args = dict(
+        pipeline=repr(dataset.pipeline),
+        inception_style=metric.inception_style,
+        inception_args=getattr(metric, 'inception_args', None),
+        real_keys=real_key)
+
+    md5 = hashlib.md5(repr(sorted(args.items())).encode('utf-8'))
+    return f'inception_index-{md5.hexdigest()}', args
+
+
 def get_vgg_feat_cache_name_and_args(dataloader: DataLoader,
                                      metric: BaseMetric) -> Tuple[str, dict]:
     """Get the name and meta info of the vgg feature cache file corresponding
@@ -277,7 +314,8 @@ def prepare_inception_feat(dataloader: DataLoader,
                            metric: BaseMetric,
                            data_preprocessor: Optional[nn.Module] = None,
                            capture_mean_cov: bool = False,
-                           capture_all: bool = False) -> dict:
+                           capture_all: bool = False,
+                           incremental: bool = False) -> dict:
     """Prepare inception feature for the input metric.
 
     - If `metric.inception_pkl` is an online path, try to download and load
@@ -285,9 +323,20 @@ def prepare_inception_feat(dataloader: DataLoader,
     - If `metric.inception_pkl` is local path and file exists, try to load the
       file. If cannot load, corresponding error will be raised.
     - If `metric.inception_pkl` is local path and file not exists, we will
-      extract the inception feature manually and save to 'inception_pkl'.
+      extract the inception feature manually as :class:`ShardedFeatureCache`
+      in the directory named by 'inception_pkl' without extension, and save
+      the inception state to 'inception_pkl' after merging. An interrupted
+      extraction is resumed from the last complete shard.
     - If `metric.inception_pkl` is not defined, we will extract the inception
-      feature and save it to default cache dir with default name.
+      feature and save it as :class:`ShardedFeatureCache` to default cache
+      dir with default name.
+    - If `metric.inception_pkl` is not defined and `incremental` is True, the
+      feature of each image is saved in :class:`FeatureIndex` keyed by the
+      content hash of its files. Only the features of new or changed files
+      are extracted, and the mean and covariance are rebuilt from the index.
+
+    The raw feature loaded from the sharded cache is memory-mapped. Only the
+    main process returns the inception state once features are extracted.
 
     Args:
         dataloader (Dataloader): The dataloader of real images.
@@ -300,6 +349,9 @@ def prepare_inception_feat(dataloader: DataLoader,
         capture_all (bool): Whether save the raw inception feature. If true,
             it will take a lot of time to save the inception feature. Defaults
             to False.
+        incremental (bool): Whether to reuse the features of unchanged files
+            with the per-item feature index. Only works when
+            `metric.inception_pkl` is None. Defaults to False.
 
     Returns:
         dict: Dict contains inception feature.
@@ -336,39 +388,304 @@ def prepare_inception_feat(dataloader: DataLoader,
     assert hasattr(metric, 'real_nums'), (
         f'Metric \'{metric.name}\' must have attribute \'real_nums\'.')
     real_nums = metric.real_nums
+    if inception_pkl is None and incremental:
+        return _prepare_inception_feat_incremental(dataloader, metric,
+                                                   data_preprocessor,
+                                                   capture_mean_cov,
+                                                   capture_all)
     if inception_pkl is None:
         inception_pkl, args = get_inception_feat_cache_name_and_args(
             dataloader, metric, real_nums, capture_mean_cov, capture_all)
         inception_pkl = osp.join(MMAGIC_CACHE_DIR, inception_pkl)
+        save_pkl = False
     else:
         args = dict()
+        # the pkl file given by users is saved after extraction
+        save_pkl = True
     if osp.exists(inception_pkl):
         with open(inception_pkl, 'rb') as file:
             real_feat = pickle.load(file)
         print_log(f'load preprocessed feat from {inception_pkl}', 'current')
         return real_feat
 
-    assert hasattr(metric, 'inception'), (
-        'Metric must have a inception network to extract inception features.')
+    # features are saved as shards in the directory named by the pkl file
+    feat_cache = ShardedFeatureCache(
+        osp.splitext(inception_pkl)[0], osp.basename(inception_pkl), meta=args)
+
+    # follow rank 0, since other nodes may not share the file system
+    is_complete = [feat_cache.is_complete]
+    broadcast_object_list(is_complete)
+    if not is_complete[0]:
+        assert hasattr(metric, 'inception'), (
+            'Metric must have a inception network to extract inception '
+            'features.')
+        print_log(
+            f'Inception feature cache \'{feat_cache.cache_dir}\' is not '
+            'found, extract manually.', 'current')
 
-    real_feat = []
+        dataset = dataloader.dataset
+        if real_nums == -1:
+            num_items = len(dataset)
+        else:
+            num_items = min(len(dataset), real_nums)
+        _extract_real_feat(dataloader, metric.forward_inception,
+                           metric.real_key, data_preprocessor,
+                           _get_item_subset(num_items), feat_cache,
+                           'Calculate Inception Feature.')
+        print_log(
+            f'Saving inception feature to {feat_cache.cache_dir}. Please be '
+            'patient.', 'current')
+        feat_cache.merge(num_items)
+        print_log('Inception feature Finished.', 'current')
+    else:
+        print_log(f'load preprocessed feat from {feat_cache.cache_dir}',
+                  'current')
 
-    print_log(
-        f'Inception pkl \'{inception_pkl}\' is not found, extract '
-        'manually.', 'current')
+    # the merged features are only available on the main process
+    if not is_main_process():
+        return
 
-    import rich.progress
+    inception_state = dict(**args)
+    if capture_mean_cov:
+        real_mean, real_cov = feat_cache.get_mean_cov()
+        inception_state['real_mean'] = real_mean
+        inception_state['real_cov'] = real_cov
+    if capture_all:
+        inception_state['raw_feature'] = feat_cache.load(mmap_mode='r')
 
-    dataset, batch_size = dataloader.dataset, dataloader.batch_size
-    if real_nums == -1:
+    if save_pkl:
+        if capture_all:
+            inception_state['raw_feature'] = np.array(
+                inception_state['raw_feature'])
+        print_log(
+            f'Saving inception pkl to {inception_pkl}. Please be patient.',
+            'current')
+        with open(inception_pkl, 'wb') as file:
+            pickle.dump(inception_state, file)
+        feat_cache.remove()
+    return inception_state
+
+
+def _get_item_paths(dataset: Dataset, idx: int) -> List[str]:
+    """Get the paths of all files of an item. The files are found by the keys
+    ending with '_path' in the data info.
+
+    Args:
+        dataset (Dataset): The dataset of real images.
+        idx (int): Index of the item.
+
+    Returns:
+        List[str]: The paths of the files.
+    """
+    data_info = dataset.get_data_info(idx)
+    path_keys = sorted([k for k in data_info if k.endswith('_path')])
+    assert len(path_keys) > 0, (
+        'Incremental feature index requires the data info contains the file '
+        f'path with key ending with \'_path\', but receive '
+        f'{list(data_info.keys())}.')
+
+    item_paths = []
+    for key in path_keys:
+        paths = data_info[key]
+        item_paths += paths if isinstance(paths, (list, tuple)) else [paths]
+    return item_paths
+
+
+def _get_item_stat_key(dataset: Dataset, paths: List[str]) -> Optional[str]:
+    """Get the md5 of the path, size and modification time of the files of an
+    item.
+
+    Args:
+        dataset (Dataset): The dataset of real images.
+        paths (List[str]): The paths of the files.
+
+    Returns:
+        Optional[str]: The md5 of the stats. None if any file is not on the
+            local file system.
+    """
+    backend_args = getattr(dataset, 'backend_args', None)
+    md5 = hashlib.md5()
+    for path in paths:
+        backend = fileio.get_file_backend(path, backend_args=backend_args)
+        if not isinstance(backend, fileio.LocalBackend):
+            return None
+        stat = os.stat(path)
+        md5.update(f'{path}:{stat.st_size}:{stat.st_mtime_ns};'.encode())
+    return md5.hexdigest()
+
+
+def _get_item_content_hash(dataset: Dataset, paths: List[str]) -> str:
+    """Get the md5 of the content of the files of an item.
+
+    Args:
+        dataset (Dataset): The dataset of real images.
+        paths (List[str]): The paths of the files.
+
+    Returns:
+        str: The md5 of the files.
+    """
+    backend_args = getattr(dataset, 'backend_args', None)
+    md5 = hashlib.md5()
+    for path in paths:
+        md5.update(fileio.get(path, backend_args=backend_args))
+    return md5.hexdigest()
+
+
+def _prepare_inception_feat_incremental(dataloader: DataLoader,
+                                        metric: BaseMetric,
+                                        data_preprocessor: nn.Module,
+                                        capture_mean_cov: bool,
+                                        capture_all: bool) -> Optional[dict]:
+    """Prepare inception feature with :class:`FeatureIndex`.
+
+    Each rank hashes the files of its items, extracts features for the items
+    not found in the index, and the main process appends the new features to
+    the index. Then the mean and covariance are calculated from the features
+    of all items in the index. Local files whose path, size and modification
+    time are recorded in the index are not read again to be hashed.
+
+    Args:
+        dataloader (Dataloader): The dataloader of real images.
+        metric (BaseMetric): The metric which needs inception features.
+        data_preprocessor (nn.Module): Data preprocessor of the module.
+        capture_mean_cov (bool): Whether save the mean and covariance of
+            inception feature.
+        capture_all (bool): Whether save the raw inception feature.
+
+    Returns:
+        Optional[dict]: Dict contains inception feature on the main process,
+            and None on other processes.
+    """
+    index_name, args = get_inception_feat_index_name_and_args(
+        dataloader, metric)
+    feat_index = FeatureIndex(
+        osp.join(MMAGIC_CACHE_DIR, index_name), cache_key=index_name)
+
+    dataset = dataloader.dataset
+    if metric.real_nums == -1:
         num_items = len(dataset)
     else:
-        num_items = min(len(dataset), real_nums)
+        num_items = min(len(dataset), metric.real_nums)
+    rank, num_gpus = get_dist_info()
+    item_subset = list(range(rank, num_items, num_gpus))
+    item_hashes, new_stats = [], dict()
+    for idx in item_subset:
+        paths = _get_item_paths(dataset, idx)
+        stat_key = _get_item_stat_key(dataset, paths)
+        content_hash = feat_index.stats.get(stat_key)
+        if content_hash is None:
+            content_hash = _get_item_content_hash(dataset, paths)
+            if stat_key is not None:
+                new_stats[stat_key] = content_hash
+        item_hashes.append(content_hash)
+
+    new_subset = [
+        idx for idx, key in zip(item_subset, item_hashes)
+        if key not in feat_index
+    ]
+    new_hashes = [key for key in item_hashes if key not in feat_index]
+    print_log(
+        f'Found {len(item_subset) - len(new_subset)} cached inception '
+        f'features in \'{feat_index.index_dir}\', extract {len(new_subset)} '
+        f'new features on rank {rank}.', 'current')
+    if len(new_subset) > 0:
+        assert hasattr(metric, 'inception'), (
+            'Metric must have a inception network to extract inception '
+            'features.')
+        new_feat = _extract_real_feat(dataloader, metric.forward_inception,
+                                      metric.real_key, data_preprocessor,
+                                      new_subset, None,
+                                      'Calculate Inception Feature.').numpy()
+    else:
+        new_feat = None
+
+    # the number of new items differs across ranks, gather as objects to the
+    # main process only
+    gathered_new = gather_object((new_hashes, new_feat, new_stats))
+    gathered_hashes = gather_object(item_hashes)
+
+    inception_state = None
+    if is_main_process():
+        for hashes, feat, stats in gathered_new:
+            if feat is not None:
+                feat_index.add(hashes, feat)
+            feat_index.update_stats(stats)
+
+        # restore the order of the dataset
+        keys = [None] * num_items
+        for rank_, hashes in enumerate(gathered_hashes):
+            keys[rank_::num_gpus] = hashes
+
+        inception_state = dict(**args)
+        if capture_mean_cov:
+            real_mean, real_cov = feat_index.get_mean_cov(keys)
+            inception_state['real_mean'] = real_mean
+            inception_state['real_cov'] = real_cov
+        if capture_all:
+            inception_state['raw_feature'] = np.concatenate(
+                list(feat_index.iter_features(keys)), axis=0)
+    barrier()
+
+    return inception_state
+
 
+def _get_item_subset(num_items: int) -> List[int]:
+    """Get the indexes of the items for the current rank. The i-th item of
+    rank r is the ``(i * world_size + r)``-th item of the dataset, and ranks
+    are padded to the same length.
+
+    Args:
+        num_items (int): Number of items in the dataset.
+
+    Returns:
+        List[int]: Indexes of the items.
+    """
     rank, num_gpus = get_dist_info()
-    item_subset = [(i * num_gpus + rank) % num_items
-                   for i in range((num_items - 1) // num_gpus + 1)]
-    inception_dataloader = DataLoader(
+    return [(i * num_gpus + rank) % num_items
+            for i in range((num_items - 1) // num_gpus + 1)]
+
+
+def _extract_real_feat(dataloader: DataLoader,
+                       forward_fn: Callable,
+                       real_key: Optional[str],
+                       data_preprocessor: nn.Module,
+                       item_subset: List[int],
+                       feat_cache: Optional[ShardedFeatureCache] = None,
+                       description: str = 'Calculate Feature.'
+                       ) -> Optional[torch.Tensor]:
+    """Extract features of ``item_subset`` of the real images on the current
+    rank and save them to ``feat_cache``. Items already saved in
+    ``feat_cache`` are skipped, thus an interrupted extraction is resumed
+    from the last complete shard.
+
+    Args:
+        dataloader (Dataloader): The dataloader of real images.
+        forward_fn (Callable): Function to extract feature from images.
+        real_key (Optional[str]): Key for get real images from the data
+            samples. If None, 'gt_img' will be used.
+        data_preprocessor (nn.Module): Data preprocessor of the module.
+        item_subset (List[int]): Indexes of the images to extract features
+            on the current rank.
+        feat_cache (ShardedFeatureCache, optional): Cache to save the
+            features. If None, features are returned directly.
+            Defaults to None.
+        description (str): Description of the progress bar.
+            Defaults to 'Calculate Feature.'.
+
+    Returns:
+        Optional[torch.Tensor]: Features of current rank if ``feat_cache`` is
+            None.
+    """
+    import rich.progress
+
+    dataset, batch_size = dataloader.dataset, dataloader.batch_size
+    if feat_cache is not None and feat_cache.num_finished > 0:
+        print_log(
+            f'Resume feature extraction from item '
+            f'{feat_cache.num_finished} of rank {get_dist_info()[0]}.',
+            'current')
+        item_subset = item_subset[feat_cache.num_finished:]
+    feat_dataloader = DataLoader(
         dataset,
         batch_size=batch_size,
         sampler=item_subset,
@@ -381,7 +698,7 @@ def prepare_inception_feat(dataloader: DataLoader,
         slurm_env_name = ['SLURM_PROCID', 'SLURM_NTASKS', 'SLURM_NODELIST']
         if all([n in os.environ for n in slurm_env_name]):
             is_slurm = True
-            pbar = mmengine.ProgressBar(len(inception_dataloader))
+            pbar = mmengine.ProgressBar(len(feat_dataloader))
         else:
             is_slurm = False
             columns = [
@@ -393,19 +710,20 @@ def prepare_inception_feat(dataloader: DataLoader,
             pbar = rich.progress.Progress(*columns)
             pbar.start()
             task = pbar.add_task(
-                'Calculate Inception Feature.',
-                total=len(inception_dataloader),
-                visible=True)
+                description, total=len(feat_dataloader), visible=True)
 
-    for data in inception_dataloader:
+    real_feat = []
+    real_key = 'gt_img' if real_key is None else real_key
+    for data in feat_dataloader:
         # set training = False to avoid norm + convert to BGR
         data_samples = data_preprocessor(data, False)['data_samples']
-
-        real_key = 'gt_img' if metric.real_key is None else metric.real_key
         img = getattr(data_samples, real_key)
 
-        real_feat_ = metric.forward_inception(img).cpu()
-        real_feat.append(real_feat_)
+        real_feat_ = forward_fn(img).cpu()
+        if feat_cache is None:
+            real_feat.append(real_feat_)
+        else:
+            feat_cache.add(real_feat_.numpy())
 
         if is_main_process():
             if is_slurm:
@@ -420,31 +738,9 @@ def prepare_inception_feat(dataloader: DataLoader,
         else:
             pbar.stop()
 
-    # collect results
-    real_feat = torch.cat(real_feat)
-    # use `all_gather` here, gather tensor is much quicker than gather object.
-    real_feat = all_gather(real_feat)
-
-    # only cat on the main process
-    if is_main_process():
-        inception_state = dict(**args)
-        if capture_mean_cov:
-            real_feat = torch.cat(real_feat, dim=0)[:num_items].numpy()
-            real_mean = np.mean(real_feat, 0)
-            real_cov = np.cov(real_feat, rowvar=False)
-            inception_state['real_mean'] = real_mean
-            inception_state['real_cov'] = real_cov
-        if capture_all:
-            inception_state['raw_feature'] = real_feat
-        dir_name = osp.dirname(inception_pkl)
-        os.makedirs(dir_name, exist_ok=True)
-        print_log(
-            f'Saving inception pkl to {inception_pkl}. Please be patient.',
-            'current')
-        with open(inception_pkl, 'wb') as file:
-            pickle.dump(inception_state, file)
-        print_log('Inception pkl Finished.', 'current')
-        return inception_state
+    if feat_cache is None:
+        return torch.cat(real_feat)
+    feat_cache.flush()
 
 
 def prepare_vgg_feat(dataloader: DataLoader,
@@ -458,18 +754,26 @@ def prepare_vgg_feat(dataloader: DataLoader,
     - If `metric.vgg_pkl` is local path and file exists, try to load the
       file. If cannot load, corresponding error will be raised.
     - If `metric.vgg_pkl` is local path and file not exists, we will
-      extract the vgg feature manually and save to 'vgg_pkl'.
+      extract the vgg feature manually as :class:`ShardedFeatureCache` in
+      the directory named by 'vgg_pkl' without extension, and save it to
+      'vgg_pkl' after merging. An interrupted extraction is resumed from the
+      last complete shard.
     - If `metric.vgg_pkl` is not defined, we will extract the vgg
       feature and save it to default cache dir with default name.
 
+    The vgg feature loaded from the sharded cache is memory-mapped. Only the
+    main process returns the feature once it is extracted.
+
     Args:
         dataloader (Dataloader): The dataloader of real images.
         metric (BaseMetric): The metric which needs vgg features.
         data_preprocessor (Optional[nn.Module]): Data preprocessor of the
             module. Used to preprocess the real images. If not passed, real
             images will automatically normalized to [-1, 1]. Defaults to None.
+        auto_save (bool): Whether save the extracted feature to disk.
+            Defaults to True.
         Returns:
-            np.ndarray: Loaded vgg feature.
+            np.ndarray | torch.Tensor: Loaded vgg feature.
     """
     if not hasattr(metric, 'vgg16_pkl'):
         return
@@ -501,67 +805,65 @@ def prepare_vgg_feat(dataloader: DataLoader,
     if vgg_pkl is None:
         vgg_pkl, args = get_vgg_feat_cache_name_and_args(dataloader, metric)
         vgg_pkl = osp.join(MMAGIC_CACHE_DIR, vgg_pkl)
+        save_pkl = False
     else:
         args = dict()
+        # the pkl file given by users is saved after extraction
+        save_pkl = True
     if osp.exists(vgg_pkl):
         with open(vgg_pkl, 'rb') as file:
             real_feat = pickle.load(file)['vgg_feat']
         print(f'load preprocessed feat from {vgg_pkl}')
         return real_feat
 
+    # features are saved as shards in the directory named by the pkl file
+    feat_cache = ShardedFeatureCache(
+        osp.splitext(vgg_pkl)[0], osp.basename(vgg_pkl), meta=args)
+    # follow rank 0, since other nodes may not share the file system
+    is_complete = [feat_cache.is_complete]
+    broadcast_object_list(is_complete)
+    if is_complete[0]:
+        print_log(f'load preprocessed feat from {feat_cache.cache_dir}',
+                  'current')
+        if is_main_process():
+            return feat_cache.load(mmap_mode='r')
+        return
+
     assert hasattr(
         metric,
         'vgg16'), ('Metric must have a vgg16 network to extract vgg features.')
 
-    real_feat = []
-
-    print_log(f'Vgg pkl \'{vgg_pkl}\' is not found, extract '
-              'manually.', 'current')
-
-    import rich.progress
-
-    # init rich pbar for the main process
-    if is_main_process():
-        columns = [
-            rich.progress.TextColumn('[bold blue]{task.description}'),
-            rich.progress.BarColumn(bar_width=40),
-            rich.progress.TaskProgressColumn(),
-            rich.progress.TimeRemainingColumn(),
-        ]
-        pbar = rich.progress.Progress(*columns)
-        pbar.start()
-        task = pbar.add_task(
-            'Calculate VGG16 Feature.',
-            total=len(dataloader.dataset),
-            visible=True)
-
-    for data in dataloader:
-        # set training = False to avoid norm + convert to BGR
-        data_samples = data_preprocessor(data, False)['data_samples']
-
-        real_key = 'gt_img' if metric.real_key is None else metric.real_key
-        img = getattr(data_samples, real_key)
-
-        real_feat_ = metric.extract_features(img)
-        real_feat.append(real_feat_)
-
+    print_log(
+        f'Vgg feature cache \'{feat_cache.cache_dir}\' is not found, '
+        'extract manually.', 'current')
+
+    num_items = len(dataloader.dataset)
+    if not auto_save:
+        real_feat = _extract_real_feat(dataloader, metric.extract_features,
+                                       metric.real_key, data_preprocessor,
+                                       _get_item_subset(num_items), None,
+                                       'Calculate VGG16 Feature.')
+        # use `all_gather` here, gather tensor is much quicker than gather
+        # object.
+        real_feat = all_gather(real_feat)
+        # only cat on the main process, restore the order of the dataset
         if is_main_process():
-            pbar.update(task, advance=len(real_feat_) * get_world_size())
-
-    # stop the pbar
-    if is_main_process():
-        pbar.stop()
-
-    # collect results
-    real_feat = torch.cat(real_feat)
-    # use `all_gather` here, gather tensor is much quicker than gather object.
-    real_feat = all_gather(real_feat)
+            real_feat = torch.stack(real_feat, dim=1).flatten(0, 1)
+            return real_feat[:num_items]
+        return
 
-    # only cat on the main process
-    if is_main_process():
-        real_feat = torch.cat(real_feat, dim=0)[:len(dataloader.dataset)].cpu()
-        if auto_save:
-            vgg_state = dict(vgg_feat=real_feat, **args)
-            with open(vgg_pkl, 'wb') as file:
-                pickle.dump(vgg_state, file)
+    _extract_real_feat(dataloader, metric.extract_features,
+                       metric.real_key, data_preprocessor,
+                       _get_item_subset(num_items), feat_cache,
+                       'Calculate VGG16 Feature.')
+    feat_cache.merge(num_items)
+    # the merged features are only available on the main process
+    if not is_main_process():
+        return
+    if save_pkl:
+        real_feat = np.array(feat_cache.load(mmap_mode='r'))
+        with open(vgg_pkl, 'wb') as file:
+            pickle.dump(dict(vgg_feat=real_feat, **args), file)
+        feat_cache.remove()
         return real_feat
+    return feat_cache.load(mmap_mode='r')
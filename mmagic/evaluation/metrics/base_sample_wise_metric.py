@@ -3,6 +3,7 @@
 
 from typing import List, Optional, Sequence
 
+import torch
 import torch.nn as nn
 from mmengine.evaluator import BaseMetric
 from mmengine.model import is_model_wrapper
@@ -36,6 +37,11 @@ class BaseSampleWiseMetric(BaseMetric):
         scaling (float, optional): Scaling factor for final metric.
             E.g. scaling=100 means the final metric will be amplified by 100
             for output. Default: 1
+        vectorized (bool): Whether to evaluate all samples of a batch at once
+            with :meth:`process_batch`. Samples are stacked into a tensor of
+            shape (N, T, ...) and single images are treated as one-frame
+            videos. If the shapes in a batch differ or a mask is used, it
+            falls back to :meth:`process_image`. Default: False
     """
 
     SAMPLER_MODE = 'normal'
@@ -48,6 +54,7 @@ class BaseSampleWiseMetric(BaseMetric):
                  mask_key: Optional[str] = None,
                  scaling=1,
                  device='cpu',
+                 vectorized: bool = False,
                  collect_device: str = 'cpu',
                  prefix: Optional[str] = None) -> None:
         assert self.metric is not None, (
@@ -59,6 +66,7 @@ class BaseSampleWiseMetric(BaseMetric):
         self.mask_key = mask_key
         self.scaling = scaling
         self.device = device
+        self.vectorized = vectorized
 
         self.channel_order = 'BGR'
 
@@ -88,6 +96,9 @@ class BaseSampleWiseMetric(BaseMetric):
                 the model.
         """
 
+        if self.vectorized and self._process_vectorized(data_samples):
+            return
+
         for data in data_samples:
             prediction = data['output']
 
@@ -109,9 +120,61 @@ class BaseSampleWiseMetric(BaseMetric):
 
             self.results.append({self.metric: result})
 
+    def _process_vectorized(self, data_samples: Sequence[dict]) -> bool:
+        """Process one batch of data with :meth:`process_batch`.
+
+        Args:
+            data_samples (Sequence[dict]): A batch of outputs from
+                the model.
+
+        Returns:
+            bool: Whether the batch has been processed. False means the batch
+            cannot be stacked and should be processed sample by sample.
+        """
+
+        if self.mask_key is not None or len(data_samples) == 0:
+            return False
+
+        gts, preds = [], []
+        for data in data_samples:
+            gt = obtain_data(data, self.gt_key, self.device)
+            pred = obtain_data(data['output'], self.pred_key, self.device)
+            gts.append(torch.as_tensor(gt, device=self.device))
+            preds.append(torch.as_tensor(pred, device=self.device))
+
+        shapes = set(tuple(img.shape) for img in gts + preds)
+        if len(shapes) != 1 or gts[0].ndim not in [3, 4]:
+            return False
+
+        gt = torch.stack(gts)
+        pred = torch.stack(preds)
+        if gt.ndim == 4:
+            gt = gt.unsqueeze(1)
+            pred = pred.unsqueeze(1)
+
+        # average over frames, the same as the sample wise path
+        results = self.process_batch(gt, pred).mean(dim=1)
+        for result in results.tolist():
+            self.results.append({self.metric: result})
+
+        return True
+
     def process_image(self, gt, pred, mask):
         raise NotImplementedError
 
+    def process_batch(self, gt: torch.Tensor,
+                      pred: torch.Tensor) -> torch.Tensor:
+        """Process a batch of images at once.
+
+        Args:
+            gt (Tensor): GT images with shape (N, T, ...).
+            pred (Tensor): Pred images with shape (N, T, ...).
+
+        Returns:
+            Tensor: Result of each frame with shape (N, T).
+        """
+        raise NotImplementedError
+
     def evaluate(self) -> dict:
         assert hasattr(self, 'size'), (
             'Cannot find \'size\', please make sure \'self.prepare\' is '
@@ -4,7 +4,7 @@ from typing import List, Optional, Sequence, Tuple
 import numpy as np
 import torch
 import torch.nn as nn
-from mmengine.dist import is_main_process
+from mmengine.dist import all_reduce, broadcast_object_list, is_main_process
 from scipy import linalg
 from torch import Tensor
 from torch.utils.data.dataloader import DataLoader
@@ -59,6 +59,22 @@ class FrechetInceptionDistance(GenerativeMetric):
             names to disambiguate homonymous metrics of different evaluators.
             If prefix is not provided in the argument, self.default_prefix
             will be used instead. Defaults to None.
+        sample_kwargs (dict): Sampling arguments for model test.
+        online_stats (bool): If True, only the running sum, the sum of outer
+            products and the number of the fake features are kept on each
+            rank, instead of all the fake features. These statistics are
+            summed across ranks and used to build the mean and covariance
+            of the fake distribution. Memory and communication cost are
+            constant regardless of `fake_nums`. Defaults to False.
+        sqrtm_backend (str): Backend to calculate the trace of the matrix
+            square root of the covariance product. 'scipy' uses
+            `scipy.linalg.sqrtm` on the CPU. 'eigh' uses symmetric
+            eigendecomposition in float64 on the device of the model, which
+            is much faster. Defaults to 'scipy'.
+        incremental_cache (bool): If True and `inception_pkl` is None, the
+            inception feature of each real image is cached by the content
+            hash of its file. When the dataset grows or changes, only the
+            features of new or changed files are extracted. Defaults to False.
     """
     name = 'FID'
 
@@ -74,7 +90,10 @@ class FrechetInceptionDistance(GenerativeMetric):
                  sample_model: str = 'orig',
                  collect_device: str = 'cpu',
                  prefix: Optional[str] = None,
-                 sample_kwargs: dict = dict()):
+                 sample_kwargs: dict = dict(),
+                 online_stats: bool = False,
+                 sqrtm_backend: str = 'scipy',
+                 incremental_cache: bool = False):
         super().__init__(fake_nums, real_nums, fake_key, real_key,
                          need_cond_input, sample_model, collect_device, prefix,
                          sample_kwargs)
@@ -84,6 +103,39 @@ class FrechetInceptionDistance(GenerativeMetric):
         self.inception, self.inception_style = self._load_inception(
             inception_style, inception_path)
         self.inception_pkl = inception_pkl
+        self.incremental_cache = incremental_cache
+
+        self.online_stats = online_stats
+        self._reset_fake_stats()
+
+        assert sqrtm_backend in [
+            'scipy', 'eigh'
+        ], ('\'sqrtm_backend\' must be \'scipy\' or \'eigh\', but receive '
+            f'\'{sqrtm_backend}\'.')
+        self.sqrtm_backend = sqrtm_backend
+
+    def _reset_fake_stats(self) -> None:
+        """Reset the sufficient statistics of fake features used in
+        `online_stats` mode."""
+        self.fake_feat_sum = None
+        self.fake_feat_outer_sum = None
+        self.fake_feat_num = 0
+
+    def _update_fake_stats(self, feat: Tensor) -> None:
+        """Accumulate fake features to the sufficient statistics.
+
+        Args:
+            feat (Tensor): Features of fake images, shape like (N, C).
+        """
+        feat = feat[:self.fake_nums_per_device - self.fake_feat_num]
+        feat = feat.to(torch.float64)
+        if self.fake_feat_sum is None:
+            self.fake_feat_sum = feat.new_zeros(feat.shape[1])
+            self.fake_feat_outer_sum = feat.new_zeros(
+                (feat.shape[1], feat.shape[1]))
+        self.fake_feat_sum += feat.sum(dim=0)
+        self.fake_feat_outer_sum += feat.T @ feat
+        self.fake_feat_num += feat.shape[0]
 
     def prepare(self, module: nn.Module, dataloader: DataLoader) -> None:
         """Preparing inception feature for the real images.
@@ -96,7 +148,11 @@ class FrechetInceptionDistance(GenerativeMetric):
         self.inception.to(self.device)
         self.inception.eval()
         inception_feat_dict = prepare_inception_feat(
-            dataloader, self, module.data_preprocessor, capture_mean_cov=True)
+            dataloader,
+            self,
+            module.data_preprocessor,
+            capture_mean_cov=True,
+            incremental=self.incremental_cache)
         if is_main_process():
             self.real_mean = inception_feat_dict['real_mean']
             self.real_cov = inception_feat_dict['real_cov']
@@ -154,7 +210,9 @@ class FrechetInceptionDistance(GenerativeMetric):
             data_batch (dict): A batch of data from the dataloader.
             data_samples (Sequence[dict]): A batch of outputs from the model.
         """
-        if len(self.fake_results) >= self.fake_nums_per_device:
+        num_processed = self.fake_feat_num if self.online_stats else len(
+            self.fake_results)
+        if num_processed >= self.fake_nums_per_device:
             return
 
         fake_imgs = []
@@ -183,39 +241,88 @@ class FrechetInceptionDistance(GenerativeMetric):
             feat_list = [
                 self.forward_inception(img[None, ...]) for img in fake_imgs
             ]
-        self.fake_results += feat_list
+
+        if self.online_stats:
+            self._update_fake_stats(torch.cat(feat_list, dim=0))
+        else:
+            self.fake_results += feat_list
+
+    @staticmethod
+    def _calc_trace_sqrt_product(sample_cov: np.ndarray,
+                                 real_cov: np.ndarray,
+                                 device: str = 'cpu') -> float:
+        """Calculate the trace of sqrtm(sample_cov @ real_cov) with symmetric
+        eigendecomposition.
+
+        For positive semi-definite A and B, A @ B is similar to
+        sqrtm(A) @ B @ sqrtm(A), which is symmetric. Therefore, the trace of
+        sqrtm(A @ B) is the sum of the square roots of the eigenvalues of
+        sqrtm(A) @ B @ sqrtm(A). Computation runs in float64 on `device`.
+
+        Args:
+            sample_cov (np.ndarray): Covariance of the fake samples.
+            real_cov (np.ndarray): Covariance of the real samples.
+            device (str): Device to run the eigendecomposition.
+                Defaults to 'cpu'.
+
+        Returns:
+            float: Trace of the matrix square root.
+        """
+        sample_cov = torch.from_numpy(
+            np.asarray(sample_cov, dtype=np.float64)).to(device)
+        real_cov = torch.from_numpy(np.asarray(real_cov,
+                                               dtype=np.float64)).to(device)
+
+        eigval, eigvec = torch.linalg.eigh(sample_cov)
+        # clamp the negative eigenvalues caused by numerical error
+        sample_cov_sqrt = (eigvec * eigval.clamp(min=0).sqrt()) @ eigvec.T
+        mat = sample_cov_sqrt @ real_cov @ sample_cov_sqrt
+        mat = (mat + mat.T) / 2
+        eigval = torch.linalg.eigvalsh(mat).clamp(min=0)
+
+        return eigval.sqrt().sum().item()
 
     @staticmethod
     def _calc_fid(sample_mean: np.ndarray,
                   sample_cov: np.ndarray,
                   real_mean: np.ndarray,
                   real_cov: np.ndarray,
-                  eps: float = 1e-6) -> Tuple[float]:
+                  eps: float = 1e-6,
+                  sqrtm_backend: str = 'scipy',
+                  device: str = 'cpu') -> Tuple[float]:
         """Refer to the implementation from:
 
         https://github.com/rosinality/stylegan2-pytorch/blob/master/fid.py#L34
+
+        If `sqrtm_backend` is 'eigh', the trace of the matrix square root is
+        calculated by :meth:`_calc_trace_sqrt_product` on `device` instead of
+        `scipy.linalg.sqrtm`.
         """
-        cov_sqrt, _ = linalg.sqrtm(sample_cov @ real_cov, disp=False)
+        if sqrtm_backend == 'eigh':
+            trace_cov_sqrt = FrechetInceptionDistance._calc_trace_sqrt_product(
+                sample_cov, real_cov, device)
+        else:
+            cov_sqrt, _ = linalg.sqrtm(sample_cov @ real_cov, disp=False)
 
-        if not np.isfinite(cov_sqrt).all():
-            print('product of cov matrices is singular')
-            offset = np.eye(sample_cov.shape[0]) * eps
-            cov_sqrt = linalg.sqrtm(
-                (sample_cov + offset) @ (real_cov + offset))
+            if not np.isfinite(cov_sqrt).all():
+                print('product of cov matrices is singular')
+                offset = np.eye(sample_cov.shape[0]) * eps
+                cov_sqrt = linalg.sqrtm(
+                    (sample_cov + offset) @ (real_cov + offset))
 
-        if np.iscomplexobj(cov_sqrt):
-            if not np.allclose(np.diagonal(cov_sqrt).imag, 0, atol=1e-3):
-                m = np.max(np.abs(cov_sqrt.imag))
+            if np.iscomplexobj(cov_sqrt):
+                if not np.allclose(np.diagonal(cov_sqrt).imag, 0, atol=1e-3):
+                    m = np.max(np.abs(cov_sqrt.imag))
 
-                raise ValueError(f'Imaginary component {m}')
+                    raise ValueError(f'Imaginary component {m}')
 
-            cov_sqrt = cov_sqrt.real
+                cov_sqrt = cov_sqrt.real
+            trace_cov_sqrt = np.trace(cov_sqrt)
 
         mean_diff = sample_mean - real_mean
         mean_norm = mean_diff @ mean_diff
 
-        trace = np.trace(sample_cov) + np.trace(
-            real_cov) - 2 * np.trace(cov_sqrt)
+        trace = np.trace(sample_cov) + np.trace(real_cov) - 2 * trace_cov_sqrt
 
         fid = mean_norm + trace
 
@@ -236,11 +343,95 @@ class FrechetInceptionDistance(GenerativeMetric):
         fake_mean = np.mean(fake_feats_np, 0)
         fake_cov = np.cov(fake_feats_np, rowvar=False)
 
-        fid, mean, cov = self._calc_fid(fake_mean, fake_cov, self.real_mean,
-                                        self.real_cov)
+        fid, mean, cov = self._calc_fid(
+            fake_mean,
+            fake_cov,
+            self.real_mean,
+            self.real_cov,
+            sqrtm_backend=self.sqrtm_backend,
+            device=self.device)
+
+        return {'fid': fid, 'mean': mean, 'cov': cov}
+
+    def _compute_metrics_from_stats(self) -> dict:
+        """Compute the result of FID metric from the sufficient statistics
+        summed across all ranks.
+
+        Returns:
+            dict: A dict of the computed FID metric and its mean and
+                covariance.
+        """
+        # ranks without fake features (e.g. `fake_nums` is smaller than the
+        # world size) contribute zero statistics, so that all ranks join
+        # the `all_reduce` below
+        feat_dim = torch.tensor(
+            0 if self.fake_feat_sum is None else self.fake_feat_sum.numel(),
+            device=self.device)
+        all_reduce(feat_dim, op='max')
+        assert feat_dim > 0, (
+            f'{self.__class__.__name__} got no fake features. Please ensure '
+            'that `process` is called before `evaluate`.')
+        if self.fake_feat_sum is None:
+            self.fake_feat_sum = torch.zeros(
+                int(feat_dim), dtype=torch.float64, device=self.device)
+            self.fake_feat_outer_sum = torch.zeros(
+                (int(feat_dim), int(feat_dim)),
+                dtype=torch.float64,
+                device=self.device)
+        stats = [
+            self.fake_feat_sum, self.fake_feat_outer_sum,
+            self.fake_feat_sum.new_tensor(self.fake_feat_num)
+        ]
+        for stat in stats:
+            all_reduce(stat, op='sum')
+        if not is_main_process():
+            return None
+
+        feat_sum, outer_sum, num = [stat.cpu().numpy() for stat in stats]
+        fake_mean = feat_sum / num
+        # unbiased estimation, the same as `np.cov`
+        fake_cov = (outer_sum - num * np.outer(fake_mean, fake_mean)) / (
+            num - 1)
+
+        fid, mean, cov = self._calc_fid(
+            fake_mean,
+            fake_cov,
+            self.real_mean,
+            self.real_cov,
+            sqrtm_backend=self.sqrtm_backend,
+            device=self.device)
 
         return {'fid': fid, 'mean': mean, 'cov': cov}
 
+    def evaluate(self) -> dict:
+        """Evaluate FID metric. If `online_stats` is True, the metric is
+        computed from the accumulated statistics instead of the collected
+        fake features.
+
+        Returns:
+            dict: Evaluation metrics dict on the val dataset. The keys are the
+                names of the metrics, and the values are corresponding results.
+        """
+        if not self.online_stats:
+            return super().evaluate()
+
+        _metrics = self._compute_metrics_from_stats()
+        if is_main_process():
+            # Add prefix to metric names
+            if self.prefix:
+                _metrics = {
+                    '/'.join((self.prefix, k)): v
+                    for k, v in _metrics.items()
+                }
+        metrics = [_metrics]
+
+        broadcast_object_list(metrics)
+
+        # reset the statistics
+        self._reset_fake_stats()
+
+        return metrics[0]
+
 
 @METRICS.register_module()
 class TransFID(FrechetInceptionDistance):
@@ -255,12 +446,27 @@ class TransFID(FrechetInceptionDistance):
                  real_key: Optional[str] = 'img',
                  sample_model: str = 'ema',
                  collect_device: str = 'cpu',
-                 prefix: Optional[str] = None):
+                 prefix: Optional[str] = None,
+                 online_stats: bool = False,
+                 sqrtm_backend: str = 'scipy',
+                 incremental_cache: bool = False):
         # NOTE: set `need_cond` as False since we direct return the original
         # dataloader as sampler
-        super().__init__(fake_nums, real_nums, inception_style, inception_path,
-                         inception_pkl, fake_key, real_key, False,
-                         sample_model, collect_device, prefix)
+        super().__init__(
+            fake_nums,
+            real_nums,
+            inception_style,
+            inception_path,
+            inception_pkl,
+            fake_key,
+            real_key,
+            False,
+            sample_model,
+            collect_device,
+            prefix,
+            online_stats=online_stats,
+            sqrtm_backend=sqrtm_backend,
+            incremental_cache=incremental_cache)
 
         self.SAMPLER_MODE = 'normal'
 
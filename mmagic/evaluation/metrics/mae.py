@@ -2,6 +2,7 @@
 """Evaluation metrics based on pixels."""
 
 import numpy as np
+import torch
 
 from mmagic.registry import METRICS
 from .base_sample_wise_metric import BaseSampleWiseMetric
@@ -26,6 +27,9 @@ class MAE(BaseSampleWiseMetric):
             names to disambiguate homonymous metrics of different evaluators.
             If prefix is not provided in the argument, self.default_prefix
             will be used instead. Default: None
+        vectorized (bool): Whether to compute the whole batch at once in
+            torch. Only works without mask. See
+            :class:`BaseSampleWiseMetric`. Default: False.
 
     Metrics:
         - MAE (float): Mean of Absolute Error
@@ -58,3 +62,18 @@ class MAE(BaseSampleWiseMetric):
             result = diff.mean()
 
         return result
+
+    def process_batch(self, gt: torch.Tensor,
+                      pred: torch.Tensor) -> torch.Tensor:
+        """Process a batch of images.
+
+        Args:
+            gt (Tensor): GT images with shape (N, T, ...).
+            pred (Tensor): Pred images with shape (N, T, ...).
+        Returns:
+            Tensor: MAE of each frame with shape (N, T).
+        """
+
+        diff = gt.to(torch.float64) / 255. - pred.to(torch.float64) / 255.
+
+        return diff.abs().flatten(2).mean(dim=2)
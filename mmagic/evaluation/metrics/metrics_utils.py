@@ -126,6 +126,61 @@ def img_transform(img,
     return img
 
 
+def img_transform_batch(imgs,
+                        crop_border=0,
+                        input_order='HWC',
+                        convert_to=None,
+                        channel_order='rgb'):
+    """Batched version of :func:`img_transform` in torch.
+
+    Args:
+        imgs (Tensor): Images with range [0, 255] and shape (N, T, C, H, W)
+            or (N, T, H, W, C).
+        crop_border (int): Cropped pixels in each edges of an image. These
+            pixels are not involved in the calculation. Default: 0.
+        input_order (str): Whether the input order is 'HWC' or 'CHW'.
+            Default: 'HWC'.
+        convert_to (str): Whether to convert the images to other color models.
+            If None, the images are not altered. When computing for 'Y',
+            the images are assumed to be in BGR order. Options are 'Y' and
+            None. Default: None.
+        channel_order (str): The channel order of image. Default: 'rgb'
+
+    Returns:
+        Tensor: Transformed images in float64 with shape (N, T, C, H, W).
+    """
+
+    if input_order not in ['HWC', 'CHW']:
+        raise ValueError(
+            f'Wrong input_order {input_order}. Supported input_orders are '
+            '"HWC" and "CHW"')
+
+    if input_order == 'HWC':
+        imgs = imgs.permute(0, 1, 4, 2, 3)
+    imgs = imgs.to(torch.float64)
+
+    if isinstance(convert_to, str) and convert_to.lower() == 'y':
+        # the same coefficients as `mmcv.rgb2ycbcr` and `mmcv.bgr2ycbcr`
+        if channel_order.upper() == 'RGB':
+            weight = [65.481, 128.553, 24.966]
+        elif channel_order.upper() == 'BGR':
+            weight = [24.966, 128.553, 65.481]
+        else:
+            raise ValueError(
+                'Only support `rgb2y` and `bgr2`, but the channel_order '
+                f'is {channel_order}')
+        weight = imgs.new_tensor(weight).view(1, 1, 3, 1, 1)
+        imgs = (imgs * weight).sum(dim=2, keepdim=True) / 255. + 16.
+    elif convert_to is not None:
+        raise ValueError('Wrong color model. Supported values are '
+                         '"Y" and None.')
+
+    if crop_border != 0:
+        imgs = imgs[..., crop_border:-crop_border, crop_border:-crop_border]
+
+    return imgs
+
+
 def obtain_data(data_sample, key, device='cpu'):
     """Obtain data of key from data_sample and converse data to device.
     Args:
@@ -1,6 +1,8 @@
 # Copyright (c) OpenMMLab. All rights reserved.
 """Evaluation metrics based on pixels."""
 
+import torch
+
 from mmagic.registry import METRICS
 from .base_sample_wise_metric import BaseSampleWiseMetric
 
@@ -24,6 +26,9 @@ class MSE(BaseSampleWiseMetric):
             names to disambiguate homonymous metrics of different evaluators.
             If prefix is not provided in the argument, self.default_prefix
             will be used instead. Default: None
+        vectorized (bool): Whether to compute the whole batch at once in
+            torch. Only works without mask. See
+            :class:`BaseSampleWiseMetric`. Default: False.
 
     Metrics:
         - MSE (float): Mean of Squared Error
@@ -55,3 +60,18 @@ class MSE(BaseSampleWiseMetric):
             result = diff.mean()
 
         return result
+
+    def process_batch(self, gt: torch.Tensor,
+                      pred: torch.Tensor) -> torch.Tensor:
+        """Process a batch of images.
+
+        Args:
+            gt (Tensor): GT images with shape (N, T, ...).
+            pred (Tensor): Pred images with shape (N, T, ...).
+        Returns:
+            Tensor: MSE of each frame with shape (N, T).
+        """
+
+        diff = gt.to(torch.float64) / 255. - pred.to(torch.float64) / 255.
+
+        return (diff**2).flatten(2).mean(dim=2)
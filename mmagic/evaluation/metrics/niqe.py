@@ -1,11 +1,15 @@
 # Copyright (c) OpenMMLab. All rights reserved.
 import math
 import os
+from functools import partial
+from multiprocessing import Pool
 from typing import Optional
 
 import cv2
 import mmcv
 import numpy as np
+import torch
+from numpy.lib.stride_tricks import sliding_window_view
 from scipy.ndimage import convolve
 from scipy.special import gamma
 
@@ -47,6 +51,11 @@ class NIQE(BaseSampleWiseMetric):
             If None, the images are not altered. When computing for 'Y',
             the images are assumed to be in BGR order. Options are 'Y' and
             None. Default: 'gray'.
+        vectorized (bool): Whether to compute the features of all blocks at
+            once and evaluate the whole batch with :meth:`process_batch`.
+            Default: False.
+        nproc (int): Number of processes to evaluate the images of a batch
+            in parallel. Only works when ``vectorized`` is True. Default: 1.
 
     Metrics:
         - NIQE (float): Natural Image Quality Evaluator
@@ -61,8 +70,13 @@ class NIQE(BaseSampleWiseMetric):
                  prefix: Optional[str] = None,
                  crop_border=0,
                  input_order='HWC',
-                 convert_to='gray') -> None:
-        super().__init__(collect_device=collect_device, prefix=prefix)
+                 convert_to='gray',
+                 vectorized: bool = False,
+                 nproc: int = 1) -> None:
+        super().__init__(
+            vectorized=vectorized,
+            collect_device=collect_device,
+            prefix=prefix)
 
         convert_to = convert_to.lower()
         assert convert_to in [
@@ -75,6 +89,7 @@ class NIQE(BaseSampleWiseMetric):
         self.crop_border = crop_border
         self.input_order = input_order
         self.convert_to = convert_to
+        self.nproc = nproc
 
     def process_image(self, gt, pred, mask) -> None:
         """Process an image.
@@ -91,9 +106,38 @@ class NIQE(BaseSampleWiseMetric):
             img=pred,
             crop_border=self.crop_border,
             input_order=self.input_order,
-            convert_to=self.convert_to)
+            convert_to=self.convert_to,
+            vectorized=self.vectorized)
         return result
 
+    def process_batch(self, gt: torch.Tensor,
+                      pred: torch.Tensor) -> torch.Tensor:
+        """Process a batch of images. Images are split across ``nproc``
+        processes.
+
+        Args:
+            gt (Tensor): GT images with shape (N, T, ...).
+            pred (Tensor): Pred images with shape (N, T, ...).
+        Returns:
+            Tensor: NIQE of each frame with shape (N, T).
+        """
+
+        imgs = list(pred.flatten(0, 1).cpu().numpy())
+        niqe_fn = partial(
+            niqe,
+            crop_border=self.crop_border,
+            input_order=self.input_order,
+            convert_to=self.convert_to,
+            vectorized=True)
+        if self.nproc > 1 and len(imgs) > 1:
+            with Pool(min(self.nproc, len(imgs))) as pool:
+                results = pool.map(niqe_fn, imgs)
+        else:
+            results = [niqe_fn(img) for img in imgs]
+
+        return torch.tensor(np.array(results,
+                                     dtype=np.float64)).view(pred.shape[:2])
+
 
 def estimate_aggd_param(block):
     """Estimate AGGD (Asymmetric Generalized Gaussian Distribution) parameters.
@@ -125,6 +169,69 @@ def estimate_aggd_param(block):
     return (alpha, beta_l, beta_r)
 
 
+def estimate_aggd_param_batch(blocks):
+    """Estimate AGGD parameters of a batch of blocks at once.
+
+    It is the vectorized version of func:`estimate_aggd_param`.
+
+    Args:
+        blocks (np.ndarray): Image blocks with shape (n, h, w).
+
+    Returns:
+        tuple: alpha, beta_l and beta_r with shape (n, ) for the AGGD
+            distribution of each block.
+    """
+    blocks = blocks.reshape(blocks.shape[0], -1)
+    gam = np.arange(0.2, 10.001, 0.001)  # len = 9801
+    gam_reciprocal = np.reciprocal(gam)
+    r_gam = np.square(gamma(gam_reciprocal * 2)) / (
+        gamma(gam_reciprocal) * gamma(gam_reciprocal * 3))
+
+    square = blocks**2
+    # blocks without negative or positive values lead to nan, the same as
+    # `np.mean` of an empty array
+    with np.errstate(divide='ignore', invalid='ignore'):
+        left_std = np.sqrt(
+            (square * (blocks < 0)).sum(axis=1) / (blocks < 0).sum(axis=1))
+        right_std = np.sqrt(
+            (square * (blocks > 0)).sum(axis=1) / (blocks > 0).sum(axis=1))
+        gammahat = left_std / right_std
+        rhat = (np.mean(np.abs(blocks), axis=1))**2 / np.mean(square, axis=1)
+    rhatnorm = (rhat * (gammahat**3 + 1) *
+                (gammahat + 1)) / ((gammahat**2 + 1)**2)
+    array_position = np.argmin((r_gam[None, :] - rhatnorm[:, None])**2, axis=1)
+
+    alpha = gam[array_position]
+    beta_l = left_std * np.sqrt(gamma(1 / alpha) / gamma(3 / alpha))
+    beta_r = right_std * np.sqrt(gamma(1 / alpha) / gamma(3 / alpha))
+    return (alpha, beta_l, beta_r)
+
+
+def compute_feature_batch(blocks):
+    """Compute features of a batch of blocks at once.
+
+    It is the vectorized version of func:`compute_feature`.
+
+    Args:
+        blocks (np.ndarray): Image blocks with shape (n, h, w).
+
+    Returns:
+        np.ndarray: Features with shape (n, 18).
+    """
+    feat = []
+    alpha, beta_l, beta_r = estimate_aggd_param_batch(blocks)
+    feat.extend([alpha, (beta_l + beta_r) / 2])
+
+    shifts = [[0, 1], [1, 0], [1, 1], [1, -1]]
+    for shift in shifts:
+        shifted_blocks = np.roll(blocks, shift, axis=(1, 2))
+        alpha, beta_l, beta_r = estimate_aggd_param_batch(blocks *
+                                                          shifted_blocks)
+        mean = (beta_r - beta_l) * (gamma(2 / alpha) / gamma(1 / alpha))
+        feat.extend([alpha, mean, beta_l, beta_r])
+    return np.stack(feat, axis=1)
+
+
 def compute_feature(block):
     """Compute features.
 
@@ -156,7 +263,8 @@ def niqe_core(img,
               cov_pris_param,
               gaussian_window,
               block_size_h=96,
-              block_size_w=96):
+              block_size_w=96,
+              vectorized=False):
     """Calculate NIQE (Natural Image Quality Evaluator) metric.
 
     Ref: Making a "Completely Blind" Image Quality Analyzer.
@@ -184,6 +292,9 @@ def niqe_core(img,
             Default: 96 (the official recommended value). Default: 96.
         block_size_w (int): Width of the blocks in to which image is divided.
             Default: 96 (the official recommended value). Default: 96.
+        vectorized (bool): Whether to extract all blocks as a strided view
+            and compute their features at once, and to downsample with the
+            vectorized :class:`MATLABLikeResize`. Default: False.
 
     Returns:
         np.ndarray: NIQE quality.
@@ -205,22 +316,33 @@ def niqe_core(img,
         # normalize, as in Eq. 1 in the paper
         img_nomalized = (img - mu) / (sigma + 1)
 
-        feat = []
-        for idx_w in range(num_block_w):
-            for idx_h in range(num_block_h):
-                # process each block
-                block = img_nomalized[idx_h * block_size_h //
-                                      scale:(idx_h + 1) * block_size_h //
-                                      scale, idx_w * block_size_w //
-                                      scale:(idx_w + 1) * block_size_w //
-                                      scale]
-                feat.append(compute_feature(block))
-
-        distparam.append(np.array(feat))
+        if (vectorized and block_size_h % scale == 0
+                and block_size_w % scale == 0):
+            size_h, size_w = block_size_h // scale, block_size_w // scale
+            # (num_block_h, num_block_w, size_h, size_w), keep the order of
+            # blocks the same as the loop below
+            blocks = sliding_window_view(img_nomalized,
+                                         (size_h, size_w))[::size_h, ::size_w]
+            blocks = blocks.transpose(1, 0, 2, 3).reshape(-1, size_h, size_w)
+            distparam.append(compute_feature_batch(blocks))
+        else:
+            feat = []
+            for idx_w in range(num_block_w):
+                for idx_h in range(num_block_h):
+                    # process each block
+                    block = img_nomalized[idx_h * block_size_h //
+                                          scale:(idx_h + 1) * block_size_h //
+                                          scale, idx_w * block_size_w //
+                                          scale:(idx_w + 1) * block_size_w //
+                                          scale]
+                    feat.append(compute_feature(block))
+
+            distparam.append(np.array(feat))
 
         # matlab-like bicubic downsample with anti-aliasing
         if scale == 1:
-            resize = MATLABLikeResize(keys=None, scale=0.5)
+            resize = MATLABLikeResize(
+                keys=None, scale=0.5, vectorized=vectorized)
             img = resize._resize(img[:, :, np.newaxis] / 255.)[:, :, 0] * 255.
 
     distparam = np.concatenate(distparam, axis=1)
@@ -239,7 +361,11 @@ def niqe_core(img,
     return np.squeeze(np.sqrt(quality))
 
 
-def niqe(img, crop_border, input_order='HWC', convert_to='y'):
+def niqe(img,
+         crop_border,
+         input_order='HWC',
+         convert_to='y',
+         vectorized=False):
     """Calculate NIQE (Natural Image Quality Evaluator) metric.
 
     Ref: Making a "Completely Blind" Image Quality Analyzer.
@@ -261,6 +387,8 @@ def niqe(img, crop_border, input_order='HWC', convert_to='y'):
             Default: 'HWC'.
         convert_to (str): Whether converted to 'y' (of MATLAB YCbCr) or 'gray'.
             Default: 'y'.
+        vectorized (bool): Whether to compute the features of all blocks at
+            once. Default: False.
 
     Returns:
         niqe_result (float): NIQE result.
@@ -289,7 +417,11 @@ def niqe(img, crop_border, input_order='HWC', convert_to='y'):
     # round to follow official implementation
     img = img.round()
 
-    niqe_result = niqe_core(img, mu_pris_param, cov_pris_param,
-                            gaussian_window)
+    niqe_result = niqe_core(
+        img,
+        mu_pris_param,
+        cov_pris_param,
+        gaussian_window,
+        vectorized=vectorized)
 
     return niqe_result
@@ -1,5 +1,6 @@
 # Copyright (c) OpenMMLab. All rights reserved.
 import os
+import warnings
 from typing import Optional, Sequence, Tuple
 
 import numpy as np
@@ -44,6 +45,77 @@ def compute_pr_distances(row_features,
     return torch.cat(dist_batches, dim=1)[:, :num_cols] if rank == 0 else None
 
 
+def compute_pr_kth_radii(features,
+                         k=3,
+                         row_batch_size=10000,
+                         col_batch_size=10000):
+    r"""Compute the distance of each feature to its kth nearest neighbor in
+    streaming top-k form.
+
+    Different from :func:`compute_pr_distances`, the full distance matrix is
+    never built. For each batch of rows, only the smallest ``k + 1``
+    distances (the feature itself included) seen so far are kept while
+    iterating over batches of columns.
+
+    Args:
+        features (torch.Tensor): Features with shape (n, c).
+        k (int): Kth nearest parameter. Defaults to 3.
+        row_batch_size (int): The batch size of row data. Defaults to 10000.
+        col_batch_size (int): The batch size of col data. Defaults to 10000.
+
+    Returns:
+        torch.Tensor: The kth nearest distance of each feature with shape
+            (n, ).
+    """
+    assert k + 1 <= features.shape[0], (
+        f'Need at least \'{k + 1}\' features to find the kth nearest '
+        f'neighbor, but only \'{features.shape[0]}\' are given.')
+    kth = []
+    for row_batch in features.split(row_batch_size):
+        topk = None
+        for col_batch in features.split(col_batch_size):
+            dist = torch.cdist(row_batch.unsqueeze(0),
+                               col_batch.unsqueeze(0))[0].to(torch.float32)
+            if topk is not None:
+                dist = torch.cat([topk, dist], dim=1)
+            topk = dist.topk(
+                min(k + 1, dist.shape[1]), dim=1, largest=False).values
+        kth.append(topk[:, k])
+    return torch.cat(kth)
+
+
+def compute_pr_membership(probes,
+                          manifold,
+                          kth,
+                          row_batch_size=10000,
+                          col_batch_size=10000):
+    r"""Check whether each probe falls in the hypersphere of any manifold
+    feature, without building the full distance matrix.
+
+    Args:
+        probes (torch.Tensor): Probe features with shape (m, c).
+        manifold (torch.Tensor): Manifold features with shape (n, c).
+        kth (torch.Tensor): Radius of the hypersphere of each manifold feature
+            with shape (n, ).
+        row_batch_size (int): The batch size of row data. Defaults to 10000.
+        col_batch_size (int): The batch size of col data. Defaults to 10000.
+
+    Returns:
+        torch.Tensor: Boolean membership of each probe with shape (m, ).
+    """
+    pred = []
+    for probes_batch in probes.split(row_batch_size):
+        inside = torch.zeros(
+            probes_batch.shape[0], dtype=torch.bool, device=probes.device)
+        for manifold_batch, kth_batch in zip(
+                manifold.split(col_batch_size), kth.split(col_batch_size)):
+            dist = torch.cdist(
+                probes_batch.unsqueeze(0), manifold_batch.unsqueeze(0))[0]
+            inside |= (dist <= kth_batch).any(dim=1)
+        pred.append(inside)
+    return torch.cat(pred)
+
+
 @METRICS.register_module('PR')
 @METRICS.register_module()
 class PrecisionAndRecall(GenerativeMetric):
@@ -89,6 +161,10 @@ class PrecisionAndRecall(GenerativeMetric):
             col_batch_size (int, optional): The batch size of col data.
                 Defaults to 10000.
             auto_save (bool, optional): Whether save vgg feature automatically.
+            knn_backend (str, optional): The backend to compute the kth
+                nearest neighbors. 'cdist' builds the full distance matrix
+                and 'streaming' keeps only the running top-k distances, which
+                is suitable for large sample sets. Defaults to 'cdist'.
             need_cond_input (bool): If true, the sampler will return the
                 conditional input randomly sampled from the original dataset.
                 This require the dataset implement `get_data_info` and field
@@ -115,7 +191,8 @@ class PrecisionAndRecall(GenerativeMetric):
                  vgg16_pkl=None,
                  row_batch_size=10000,
                  col_batch_size=10000,
-                 auto_save=True):
+                 auto_save=True,
+                 knn_backend: str = 'cdist'):
         super().__init__(fake_nums, real_nums, fake_key, real_key,
                          need_cond_input, sample_model, collect_device, prefix)
         print_log('loading vgg16 for improved precision and recall...',
@@ -128,6 +205,12 @@ class PrecisionAndRecall(GenerativeMetric):
         self.row_batch_size = row_batch_size
         self.col_batch_size = col_batch_size
 
+        assert knn_backend in [
+            'cdist', 'streaming'
+        ], ('Only support \'cdist\' and \'streaming\' for \'knn_backend\','
+            f' but receive \'{knn_backend}\'.')
+        self.knn_backend = knn_backend
+
     def _load_vgg(self, vgg16_script: Optional[str]) -> Tuple[nn.Module, bool]:
         """Load VGG network from the given path.
 
@@ -189,6 +272,17 @@ class PrecisionAndRecall(GenerativeMetric):
             ('precision', real_features, gen_features),
             ('recall', gen_features, real_features)
         ]:
+            if self.knn_backend == 'streaming':
+                kth = compute_pr_kth_radii(manifold, self.k,
+                                           self.row_batch_size,
+                                           self.col_batch_size)
+                pred = compute_pr_membership(probes, manifold,
+                                             kth.to(torch.float16),
+                                             self.row_batch_size,
+                                             self.col_batch_size)
+                self._result_dict[name] = float(pred.to(torch.float32).mean())
+                continue
+
             kth = []
             for manifold_batch in manifold.split(self.row_batch_size):
                 distance = compute_pr_distances(
@@ -250,7 +344,14 @@ class PrecisionAndRecall(GenerativeMetric):
 
         vgg_feat = prepare_vgg_feat(dataloader, self, module.data_preprocessor,
                                     self.auto_save)
-        if self.real_nums != -1:
+        if isinstance(vgg_feat, np.ndarray):
+            # the memory-mapped feature is read-only and never modified in
+            # place, ignore the warning of non-writable array
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore')
+                vgg_feat = torch.from_numpy(vgg_feat)
+        # only the main process computes the metric and gets the feature
+        if vgg_feat is not None and self.real_nums != -1:
             assert self.real_nums <= vgg_feat.shape[0], (
                 f'Need \'{self.real_nums}\' of real nums, but only '
                 f'\'{vgg_feat.shape[0]}\' images be found in the '
@@ -2,10 +2,11 @@
 from typing import Optional
 
 import numpy as np
+import torch
 
 from mmagic.registry import METRICS
 from .base_sample_wise_metric import BaseSampleWiseMetric
-from .metrics_utils import img_transform
+from .metrics_utils import img_transform, img_transform_batch
 
 
 @METRICS.register_module()
@@ -33,6 +34,8 @@ class PSNR(BaseSampleWiseMetric):
             If None, the images are not altered. When computing for 'Y',
             the images are assumed to be in BGR order. Options are 'Y' and
             None. Default: None.
+        vectorized (bool): Whether to compute the whole batch at once in
+            torch. See :class:`BaseSampleWiseMetric`. Default: False.
 
     Metrics:
         - PSNR (float): Peak Signal-to-Noise Ratio
@@ -47,11 +50,13 @@ class PSNR(BaseSampleWiseMetric):
                  prefix: Optional[str] = None,
                  crop_border=0,
                  input_order='CHW',
-                 convert_to=None) -> None:
+                 convert_to=None,
+                 vectorized: bool = False) -> None:
         super().__init__(
             gt_key=gt_key,
             pred_key=pred_key,
             mask_key=None,
+            vectorized=vectorized,
             collect_device=collect_device,
             prefix=prefix)
 
@@ -78,6 +83,29 @@ class PSNR(BaseSampleWiseMetric):
             convert_to=self.convert_to,
             channel_order=self.channel_order)
 
+    def process_batch(self, gt: torch.Tensor,
+                      pred: torch.Tensor) -> torch.Tensor:
+        """Process a batch of images.
+
+        Args:
+            gt (Tensor): GT images with shape (N, T, ...).
+            pred (Tensor): Pred images with shape (N, T, ...).
+        Returns:
+            Tensor: PSNR of each frame with shape (N, T).
+        """
+
+        kwargs = dict(
+            crop_border=self.crop_border,
+            input_order=self.input_order,
+            convert_to=self.convert_to,
+            channel_order=self.channel_order)
+        gt = img_transform_batch(gt, **kwargs)
+        pred = img_transform_batch(pred, **kwargs)
+
+        mse_value = ((gt - pred)**2).mean(dim=(2, 3, 4))
+        # zero mse leads to inf, the same as `psnr`
+        return 20. * torch.log10(255. / torch.sqrt(mse_value))
+
 
 def psnr(img1,
          img2,
@@ -3,11 +3,13 @@ from typing import Optional
 
 import cv2
 import numpy as np
+import torch
+import torch.nn.functional as F
 
 from mmagic.registry import METRICS
 from mmagic.utils import to_numpy
 from .base_sample_wise_metric import BaseSampleWiseMetric
-from .metrics_utils import img_transform
+from .metrics_utils import img_transform, img_transform_batch
 
 
 @METRICS.register_module()
@@ -42,6 +44,8 @@ class SSIM(BaseSampleWiseMetric):
             If None, the images are not altered. When computing for 'Y',
             the images are assumed to be in BGR order. Options are 'Y' and
             None. Default: None.
+        vectorized (bool): Whether to compute the whole batch at once in
+            torch. See :class:`BaseSampleWiseMetric`. Default: False.
 
     Metrics:
         - SSIM (float): Structural similarity
@@ -56,11 +60,13 @@ class SSIM(BaseSampleWiseMetric):
                  prefix: Optional[str] = None,
                  crop_border=0,
                  input_order='CHW',
-                 convert_to=None) -> None:
+                 convert_to=None,
+                 vectorized: bool = False) -> None:
         super().__init__(
             gt_key=gt_key,
             pred_key=pred_key,
             mask_key=None,
+            vectorized=vectorized,
             collect_device=collect_device,
             prefix=prefix)
 
@@ -87,6 +93,74 @@ class SSIM(BaseSampleWiseMetric):
             convert_to=self.convert_to,
             channel_order=self.channel_order)
 
+    def process_batch(self, gt: torch.Tensor,
+                      pred: torch.Tensor) -> torch.Tensor:
+        """Process a batch of images.
+
+        Args:
+            gt (Tensor): GT images with shape (N, T, ...).
+            pred (Tensor): Pred images with shape (N, T, ...).
+        Returns:
+            Tensor: SSIM of each frame with shape (N, T).
+        """
+
+        kwargs = dict(
+            crop_border=self.crop_border,
+            input_order=self.input_order,
+            convert_to=self.convert_to,
+            channel_order=self.channel_order)
+        gt = img_transform_batch(gt, **kwargs)
+        pred = img_transform_batch(pred, **kwargs)
+
+        n, t = gt.shape[:2]
+        result = _ssim_batch(gt.flatten(0, 1), pred.flatten(0, 1))
+
+        return result.view(n, t)
+
+
+def _ssim_batch(img1, img2):
+    """Calculate SSIM (structural similarity) for a batch of images.
+
+    It is the torch version of func:`_ssim`. All channels are filtered at
+    once with a depthwise convolution, and the `valid` output of the
+    convolution is the same as the cropped output of `cv2.filter2D`.
+
+    Args:
+        img1, img2 (Tensor): Images with range [0, 255] with shape
+            (B, C, H, W).
+
+    Returns:
+        Tensor: SSIM result of each image with shape (B, ).
+    """
+
+    C1 = (0.01 * 255)**2
+    C2 = (0.03 * 255)**2
+
+    # the same as `cv2.getGaussianKernel(11, 1.5)`
+    coords = torch.arange(11, dtype=img1.dtype, device=img1.device) - 5
+    kernel = torch.exp(-coords**2 / (2 * 1.5**2))
+    kernel = kernel / kernel.sum()
+    channels = img1.shape[1]
+    window = torch.outer(kernel, kernel).expand(channels, 1, 11, 11)
+
+    def _filter(img):
+        return F.conv2d(img, window, groups=channels)
+
+    mu1 = _filter(img1)
+    mu2 = _filter(img2)
+    mu1_sq = mu1**2
+    mu2_sq = mu2**2
+    mu1_mu2 = mu1 * mu2
+    sigma1_sq = _filter(img1**2) - mu1_sq
+    sigma2_sq = _filter(img2**2) - mu2_sq
+    sigma12 = _filter(img1 * img2) - mu1_mu2
+
+    ssim_map = ((2 * mu1_mu2 + C1) *
+                (2 * sigma12 + C2)) / ((mu1_sq + mu2_sq + C1) *
+                                       (sigma1_sq + sigma2_sq + C2))
+
+    return ssim_map.flatten(1).mean(dim=1)
+
 
 def _ssim(img1, img2):
     """Calculate SSIM (structural similarity) for one channel images.
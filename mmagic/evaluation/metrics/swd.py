@@ -4,7 +4,7 @@ from typing import Optional, Sequence
 import numpy as np
 import torch
 import torch.nn.functional as F
-from mmengine.dist import all_gather, get_world_size
+from mmengine.dist import all_gather, all_gather_object, get_world_size
 
 from mmagic.registry import METRICS
 from .base_gen_metric import GenMetric
@@ -50,6 +50,77 @@ def sliced_wasserstein(distribution_a,
     return sum(results) / dir_repeats
 
 
+def sliced_wasserstein_projected(distribution_a, distribution_b, dirs):
+    r"""Sliced Wasserstein distance of two sets of patches with given
+    directions.
+
+    Different from :func:`sliced_wasserstein`, all directions are projected
+    and sorted at once on the device of the inputs.
+
+    Args:
+        distribution_a (Tensor): Descriptors of first distribution.
+        distribution_b (Tensor): Descriptors of second distribution.
+        dirs (Tensor): Normalized projection directions with shape
+            (n_features, n_directions).
+
+    Returns:
+        float: sliced Wasserstein distance.
+    """
+    assert distribution_a.ndim == 2
+    assert distribution_a.shape == distribution_b.shape
+    dirs = dirs.to(distribution_a)
+    proj_a, _ = torch.sort(torch.matmul(distribution_a, dirs), dim=0)
+    proj_b, _ = torch.sort(torch.matmul(distribution_b, dirs), dim=0)
+    return torch.mean(torch.abs(proj_a - proj_b)).item()
+
+
+def update_reservoir(reservoir, num_seen, samples, reservoir_size):
+    """Update a uniform reservoir of samples with a batch of new samples.
+
+    The ith sample (counting from 0) replaces a random slot of a full
+    reservoir with probability ``reservoir_size / (i + 1)``, therefore the
+    reservoir is always a uniform subset of all samples seen so far.
+
+    Args:
+        reservoir (Tensor | None): The reservoir with shape
+            (reservoir_size, ...). If None, a new one will be created.
+        num_seen (int): Number of samples seen before this batch.
+        samples (Tensor): New samples.
+        reservoir_size (int): Size of the reservoir.
+
+    Returns:
+        tuple(Tensor, int): The updated reservoir and number of samples seen.
+    """
+    num_new = samples.shape[0]
+    device = samples.device
+    if reservoir is None:
+        reservoir = samples.new_empty((reservoir_size, *samples.shape[1:]))
+
+    # fill the empty slots directly
+    num_fill = min(max(reservoir_size - num_seen, 0), num_new)
+    reservoir[num_seen:num_seen + num_fill] = samples[:num_fill]
+
+    samples = samples[num_fill:]
+    if samples.shape[0] > 0:
+        index = torch.arange(
+            num_seen + num_fill, num_seen + num_new, device=device)
+        slots = (torch.rand(samples.shape[0], device=device) *
+                 (index + 1)).long()
+        accept = slots < reservoir_size
+        slots, samples = slots[accept], samples[accept]
+        # later samples overwrite the former ones in the same slot
+        order = torch.arange(slots.shape[0], device=device)
+        last = torch.full((reservoir_size, ),
+                          -1,
+                          dtype=torch.long,
+                          device=device)
+        last.scatter_reduce_(0, slots, order, reduce='amax')
+        replaced = last >= 0
+        reservoir[replaced] = samples[last[replaced]]
+
+    return reservoir, num_seen + num_new
+
+
 # Gaussian blur kernel
 def get_gaussian_kernel():
     """Get the gaussian blur kernel.
@@ -212,6 +283,15 @@ class SlicedWassersteinDistance(GenMetric):
             names to disambiguate homonymous metrics of different evaluators.
             If prefix is not provided in the argument, self.default_prefix
             will be used instead. Defaults to None.
+        streaming (bool): Whether to evaluate in streaming mode. The random
+            directions are drawn up front, per-channel moments of the
+            descriptors are accumulated exactly and only a uniform reservoir
+            of descriptors is kept for each level, so the memory is bounded.
+            The projection and sorting are performed on device. Defaults to
+            False.
+        reservoir_size (int): Number of descriptors kept for each level of
+            real and fake images on each device in streaming mode. Defaults
+            to 65536.
     """
 
     name = 'SWD'
@@ -223,7 +303,9 @@ class SlicedWassersteinDistance(GenMetric):
                  real_key: Optional[str] = 'gt_img',
                  sample_model: str = 'ema',
                  collect_device: str = 'cpu',
-                 prefix: Optional[str] = None):
+                 prefix: Optional[str] = None,
+                 streaming: bool = False,
+                 reservoir_size: int = 65536):
         super().__init__(fake_nums, fake_nums, fake_key, real_key,
                          sample_model, collect_device, prefix)
 
@@ -240,11 +322,48 @@ class SlicedWassersteinDistance(GenMetric):
         self.n_pyramids = len(self.resolutions)
 
         self.gaussian_k = get_gaussian_kernel()
-        self.real_results = [[] for res in self.resolutions]
-        self.fake_results = [[] for res in self.resolutions]
+        self.streaming = streaming
+        self.reservoir_size = reservoir_size
+        if streaming:
+            num_features = 3 * self.nhood_size**2
+            self.dirs = []
+            for _ in self.resolutions:
+                dirs = torch.randn(num_features,
+                                   self.dir_repeats * self.dirs_per_repeat)
+                dirs /= torch.sqrt(torch.sum((dirs**2), dim=0, keepdim=True))
+                self.dirs.append(dirs)
+        self.real_results = self._init_results()
+        self.fake_results = self._init_results()
 
         self._num_processed = 0
 
+    def _init_results(self) -> list:
+        """Initialize the results of each level. In streaming mode, each
+        level keeps the reservoir of descriptors, number of descriptors seen
+        and the sum and squared sum of descriptors of each channel."""
+        if not self.streaming:
+            return [[] for res in self.resolutions]
+        return [
+            dict(
+                reservoir=None,
+                num_seen=0,
+                sum=torch.zeros(3, dtype=torch.float64),
+                sq_sum=torch.zeros(3, dtype=torch.float64))
+            for res in self.resolutions
+        ]
+
+    def _add_descriptors(self, results: list, lod: int, desc: torch.Tensor):
+        """Add descriptors of one level to the results."""
+        if not self.streaming:
+            results[lod].append(desc.cpu())
+            return
+        result = results[lod]
+        desc_ = desc.to(torch.float64)
+        result['sum'] += desc_.sum(dim=(0, 2, 3)).cpu()
+        result['sq_sum'] += (desc_**2).sum(dim=(0, 2, 3)).cpu()
+        result['reservoir'], result['num_seen'] = update_reservoir(
+            result['reservoir'], result['num_seen'], desc, self.reservoir_size)
+
     def process(self, data_batch: dict, data_samples: Sequence[dict]) -> None:
         """Process one batch of data samples and predictions. The processed
         results should be stored in ``self.fake_results`` and
@@ -290,11 +409,11 @@ class SlicedWassersteinDistance(GenMetric):
                                          self.gaussian_k)
         # lod: layer_of_descriptors
         if self.real_results == []:
-            self.real_results = [[] for res in self.resolutions]
+            self.real_results = self._init_results()
         for lod, level in enumerate(real_pyramid):
             desc = get_descriptors_for_minibatch(level, self.nhood_size,
                                                  self.nhoods_per_image)
-            self.real_results[lod].append(desc.cpu())
+            self._add_descriptors(self.real_results, lod, desc)
 
         # fake images
         assert fake_imgs.shape[1:] == self.image_shape
@@ -304,11 +423,11 @@ class SlicedWassersteinDistance(GenMetric):
                                          self.gaussian_k)
         # lod: layer_of_descriptors
         if self.fake_results == []:
-            self.fake_results = [[] for res in self.resolutions]
+            self.fake_results = self._init_results()
         for lod, level in enumerate(fake_pyramid):
             desc = get_descriptors_for_minibatch(level, self.nhood_size,
                                                  self.nhoods_per_image)
-            self.fake_results[lod].append(desc.cpu())
+            self._add_descriptors(self.fake_results, lod, desc)
 
         self._num_processed += real_imgs.shape[0]
 
@@ -326,6 +445,8 @@ class SlicedWassersteinDistance(GenMetric):
             'fake', 'real'
         ], ('Only support to collect \'fake\' or \'real\' results.')
         results = getattr(self, f'{target}_results')
+        if self.streaming:
+            return self._collect_streaming_results(results)
         results_collected = []
         world_size = get_world_size()
         for result in results:
@@ -342,6 +463,64 @@ class SlicedWassersteinDistance(GenMetric):
         self._num_processed = 0
         return results_collected
 
+    def _collect_streaming_results(self, results: list) -> list:
+        """Collect the reservoirs and moments of each level in streaming
+        mode.
+
+        Args:
+            results (list): Streaming results of each level.
+
+        Returns:
+            list: Tuple of collected descriptors, mean and std of each level.
+        """
+        results_collected = []
+        for result in results:
+            num_kept = min(result['num_seen'], self.reservoir_size)
+            reservoir = result['reservoir']
+            reservoir = reservoir[:num_kept].cpu() if num_kept > 0 else None
+            gathered = all_gather_object(
+                dict(
+                    reservoir=reservoir,
+                    num_seen=result['num_seen'],
+                    sum=result['sum'],
+                    sq_sum=result['sq_sum']))
+            desc = torch.cat([
+                res['reservoir'] for res in gathered
+                if res['reservoir'] is not None
+            ])
+            num = sum([res['num_seen']
+                       for res in gathered]) * self.nhood_size**2
+            sum_ = sum([res['sum'] for res in gathered])
+            sq_sum = sum([res['sq_sum'] for res in gathered])
+            mean = sum_ / num
+            # unbiased std, the same as `torch.std`
+            std = torch.sqrt((sq_sum - num * mean**2) / (num - 1))
+            results_collected.append((desc, mean, std))
+
+        self._num_processed = 0
+        return results_collected
+
+    def _compute_streaming_metrics(self, results_fake, results_real) -> list:
+        """Compute SWD of each level in streaming mode."""
+        device = 'cuda' if torch.cuda.is_available() else 'cpu'
+        distance = []
+        for (desc_fake, mean_fake,
+             std_fake), (desc_real, mean_real,
+                         std_real), dirs in zip(results_fake, results_real,
+                                                self.dirs):
+            # reservoirs may be different in size when less descriptors are
+            # seen, truncation of uniform reservoirs is still uniform
+            num = min(desc_fake.shape[0], desc_real.shape[0])
+            descs = []
+            for desc, mean, std in [(desc_real, mean_real, std_real),
+                                    (desc_fake, mean_fake, std_fake)]:
+                desc = desc[:num].to(device)
+                desc = (desc - mean.to(desc).view(
+                    1, 3, 1, 1)) / std.to(desc).view(1, 3, 1, 1)
+                descs.append(desc.reshape(num, -1))
+            distance.append(sliced_wasserstein_projected(*descs, dirs))
+        return distance
+
     def compute_metrics(self, results_fake, results_real) -> dict:
         """Compute the result of SWD metric.
 
@@ -352,15 +531,19 @@ class SlicedWassersteinDistance(GenMetric):
         Returns:
             dict: A dict of the computed SWD metric.
         """
-        fake_descs = [finalize_descriptors(d) for d in results_fake]
-        real_descs = [finalize_descriptors(d) for d in results_real]
-        distance = [
-            sliced_wasserstein(dreal, dfake, self.dir_repeats,
-                               self.dirs_per_repeat)
-            for dreal, dfake in zip(real_descs, fake_descs)
-        ]
-        del real_descs
-        del fake_descs
+        if self.streaming:
+            distance = self._compute_streaming_metrics(results_fake,
+                                                       results_real)
+        else:
+            fake_descs = [finalize_descriptors(d) for d in results_fake]
+            real_descs = [finalize_descriptors(d) for d in results_real]
+            distance = [
+                sliced_wasserstein(dreal, dfake, self.dir_repeats,
+                                   self.dirs_per_repeat)
+                for dreal, dfake in zip(real_descs, fake_descs)
+            ]
+            del real_descs
+            del fake_descs
 
         distance = [d * 1e3 for d in distance]  # multiply by 10^3
         result = distance + [np.mean(distance)]
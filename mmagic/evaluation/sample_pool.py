@@ -0,0 +1,233 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import hashlib
+import os
+import os.path as osp
+from collections import defaultdict
+from copy import copy
+from typing import Callable, List, Optional, Sequence
+
+import numpy as np
+import torch
+from mmengine import mkdir_or_exist
+from mmengine.dist import get_rank
+from torch import Tensor
+
+from mmagic.structures import DataSample
+
+
+class _SpilledImage:
+    """Reference to an image spilled to the memory-mapped chunks."""
+
+    def __init__(self, chunk: int, row: int, dtype: torch.dtype,
+                 device: torch.device) -> None:
+        self.chunk = chunk
+        self.row = row
+        self.dtype = dtype
+        self.device = device
+
+
+class _PooledTensor:
+    """Tensor kept in the memory of CPU, which is moved back to the original
+    device and dtype when loaded."""
+
+    def __init__(self, data: Tensor, dtype: torch.dtype,
+                 device: torch.device) -> None:
+        self.data = data
+        self.dtype = dtype
+        self.device = device
+
+
+class GenerativeSamplePool:
+    """Evaluation-scoped pool of generated samples shared across generative
+    metrics.
+
+    :class:`~mmagic.evaluation.Evaluator` already shares one sampler among
+    metrics with the same sampling mode. However, each evaluator of
+    :class:`~mmagic.engine.runner.MultiValLoop` and
+    :class:`~mmagic.engine.runner.MultiTestLoop` still drives the generator on
+    its own. With the sample pool, the generated samples are saved at the
+    first time and the following metric groups with the same sampling
+    arguments take the prefix they need from the pool. Only the missing
+    samples are generated.
+
+    Metrics with ``SAMPLER_MODE`` other than 'Generative' (e.g. PPL) or with
+    ``need_cond_input=True`` are not pooled, since their inputs depend on the
+    sampler or the dataset.
+
+    Pooled tensors are always moved to CPU. Images are assumed to be in range
+    [0, 255] and are rounded to uint8, i.e. one byte per pixel, which is
+    ``num_samples * C * H * W`` bytes in total, e.g. about 9.4 GiB for 50k
+    images of 256x256. Pass ``spill_dir`` to keep them on the disk instead.
+
+    Args:
+        spill_dir (str, optional): The directory to spill the generated images
+            as uint8 memory-mapped arrays. If not passed, images are kept in
+            the memory of CPU. Defaults to None.
+        spill_keys (Sequence[str]): The keys of the images to convert to
+            uint8. Other tensors of the samples are kept in the memory of CPU
+            without conversion. Defaults to ('fake_img', ).
+        chunk_size (int): Number of images in each spilled chunk. Defaults to
+            1024.
+    """
+
+    def __init__(self,
+                 spill_dir: Optional[str] = None,
+                 spill_keys: Sequence[str] = ('fake_img', ),
+                 chunk_size: int = 1024) -> None:
+        self.spill_dir = spill_dir
+        self.spill_keys = spill_keys
+        self.chunk_size = chunk_size
+        if spill_dir is not None:
+            mkdir_or_exist(spill_dir)
+
+        self._samples = defaultdict(list)
+        self._cursors = defaultdict(int)
+        self._chunks = defaultdict(list)
+        self._num_spilled = defaultdict(int)
+
+    @staticmethod
+    def get_pool_key(metrics: Sequence) -> Optional[str]:
+        """Get the key of the pool for a group of metrics sharing a sampler.
+
+        Args:
+            metrics (Sequence): Metrics sharing the same sampler.
+
+        Returns:
+            Optional[str]: The key of the pool. None for metrics can not be
+                pooled.
+        """
+        metric = metrics[0]
+        if getattr(metric, 'SAMPLER_MODE', None) != 'Generative':
+            return None
+        if getattr(metric, 'need_cond_input', False):
+            return None
+        # the shared sampler only uses the arguments of the first metric
+        key_dict = dict(
+            sample_model=metric.sample_model,
+            sample_kwargs=metric.sample_kwargs)
+        return hashlib.md5(repr(key_dict).encode('utf-8')).hexdigest()
+
+    def begin(self, metrics: Sequence) -> Optional[str]:
+        """Begin to sample for a group of metrics. The samples will be taken
+        from the beginning of the pool.
+
+        Args:
+            metrics (Sequence): Metrics sharing the same sampler.
+
+        Returns:
+            Optional[str]: The key of the pool. None for metrics can not be
+                pooled.
+        """
+        key = self.get_pool_key(metrics)
+        if key is not None:
+            self._cursors[key] = 0
+        return key
+
+    def __len__(self) -> int:
+        return sum([len(samples) for samples in self._samples.values()])
+
+    def sample(self, key: str, data_batch: dict,
+               forward: Callable) -> List[dict]:
+        """Take a batch of samples from the pool. Samples not in the pool will
+        be generated by ``forward`` and added to the pool.
+
+        Args:
+            key (str): The key of the pool.
+            data_batch (dict): The batch from the generative sampler, whose
+                ``inputs['num_batches']`` is the number of samples.
+            forward (Callable): The function to generate samples, e.g.
+                ``model.val_step``.
+
+        Returns:
+            List[dict]: Samples in dict.
+        """
+        num_samples = data_batch['inputs']['num_batches']
+        samples = self._samples[key]
+        cursor = self._cursors[key]
+
+        num_missing = max(cursor + num_samples - len(samples), 0)
+        if num_missing > 0:
+            inputs = copy(data_batch['inputs'])
+            inputs['num_batches'] = num_missing
+            outputs = forward(dict(data_batch, inputs=inputs))
+            for output in outputs[:num_missing]:
+                if isinstance(output, DataSample):
+                    output = output.to_dict()
+                samples.append(self._dump(key, output))
+
+        self._cursors[key] = cursor + num_samples
+        return [
+            self._load(key, sample)
+            for sample in samples[cursor:cursor + num_samples]
+        ]
+
+    def _dump(self, key: str, sample: dict) -> dict:
+        """Move the tensors in the sample to CPU and spill the images to the
+        memory-mapped chunks."""
+        dumped = dict()
+        for k, v in sample.items():
+            if isinstance(v, dict):
+                v = self._dump(key, v)
+            elif k in self.spill_keys and isinstance(v, Tensor):
+                if self.spill_dir is not None:
+                    v = self._spill(key, v)
+                else:
+                    v = _PooledTensor(
+                        self._to_uint8(v), dtype=v.dtype, device=v.device)
+            elif isinstance(v, Tensor):
+                v = _PooledTensor(
+                    v.detach().cpu(), dtype=v.dtype, device=v.device)
+            dumped[k] = v
+        return dumped
+
+    @staticmethod
+    def _to_uint8(img: Tensor) -> Tensor:
+        return img.detach().round().clamp(0, 255).to(torch.uint8).cpu()
+
+    def _spill(self, key: str, img: Tensor) -> _SpilledImage:
+        chunks = self._chunks[key]
+        chunk_idx, row = divmod(self._num_spilled[key], self.chunk_size)
+        if chunk_idx == len(chunks):
+            filename = osp.join(self.spill_dir,
+                                f'{key}_rank{get_rank()}_{chunk_idx:05d}.npy')
+            chunks.append(
+                np.lib.format.open_memmap(
+                    filename,
+                    mode='w+',
+                    dtype=np.uint8,
+                    shape=(self.chunk_size, *img.shape)))
+        chunk = chunks[chunk_idx]
+        assert chunk.shape[1:] == img.shape, (
+            'Shape of spilled images must be the same, but receive '
+            f'\'{tuple(img.shape)}\' and \'{chunk.shape[1:]}\'.')
+        chunk[row] = self._to_uint8(img).numpy()
+        self._num_spilled[key] += 1
+        return _SpilledImage(chunk_idx, row, img.dtype, img.device)
+
+    def _load(self, key: str, sample: dict) -> dict:
+        """Load the pooled tensors and the spilled images in the sample."""
+        loaded = dict()
+        for k, v in sample.items():
+            if isinstance(v, dict):
+                v = self._load(key, v)
+            elif isinstance(v, _SpilledImage):
+                img = np.array(self._chunks[key][v.chunk][v.row])
+                v = torch.from_numpy(img).to(device=v.device, dtype=v.dtype)
+            elif isinstance(v, _PooledTensor):
+                v = v.data.to(device=v.device, dtype=v.dtype)
+            loaded[k] = v
+        return loaded
+
+    def clear(self) -> None:
+        """Clear the pool and remove the spilled chunks."""
+        filenames = [
+            chunk.filename for chunks in self._chunks.values()
+            for chunk in chunks
+        ]
+        self._samples.clear()
+        self._cursors.clear()
+        self._chunks.clear()
+        self._num_spilled.clear()
+        for filename in filenames:
+            if filename is not None and osp.exists(filename):
+                os.remove(filename)
@@ -2,12 +2,14 @@
 from .base_models import (BaseConditionalGAN, BaseEditModel, BaseGAN,
                           BaseMattor, BaseTranslationModel, BasicInterpolator,
                           ExponentialMovingAverage)
-from .data_preprocessors import DataPreprocessor, MattorPreprocessor
+from .data_preprocessors import (DataPreprocessor, DegradationDataPreprocessor,
+                                 MattorPreprocessor)
 from .editors import *  # noqa: F401, F403
 from .losses import *  # noqa: F401, F403
 
 __all__ = [
     'BaseGAN', 'BaseTranslationModel', 'BaseEditModel', 'MattorPreprocessor',
     'DataPreprocessor', 'BasicInterpolator', 'BaseMattor', 'BasicInterpolator',
-    'ExponentialMovingAverage', 'BaseConditionalGAN'
+    'ExponentialMovingAverage', 'BaseConditionalGAN',
+    'DegradationDataPreprocessor'
 ]
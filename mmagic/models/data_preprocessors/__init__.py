@@ -1,5 +1,8 @@
 # Copyright (c) OpenMMLab. All rights reserved.
 from .data_preprocessor import DataPreprocessor
+from .degradation_preprocessor import DegradationDataPreprocessor
 from .mattor_preprocessor import MattorPreprocessor
 
-__all__ = ['DataPreprocessor', 'MattorPreprocessor']
+__all__ = [
+    'DataPreprocessor', 'DegradationDataPreprocessor', 'MattorPreprocessor'
+]
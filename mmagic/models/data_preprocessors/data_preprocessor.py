@@ -67,6 +67,10 @@ class DataPreprocessor(ImgDataPreprocessor):
         stack_data_sample (bool): Whether stack a list of data samples to one
             data sample. Only support with input data samples are
             `DataSamples`. Defaults to True.
+        non_blocking (bool): Whether to copy the data to the device
+            asynchronously. Works with pinned memory of the dataloader, e.g.
+            batches collated by :func:`~mmagic.datasets.packed_collate`.
+            Defaults to False.
     """
     _NON_IMAGE_KEYS = ['noise']
     _NON_CONCATENATE_KEYS = ['num_batches', 'mode', 'sample_kwargs', 'eq_cfg']
@@ -83,14 +87,16 @@ class DataPreprocessor(ImgDataPreprocessor):
                  data_keys: Union[List[str], str] = 'gt_img',
                  input_view: Optional[tuple] = None,
                  output_view: Optional[tuple] = None,
-                 stack_data_sample=True):
+                 stack_data_sample=True,
+                 non_blocking: bool = False):
 
         if not isinstance(mean, (list, tuple)) and mean is not None:
             mean = [mean]
         if not isinstance(std, (list, tuple)) and std is not None:
             std = [std]
 
-        super().__init__(mean, std, pad_size_divisor, pad_value)
+        super().__init__(
+            mean, std, pad_size_divisor, pad_value, non_blocking=non_blocking)
         # get channel order
         assert (output_channel_order is None
                 or output_channel_order in ['RGB', 'BGR']), (
@@ -273,7 +279,8 @@ class DataPreprocessor(ImgDataPreprocessor):
     def _do_conversion(self,
                        inputs: Tensor,
                        inputs_order: str = 'BGR',
-                       target_order: Optional[str] = None
+                       target_order: Optional[str] = None,
+                       dtype: Optional[torch.dtype] = None
                        ) -> Tuple[Tensor, str]:
         """Conduct channel order conversion for *a batch of inputs*, and return
         the converted inputs and order after conversion.
@@ -281,6 +288,10 @@ class DataPreprocessor(ImgDataPreprocessor):
         inputs_order:
             * RGB / RGB: Convert to target order.
             * SINGLE: Do not change
+
+        If ``dtype`` is passed, the channels are cast to ``dtype`` in the same
+        copy as the conversion, e.g. for uint8 inputs to be normalized.
+        Inputs not converted keep their dtype.
         """
         if (target_order is None
                 or inputs_order.upper() == target_order.upper()):
@@ -293,6 +304,14 @@ class DataPreprocessor(ImgDataPreprocessor):
             else:
                 new_index = [2, 1, 0]
 
+            if dtype is not None:
+                # cast and swap the channels in one copy
+                outputs = inputs.new_empty(inputs.shape, dtype=dtype)
+                for out_idx, in_idx in enumerate(new_index):
+                    outputs.select(channel_index, out_idx).copy_(
+                        inputs.select(channel_index, in_idx))
+                return outputs
+
             # do conversion
             inputs = torch.index_select(
                 inputs, channel_index,
@@ -315,9 +334,24 @@ class DataPreprocessor(ImgDataPreprocessor):
         else:
             raise ValueError(f'Unsupported inputs order \'{inputs_order}\'.')
 
+    def _get_norm_dtype(self, inputs: Tensor) -> Optional[torch.dtype]:
+        """Get the float dtype to normalize integer inputs in. None if the
+        inputs are floating point or normalization is disabled."""
+        if not self._enable_normalize or inputs.is_floating_point():
+            return None
+        dtype = torch.promote_types(self.mean.dtype, self.std.dtype)
+        if not dtype.is_floating_point:
+            dtype = torch.get_default_dtype()
+        return dtype
+
     def _do_norm(self,
                  inputs: Tensor,
-                 do_norm: Optional[bool] = None) -> Tensor:
+                 do_norm: Optional[bool] = None,
+                 inplace: bool = False) -> Tensor:
+        """Normalize the inputs. Integer inputs are converted to float once
+        and normalized in place. Floating point inputs are normalized in place
+        only if ``inplace`` is True, e.g. for a copy made by the conversion.
+        """
 
         do_norm = self._enable_normalize if do_norm is None else do_norm
 
@@ -341,7 +375,17 @@ class DataPreprocessor(ImgDataPreprocessor):
             assert n_channel_mean == 1 or n_channel_mean == n_channel_inputs
             assert n_channel_std == 1 or n_channel_std == n_channel_inputs
 
-            inputs = (inputs - mean) / std
+            if not inputs.is_floating_point():
+                # convert integer inputs (e.g. uint8) once and normalize in
+                # place, which gives the same result as `(inputs - mean) / std`
+                dtype = torch.promote_types(mean.dtype, std.dtype)
+                if not dtype.is_floating_point:
+                    dtype = torch.get_default_dtype()
+                inputs = inputs.to(dtype).sub_(mean).div_(std)
+            elif inplace:
+                inputs = inputs.sub_(mean).div_(std)
+            else:
+                inputs = (inputs - mean) / std
         return inputs
 
     def _preprocess_image_tensor(self,
@@ -375,16 +419,21 @@ class DataPreprocessor(ImgDataPreprocessor):
             f'shape: {inputs.shape}')
         channel_order = self._parse_batch_channel_order(
             key, inputs, data_samples)
+        norm_dtype = self._get_norm_dtype(inputs)
         inputs, output_channel_order = self._do_conversion(
-            inputs, channel_order, self.output_channel_order)
-        inputs = self._do_norm(inputs)
+            inputs, channel_order, self.output_channel_order, norm_dtype)
+        inputs = self._do_norm(inputs, inplace=norm_dtype is not None)
         h, w = inputs.shape[-2:]
         target_h = math.ceil(h / self.pad_size_divisor) * self.pad_size_divisor
         target_w = math.ceil(w / self.pad_size_divisor) * self.pad_size_divisor
         pad_h = target_h - h
         pad_w = target_w - w
-        batch_inputs = F.pad(inputs, (0, pad_w, 0, pad_h), self.pad_mode,
-                             self.pad_value)
+        if pad_h == 0 and pad_w == 0:
+            # avoid copying the whole batch by `F.pad`
+            batch_inputs = inputs
+        else:
+            batch_inputs = F.pad(inputs, (0, pad_w, 0, pad_h), self.pad_mode,
+                                 self.pad_value)
 
         padding_size = torch.FloatTensor((0, pad_h, pad_w))[None, ...]
         padding_size = padding_size.repeat(inputs.shape[0], 1)
@@ -434,9 +483,12 @@ class DataPreprocessor(ImgDataPreprocessor):
         padding_sizes[:, :-2] = 0
         if padding_sizes.sum() == 0:
             stacked_tensor = torch.stack(tensor_list)
+            norm_dtype = self._get_norm_dtype(stacked_tensor)
             stacked_tensor, output_channel_order = self._do_conversion(
-                stacked_tensor, channel_order, self.output_channel_order)
-            stacked_tensor = self._do_norm(stacked_tensor)
+                stacked_tensor, channel_order, self.output_channel_order,
+                norm_dtype)
+            stacked_tensor = self._do_norm(
+                stacked_tensor, inplace=norm_dtype is not None)
             data_samples = self._update_metainfo(padding_sizes,
                                                  {key: output_channel_order},
                                                  data_samples)
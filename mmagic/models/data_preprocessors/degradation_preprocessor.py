@@ -0,0 +1,482 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+from typing import List, Optional, Sequence, Union
+
+import numpy as np
+import torch
+import torch.nn.functional as F
+from torch import Tensor
+
+from mmagic.datasets.transforms import (RandomBlur, RandomJPEGCompression,
+                                        RandomResize, RandomVideoCompression)
+from mmagic.registry import MODELS
+from .data_preprocessor import DataPreprocessor
+
+# Images of a batch are represented as a list of frames, each of which is a
+# tensor with shape (N, C, H, W). Frames of a video may have different sizes.
+Frames = List[Tensor]
+
+
+class BatchRandomBlur:
+    """Batched version of :class:`~mmagic.datasets.transforms.RandomBlur`.
+
+    Kernels of each sample are generated by ``RandomBlur.get_kernel`` and all
+    samples are blurred at once with a grouped convolution.
+
+    Args:
+        params (dict): The same degradation settings as ``RandomBlur``.
+    """
+
+    def __init__(self, params: dict) -> None:
+        self.params = params
+        self.transform = RandomBlur(params, keys=[])
+
+    def __call__(self, frames: Frames) -> Frames:
+        num_samples, num_channels = frames[0].shape[:2]
+        prob = self.params.get('prob', 1)
+        indices = [
+            idx for idx in range(num_samples) if np.random.uniform() <= prob
+        ]
+        if len(indices) == 0:
+            return frames
+
+        # kernels with shape (num_frames, num_blurred, k, k)
+        kernels = [self.transform.get_kernel(len(frames)) for _ in indices]
+        size = max([kernel.shape[0] for ks in kernels for kernel in ks])
+        kernels = np.stack([
+            np.stack([self._pad_kernel(kernel, size) for kernel in ks])
+            for ks in kernels
+        ], 1)
+        kernels = torch.from_numpy(kernels).to(frames[0])
+
+        outputs = []
+        for frame, kernel in zip(frames, kernels):
+            blurred = frame[indices].reshape(1, -1, *frame.shape[2:])
+            # cv2.filter2D uses BORDER_REFLECT_101 by default
+            blurred = F.pad(blurred, [size // 2] * 4, mode='reflect')
+            weight = kernel.repeat_interleave(num_channels, 0)[:, None]
+            blurred = F.conv2d(blurred, weight, groups=weight.shape[0])
+            frame = frame.clone()
+            frame[indices] = blurred.reshape(
+                len(indices), num_channels, *frame.shape[2:])
+            outputs.append(frame)
+        return outputs
+
+    @staticmethod
+    def _pad_kernel(kernel: np.ndarray, size: int) -> np.ndarray:
+        pad = (size - kernel.shape[0]) // 2
+        return np.pad(kernel.astype(np.float32), pad)
+
+
+class BatchRandomResize:
+    """Batched version of :class:`~mmagic.datasets.transforms.RandomResize`.
+
+    The interpolation method and the target sizes are sampled once per batch
+    by ``RandomResize.get_resize_params``, since samples of a batch must have
+    the same size.
+
+    Args:
+        params (dict): The same degradation settings as ``RandomResize``.
+            'lanczos' is not supported.
+    """
+
+    resize_dict = dict(bilinear='bilinear', bicubic='bicubic', area='area')
+
+    def __init__(self, params: dict) -> None:
+        self.params = params
+        self.transform = RandomResize(params, keys=[])
+        for opt in params['resize_opt']:
+            assert opt.lower() in self.resize_dict, (
+                f'Only support {list(self.resize_dict)} for batched '
+                f'resizing, but got \'{opt}\'.')
+
+    def __call__(self, frames: Frames) -> Frames:
+        if np.random.uniform() > self.params.get('prob', 1):
+            return frames
+
+        h, w = frames[0].shape[2:]
+        resize_opt, target_sizes = self.transform.get_resize_params(
+            h, w, len(frames))
+        mode = self.resize_dict[resize_opt]
+        align_corners = None if mode == 'area' else False
+
+        return [
+            F.interpolate(
+                frame,
+                size=target_size,
+                mode=mode,
+                align_corners=align_corners)
+            for frame, target_size in zip(frames, target_sizes)
+        ]
+
+
+class BatchRandomNoise:
+    """Batched version of :class:`~mmagic.datasets.transforms.RandomNoise`.
+
+    The noise type and levels are sampled per sample as ``RandomNoise`` does,
+    and the noise is generated with tensor operations on the device of the
+    images.
+
+    Args:
+        params (dict): The same degradation settings as ``RandomNoise``.
+    """
+
+    def __init__(self, params: dict) -> None:
+        self.params = params
+
+    def __call__(self, frames: Frames) -> Frames:
+        num_samples = frames[0].shape[0]
+        num_frames = len(frames)
+        prob = self.params.get('prob', 1)
+
+        # noise levels with shape (num_frames, num_samples), zero for samples
+        # without the corresponding noise
+        gaussian_sigma = np.zeros((num_frames, num_samples), np.float32)
+        gaussian_gray = np.zeros(num_samples, bool)
+        poisson_scale = np.zeros((num_frames, num_samples), np.float32)
+        poisson_gray = np.zeros(num_samples, bool)
+        for idx in range(num_samples):
+            if np.random.uniform() > prob:
+                continue
+            noise_type = np.random.choice(
+                self.params['noise_type'], p=self.params['noise_prob'])
+            if noise_type.lower() == 'gaussian':
+                gaussian_sigma[:, idx], gaussian_gray[idx] = self._get_levels(
+                    'gaussian_sigma', 'gaussian_gray_noise_prob', num_frames)
+            elif noise_type.lower() == 'poisson':
+                poisson_scale[:, idx], poisson_gray[idx] = self._get_levels(
+                    'poisson_scale', 'poisson_gray_noise_prob', num_frames)
+            else:
+                raise NotImplementedError(f'"noise_type" [{noise_type}] is '
+                                          'not implemented.')
+
+        outputs = []
+        for frame, sigma, scale in zip(frames, gaussian_sigma, poisson_scale):
+            if sigma.any():
+                frame = self._add_gaussian_noise(frame, sigma, gaussian_gray)
+            if scale.any():
+                frame = self._add_poisson_noise(frame, scale, poisson_gray)
+            outputs.append(frame)
+        return outputs
+
+    def _get_levels(self, level_key: str, gray_key: str, num_frames: int):
+        """Sample the noise levels of the frames of a sample in the same way
+        as ``RandomNoise``."""
+        level_range = self.params[level_key]
+        level = np.random.uniform(level_range[0], level_range[1])
+        level_step = self.params.get(f'{level_key}_step', 0)
+        is_gray_noise = np.random.uniform() < self.params[gray_key]
+
+        levels = []
+        for _ in range(num_frames):
+            levels.append(level)
+            level += np.random.uniform(-level_step, level_step)
+            level = np.clip(level, level_range[0], level_range[1])
+        return levels, is_gray_noise
+
+    @staticmethod
+    def _add_gaussian_noise(frame: Tensor, sigma: np.ndarray,
+                            is_gray: np.ndarray) -> Tensor:
+        noise = torch.randn_like(frame)
+        # gray noise is the same for all channels
+        is_gray = torch.from_numpy(is_gray).to(frame.device)
+        noise = torch.where(is_gray[:, None, None, None], noise[:, :1], noise)
+        sigma = torch.from_numpy(sigma).to(frame)
+        return frame + noise * sigma[:, None, None, None]
+
+    @staticmethod
+    def _add_poisson_noise(frame: Tensor, scale: np.ndarray,
+                           is_gray: np.ndarray) -> Tensor:
+        noisy = frame.clone()
+        for idx in np.nonzero(scale)[0]:
+            img = frame[idx]
+            if is_gray[idx]:
+                # the same as cv2.COLOR_RGB2GRAY
+                weight = img.new_tensor([0.299, 0.587, 0.114])
+                img = (img * weight[:, None, None]).sum(0, keepdim=True)
+            img = img.round().clamp(0, 255)
+            unique_val = 2**np.ceil(np.log2(len(torch.unique(img))))
+            noise = torch.poisson(img * unique_val) / unique_val - img
+            noisy[idx] = frame[idx] + noise * float(scale[idx])
+        return noisy
+
+
+class BatchCPUDegradation:
+    """Apply a degradation transform to each sample on CPU.
+
+    It is used for degradations without a tensor implementation, i.e.
+    :class:`~mmagic.datasets.transforms.RandomJPEGCompression` and
+    :class:`~mmagic.datasets.transforms.RandomVideoCompression`, which rely on
+    the codecs of OpenCV and PyAV.
+
+    Args:
+        transform (Callable): The degradation transform with ``keys=['img']``.
+    """
+
+    def __init__(self, transform) -> None:
+        self.transform = transform
+
+    def __call__(self, frames: Frames) -> Frames:
+        device, dtype = frames[0].device, frames[0].dtype
+        # to a list of frames in (H, W, C) of each sample
+        frames_cpu = [
+            frame.permute(0, 2, 3, 1).detach().cpu().numpy()
+            for frame in frames
+        ]
+        outputs = [[] for _ in frames]
+        for idx in range(frames[0].shape[0]):
+            imgs = [frame[idx] for frame in frames_cpu]
+            imgs = self.transform(dict(img=imgs))['img']
+            for output, img in zip(outputs, imgs):
+                img = torch.from_numpy(np.ascontiguousarray(img))
+                if img.ndim == 2:
+                    img = img[..., None]
+                output.append(img)
+        return [
+            torch.stack(output).permute(0, 3, 1,
+                                        2).to(device=device, dtype=dtype)
+            for output in outputs
+        ]
+
+
+class BatchDegradationsWithShuffle:
+    """Batched version of
+    :class:`~mmagic.datasets.transforms.DegradationsWithShuffle`.
+
+    The order of degradations is shuffled once per batch.
+
+    Args:
+        degradations (list): The list of built batched degradations.
+        shuffle_idx (list | None, optional): The degradations corresponding to
+            these indices are shuffled. If None, all degradations are shuffled.
+            Default: None.
+    """
+
+    def __init__(self, degradations: list, shuffle_idx=None) -> None:
+        self.degradations = degradations
+        if shuffle_idx is None:
+            self.shuffle_idx = list(range(0, len(degradations)))
+        else:
+            self.shuffle_idx = shuffle_idx
+
+    def __call__(self, frames: Frames) -> Frames:
+        # shuffle degradations
+        if len(self.shuffle_idx) > 0:
+            shuffle_list = [self.degradations[i] for i in self.shuffle_idx]
+            np.random.shuffle(shuffle_list)
+            for i, idx in enumerate(self.shuffle_idx):
+                self.degradations[idx] = shuffle_list[i]
+
+        for degradation in self.degradations:
+            if isinstance(degradation, (tuple, list)):
+                for subdegrdation in degradation:
+                    frames = subdegrdation(frames)
+            else:
+                frames = degradation(frames)
+        return frames
+
+
+def build_batch_degradation(cfg: Union[dict, list]):
+    """Build a batched degradation from the config of the degradation
+    transform, e.g. ``dict(type='RandomBlur', params=dict(...))``. Keys other
+    than 'type', 'params', 'degradations' and 'shuffle_idx' (e.g. 'keys') are
+    ignored.
+
+    Args:
+        cfg (dict | list): The config of the degradation transform. A list of
+            configs is a group of degradations for
+            ``DegradationsWithShuffle``.
+
+    Returns:
+        Callable | list: The batched degradation.
+    """
+    if isinstance(cfg, (list, tuple)):
+        return [build_batch_degradation(c) for c in cfg]
+
+    degradation_type = cfg['type']
+    if degradation_type == 'RandomBlur':
+        return BatchRandomBlur(cfg['params'])
+    if degradation_type == 'RandomResize':
+        return BatchRandomResize(cfg['params'])
+    if degradation_type == 'RandomNoise':
+        return BatchRandomNoise(cfg['params'])
+    if degradation_type == 'RandomJPEGCompression':
+        return BatchCPUDegradation(
+            RandomJPEGCompression(
+                cfg['params'],
+                keys=['img'],
+                color_type=cfg.get('color_type', 'color'),
+                bgr2rgb=cfg.get('bgr2rgb', False)))
+    if degradation_type == 'RandomVideoCompression':
+        return BatchCPUDegradation(
+            RandomVideoCompression(cfg['params'], keys=['img']))
+    if degradation_type == 'DegradationsWithShuffle':
+        return BatchDegradationsWithShuffle(
+            build_batch_degradation(cfg['degradations']),
+            cfg.get('shuffle_idx', None))
+    raise NotImplementedError(
+        f'Degradation \'{degradation_type}\' is not supported.')
+
+
+@MODELS.register_module()
+class DegradationDataPreprocessor(DataPreprocessor):
+    """DataPreprocessor synthesizing the degraded inputs on the training
+    device, for models trained with synthetic degradations such as
+    Real-ESRGAN and RealBasicVSR.
+
+    The dataloader only loads and crops the clean images, and copies them to
+    ``img`` (e.g. by ``CopyValues``). In training, the degradations are
+    applied to the collated batch of ``inputs`` in [0, 255] with tensor
+    operations: blur kernels are generated per sample and applied with a
+    grouped convolution, noise and resizing are batched tensor operations.
+    Compression degradations are applied per sample on CPU. The results are
+    clipped to [0, 255], optionally cropped with the data samples, and then
+    normalized as :class:`DataPreprocessor`.
+
+    The degradations take the same configs and probability semantics as the
+    transforms, e.g. ``dict(type='RandomBlur', params=dict(...))``, except
+    that the random size of ``RandomResize`` and the order of
+    ``DegradationsWithShuffle`` are sampled once per batch, since samples of a
+    batch must have the same size.
+
+    Args:
+        degradations (list[dict]): Configs of the degradations applied in
+            order. Supported types are 'RandomBlur', 'RandomResize',
+            'RandomNoise', 'RandomJPEGCompression', 'RandomVideoCompression'
+            and 'DegradationsWithShuffle'. Defaults to [].
+        gt_patch_size (int, optional): If given, the degraded inputs and the
+            fields in ``gt_keys`` of the data samples are cropped to patches
+            randomly as :class:`~mmagic.datasets.transforms.PairedRandomCrop`.
+            Defaults to None.
+        gt_keys (Sequence[str]): Keys of the data samples cropped with the
+            inputs. The scale is computed from the first key. Missing keys
+            are skipped. Defaults to ('gt_img', ).
+        **kwargs: Other arguments of :class:`DataPreprocessor`.
+
+    Examples:
+
+        Move the degradations of Real-ESRNet from ``train_pipeline`` to the
+        data preprocessor, and crop the patches on the device:
+
+        .. code-block:: python
+
+            data_preprocessor = dict(
+                type='DegradationDataPreprocessor',
+                degradations=[
+                    dict(type='RandomBlur', params=dict(...)),
+                    dict(type='RandomResize', params=dict(...)),
+                    ...
+                ],
+                gt_patch_size=256,
+                gt_keys=['gt_img', 'gt_unsharp'],
+                mean=[0., 0., 0.],
+                std=[255., 255., 255.])
+    """
+
+    def __init__(self,
+                 degradations: List[dict] = [],
+                 gt_patch_size: Optional[int] = None,
+                 gt_keys: Sequence[str] = ('gt_img', ),
+                 **kwargs):
+        super().__init__(**kwargs)
+        self.degradations = [
+            build_batch_degradation(cfg) for cfg in degradations
+        ]
+        self.gt_patch_size = gt_patch_size
+        self.gt_keys = gt_keys
+
+    def forward(self, data: dict, training: bool = False) -> dict:
+        """Synthesize the degraded inputs in training, and then perform
+        normalization, padding and channel order conversion.
+
+        Args:
+            data (dict): Input data to process.
+            training (bool): Whether to in training mode. Default: False.
+
+        Returns:
+            dict: Data in the same format as the model input.
+        """
+        if training and (self.degradations or self.gt_patch_size):
+            data = self.cast_data(data)
+            data['inputs'] = self.degrade(data['inputs'],
+                                          data.get('data_samples', None))
+        return super().forward(data, training)
+
+    def degrade(self,
+                inputs: Union[Tensor, List[Tensor]],
+                data_samples: Optional[list] = None) -> List[Tensor]:
+        """Apply the degradations to a batch of clean images.
+
+        Args:
+            inputs (Tensor | List[Tensor]): Images with shape (N, C, H, W) or
+                videos with shape (N, T, C, H, W), or a list of them without
+                the batch dimension.
+            data_samples (list, optional): Data samples of the inputs, whose
+                fields in ``gt_keys`` are cropped with the inputs. Defaults to
+                None.
+
+        Returns:
+            List[Tensor]: The degraded images in [0, 255].
+        """
+        if isinstance(inputs, (list, tuple)):
+            inputs = torch.stack(inputs)
+        is_video = inputs.ndim == 5
+        if not is_video:
+            inputs = inputs[:, None]
+        frames = list(inputs.float().unbind(1))
+
+        for degradation in self.degradations:
+            if isinstance(degradation, (tuple, list)):
+                for subdegrdation in degradation:
+                    frames = subdegrdation(frames)
+            else:
+                frames = degradation(frames)
+
+        assert len(set([frame.shape for frame in frames])) == 1, (
+            'Frames must have the same size after degradations, but got '
+            f'{[tuple(frame.shape) for frame in frames]}.')
+        outputs = torch.stack(frames, 1).clamp(0, 255)
+        outputs = list(outputs.unbind(0))
+
+        if self.gt_patch_size is not None:
+            outputs = self._paired_random_crop(outputs, data_samples)
+
+        if not is_video:
+            outputs = [output[0] for output in outputs]
+        return outputs
+
+    def _paired_random_crop(self, inputs: List[Tensor],
+                            data_samples: Optional[list]) -> List[Tensor]:
+        """Crop the degraded inputs and the GT fields of the data samples at
+        the corresponding locations."""
+        outputs = []
+        for idx, lq in enumerate(inputs):
+            gt = data_samples[idx].get(self.gt_keys[0])
+            h_lq, w_lq = lq.shape[-2:]
+            h_gt, w_gt = gt.shape[-2:]
+            scale = h_gt // h_lq
+            assert h_gt == h_lq * scale and w_gt == w_lq * scale, (
+                f'Scale mismatches. GT ({h_gt}, {w_gt}) is not {scale}x '
+                f'multiplication of LQ ({h_lq}, {w_lq}).')
+            assert self.gt_patch_size % scale == 0, (
+                f'\'gt_patch_size\' {self.gt_patch_size} is not divisible '
+                f'by scale {scale}.')
+            lq_patch_size = self.gt_patch_size // scale
+            assert h_lq >= lq_patch_size and w_lq >= lq_patch_size, (
+                f'LQ ({h_lq}, {w_lq}) is smaller than patch size '
+                f'({lq_patch_size}, {lq_patch_size}).')
+
+            top = np.random.randint(h_lq - lq_patch_size + 1)
+            left = np.random.randint(w_lq - lq_patch_size + 1)
+            outputs.append(lq[..., top:top + lq_patch_size,
+                              left:left + lq_patch_size])
+            top_gt, left_gt = top * scale, left * scale
+            for key in self.gt_keys:
+                value = data_samples[idx].get(key)
+                if value is None:
+                    continue
+                data_samples[idx].set_data({
+                    key:
+                    value[..., top_gt:top_gt + self.gt_patch_size,
+                          left_gt:left_gt + self.gt_patch_size]
+                })
+        return outputs
@@ -0,0 +1,64 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import asyncio
+import os.path as osp
+
+import numpy as np
+import pytest
+
+from mmagic.apis import BatchInferenceServer
+from mmagic.apis.inferencers import Inferencers
+from mmagic.utils import register_all_modules
+
+register_all_modules()
+
+
+def test_batch_inference_server():
+    data_root = osp.join(osp.dirname(__file__), '../../')
+    config = data_root + 'configs/srcnn/srcnn_x4k915_1xb16-1000k_div2k.py'
+    img_path = data_root + 'tests/data/image/lq/baboon_x4.png'
+    inferencer = Inferencers('Image Super-Resolution', config, None)
+    result_img = inferencer(img=img_path)[1]
+
+    batch_sizes = []
+    forward = inferencer.inferencer.forward
+
+    def forward_with_record(inputs):
+        batch_sizes.append(len(inputs['inputs']))
+        return forward(inputs)
+
+    inferencer.inferencer.forward = forward_with_record
+
+    async def infer(num_requests, **kwargs):
+        async with BatchInferenceServer(inferencer, **kwargs) as server:
+            results = await asyncio.gather(
+                *[server.infer(img=img_path) for _ in range(num_requests)])
+        return results
+
+    results = asyncio.run(infer(5, max_batch_size=2, max_wait_time=0.2))
+    assert len(results) == 5
+    for result in results:
+        np.testing.assert_array_equal(result[1], result_img)
+    # the last request is forwarded alone after waiting for 0.2 seconds
+    assert batch_sizes == [2, 2, 1]
+
+    batch_sizes.clear()
+    results = asyncio.run(infer(3, max_batch_size=4, max_wait_time=0.01))
+    assert len(results) == 3 and sum(batch_sizes) == 3
+
+    async def infer_after_stop():
+        server = BatchInferenceServer(inferencer)
+        await server.start()
+        await server.stop()
+        await server.infer(img=img_path)
+
+    with pytest.raises(AssertionError):
+        asyncio.run(infer_after_stop())
+
+    # extra parameters can not be changed per request
+    async def infer_with_extra_parameters():
+        async with BatchInferenceServer(inferencer) as server:
+            await server.infer(
+                img=img_path, extra_parameters=dict(tile_size=16))
+
+    with pytest.raises(AssertionError):
+        asyncio.run(infer_with_extra_parameters())
@@ -2,6 +2,7 @@
 import os.path as osp
 import platform
 
+import numpy as np
 import pytest
 import torch
 
@@ -30,3 +31,29 @@ def test_image_super_resolution_inferencer():
         img=img_path, result_out_dir=result_out_dir)
     result_img = inference_result[1]
     assert result_img.shape == (480, 500, 3)
+
+
+def test_image_super_resolution_inferencer_tiled():
+    data_root = osp.join(osp.dirname(__file__), '../../../')
+    config = data_root + 'configs/srgan_resnet/msrresnet_x4c64b16_1xb16-1000k_div2k.py'  # noqa
+    img_path = data_root + 'tests/data/image/lq/baboon_x4.png'
+
+    inferencer_instance = \
+        ImageSuperResolutionInferencer(config, None)
+    result_img = inferencer_instance(img=img_path)[1]
+
+    # tiles larger than the image
+    tiled_img = inferencer_instance(
+        img=img_path, extra_parameters=dict(tile_size=256))[1]
+    np.testing.assert_array_equal(tiled_img, result_img)
+
+    tiled_img = inferencer_instance(
+        img=img_path,
+        extra_parameters=dict(
+            tile_size=64, tile_overlap=16, tile_batch_size=3))[1]
+    assert tiled_img.shape == (480, 500, 3)
+    assert np.abs(tiled_img.astype(np.float32) - result_img).mean() < 0.1
+
+    with pytest.raises(AssertionError):
+        inferencer_instance(
+            img=img_path, extra_parameters=dict(tile_size=64, tile_overlap=64))
@@ -3,6 +3,7 @@ import os.path as osp
 
 import pytest
 
+import mmagic.apis.inferencers as inferencers
 from mmagic.apis.inferencers import Inferencers
 from mmagic.utils import register_all_modules
 
@@ -42,6 +43,14 @@ def test_mmagic_inferencer():
 
     print(e_info)
 
+    # inferencers are imported by name
+    from mmagic.apis.inferencers.image_super_resolution_inferencer import \
+        ImageSuperResolutionInferencer
+    assert inferencers.ImageSuperResolutionInferencer is \
+        ImageSuperResolutionInferencer
+    with pytest.raises(AttributeError):
+        inferencers.DogInferencer
+
     cfg = osp.join(
         osp.dirname(__file__), '..', '..', '..', 'configs', 'sngan_proj',
         'sngan-proj_woReLUinplace_lr2e-4-ndisc5-1xb64_cifar10-32x32.py')
@@ -1,9 +1,14 @@
 # Copyright (c) OpenMMLab. All rights reserved.
 import os.path as osp
 
+import mmcv
+import numpy as np
+import pytest
+import torch
+
 from mmagic.apis.inferencers.video_restoration_inferencer import \
     VideoRestorationInferencer
-from mmagic.utils import register_all_modules
+from mmagic.utils import register_all_modules, tensor2img
 
 register_all_modules()
 
@@ -89,3 +94,117 @@ def test_video_restoration_inferencer_max_seq_len():
     inference_result = inferencer_instance(
         video=video_path, result_out_dir=result_out_dir)
     assert inference_result is None
+
+
+def test_video_restoration_inferencer_window_batch_size():
+    cfg = osp.join(
+        osp.dirname(__file__), '..', '..', '..', 'configs', 'edvr',
+        'edvrm_wotsa_8xb4-600k_reds.py')
+    extra_parameters = {'window_size': 5, 'window_batch_size': 1}
+    inferencer_instance = \
+        VideoRestorationInferencer(
+            cfg,
+            None,
+            extra_parameters=extra_parameters)
+
+    # take the center frame of each window as the output
+    def forward(inputs, mode):
+        assert mode == 'tensor'
+        return inputs[:, 2] * 2
+
+    inferencer_instance.model.forward = forward
+    inputs = torch.rand(1, 7, 3, 8, 8)
+    with torch.no_grad():
+        result = inferencer_instance.forward_sliding_window(inputs)
+    assert result.shape == (1, 7, 3, 8, 8)
+    assert torch.allclose(result, inputs * 2)
+
+    inferencer_instance.extra_parameters['window_batch_size'] = 3
+    with torch.no_grad():
+        batched_result = inferencer_instance.forward_sliding_window(inputs)
+    assert torch.equal(batched_result, result)
+
+
+@pytest.mark.parametrize('window_size', [3, 5])
+@pytest.mark.parametrize('max_seq_len', [1, 2, 4])
+def test_video_restoration_inferencer_chunked_sliding_window(
+        window_size, max_seq_len):
+    cfg = osp.join(
+        osp.dirname(__file__), '..', '..', '..', 'configs', 'edvr',
+        'edvrm_wotsa_8xb4-600k_reds.py')
+    inferencer_instance = VideoRestorationInferencer(
+        cfg, None, extra_parameters=dict(window_size=window_size))
+
+    # the output depends on all frames of the window, including the padding
+    def forward(inputs, mode):
+        weights = torch.arange(1., window_size + 1).view(1, -1, 1, 1, 1)
+        return (inputs * weights).sum(dim=1)
+
+    inferencer_instance.model.forward = forward
+    for num_frames in range(window_size, 12):
+        inputs = torch.rand(1, num_frames, 3, 2, 2)
+        inferencer_instance.extra_parameters['max_seq_len'] = None
+        with torch.no_grad():
+            result = inferencer_instance.forward(inputs)
+        inferencer_instance.extra_parameters['max_seq_len'] = max_seq_len
+        with torch.no_grad():
+            chunked_result = inferencer_instance.forward(inputs)
+        assert chunked_result.shape == result.shape == inputs.shape
+        assert torch.allclose(chunked_result, result)
+
+
+def test_video_restoration_inferencer_streaming(tmp_path):
+    cfg = osp.join(
+        osp.dirname(__file__), '..', '..', '..', 'configs', 'edvr',
+        'edvrm_wotsa_8xb4-600k_reds.py')
+    data_root = osp.join(osp.dirname(__file__), '../../../')
+    video_path = data_root + 'tests/data/frames/test_inference.mp4'
+
+    inferencer_instance = VideoRestorationInferencer(cfg, None)
+
+    # each output frame depends on its adjacent frames
+    def forward(inputs, mode):
+        assert mode == 'tensor'
+        padded = torch.cat([inputs[:, :1], inputs, inputs[:, -1:]], dim=1)
+        return (padded[:, :-2] + padded[:, 1:-1] + padded[:, 2:]) / 3
+
+    inferencer_instance.model.forward = forward
+    with torch.no_grad():
+        inputs = inferencer_instance.preprocess(video=video_path)
+        result = inferencer_instance.forward(inputs)
+    assert result.shape == (1, 5, 3, 64, 64)
+
+    # chunks with context frames give the same results
+    inferencer_instance.extra_parameters.update(max_seq_len=2, chunk_overlap=1)
+    with torch.no_grad():
+        chunked_result = inferencer_instance.forward(inputs)
+    assert torch.allclose(chunked_result, result)
+
+    inferencer_instance.extra_parameters['streaming'] = True
+    result_out_dir = str(tmp_path / 'frames')
+    inference_result = inferencer_instance(
+        video=video_path, result_out_dir=result_out_dir)
+    assert inference_result is None
+    for i in range(5):
+        img = mmcv.imread(osp.join(result_out_dir, f'{i:08d}.png'))
+        np.testing.assert_array_equal(img, tensor2img(result[:, i]))
+
+    result_out_dir = str(tmp_path / 'video.mp4')
+    inferencer_instance(video=video_path, result_out_dir=result_out_dir)
+    assert mmcv.VideoReader(result_out_dir).frame_cnt == 5
+
+    # frames in a folder are named by `filename_tmpl` from `start_idx`
+    frame_dir = tmp_path / 'input'
+    for i, frame in enumerate(mmcv.VideoReader(video_path)):
+        mmcv.imwrite(frame, str(frame_dir / f'{i + 8}.png'))
+    (frame_dir / 'meta.txt').write_text('not a frame')
+    inferencer_instance.extra_parameters.update(
+        start_idx=8, filename_tmpl='{}.png')
+    result_out_dir = str(tmp_path / 'folder')
+    inferencer_instance(video=str(frame_dir), result_out_dir=result_out_dir)
+    for i in range(5):
+        img = mmcv.imread(osp.join(result_out_dir, f'{i + 8}.png'))
+        np.testing.assert_array_equal(img, tensor2img(result[:, i]))
+
+    with pytest.raises(AssertionError):
+        inferencer_instance(video=video_path)
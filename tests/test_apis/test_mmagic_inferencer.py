@@ -1,9 +1,12 @@
 # Copyright (c) OpenMMLab. All rights reserved.
+import json
 import os.path as osp
 
 import pytest
+import yaml
 
 from mmagic.apis import MMagicInferencer
+from mmagic.apis.mmagic_inferencer import METAFILE_INDEX
 from mmagic.utils import register_all_modules
 
 register_all_modules()
@@ -52,5 +55,27 @@ def test_edit():
     assert result_img.shape == (4, 3, 32, 32)
 
 
+def test_metafile_index():
+    # the index should be updated by `.dev_scripts/update_metafile_index.py`
+    with open(METAFILE_INDEX, 'r', encoding='utf-8') as f:
+        index = json.load(f)
+    configs_dir = osp.join(osp.dirname(__file__), '..', '..', 'configs')
+    for model_name in MMagicInferencer.get_inference_supported_models():
+        with open(osp.join(configs_dir, model_name, 'metafile.yml')) as f:
+            models = yaml.safe_load(f)['Models']
+        assert index[model_name]['task'] == models[0]['Results'][0]['Task']
+        settings = index[model_name]['settings']
+        assert len(settings) == len(models)
+        for setting, model in zip(settings, models):
+            for key, value in setting.items():
+                assert model[key] == value
+            assert setting.get('Weights') == model.get('Weights')
+
+    MMagicInferencer.inference_supported_models_cfg_inited = False
+    MMagicInferencer.init_inference_supported_models_cfg()
+    cfg = MMagicInferencer.inference_supported_models_cfg['esrgan']
+    assert cfg == index['esrgan']
+
+
 if __name__ == '__main__':
     test_edit()
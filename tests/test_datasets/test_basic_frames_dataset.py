@@ -1,6 +1,7 @@
 # Copyright (c) OpenMMLab. All rights reserved.
 import os
 from pathlib import Path
+from unittest.mock import patch
 
 from mmagic.datasets import BasicFramesDataset
 
@@ -698,3 +699,34 @@ class TestFramesDatasets:
                     '00000000.png')
             ],
             sample_idx=1)
+
+    def test_index_cache(self, tmp_path):
+        kwargs = dict(
+            metainfo=dict(dataset_type='vsr_folder_dataset', task_name='vsr'),
+            data_root=self.data_root,
+            data_prefix=dict(
+                img=f'sequence{os.sep}gt', gt=f'sequence{os.sep}gt'),
+            pipeline=[],
+            num_input_frames=2)
+
+        for ann_file, depth in [('', 1), ('', 2), ('ann1.txt', 2)]:
+            ref_dataset = BasicFramesDataset(
+                ann_file=ann_file, depth=depth, **kwargs)
+            dataset = BasicFramesDataset(
+                ann_file=ann_file,
+                depth=depth,
+                index_cache_dir=str(tmp_path),
+                **kwargs)
+            # the cached index is loaded without scanning the folders
+            with patch.object(BasicFramesDataset, '_get_path_list') as mock:
+                cached_dataset = BasicFramesDataset(
+                    ann_file=ann_file,
+                    depth=depth,
+                    index_cache_dir=str(tmp_path),
+                    **kwargs)
+                mock.assert_not_called()
+            assert len(dataset) == len(cached_dataset) == len(ref_dataset)
+            for idx in range(len(ref_dataset)):
+                assert dataset[idx] == ref_dataset[idx]
+                assert cached_dataset[idx] == ref_dataset[idx]
+        assert len(list(tmp_path.iterdir())) == 3
@@ -1,6 +1,7 @@
 # Copyright (c) OpenMMLab. All rights reserved.
 import os
 from pathlib import Path
+from unittest.mock import patch
 
 import mmcv
 
@@ -170,3 +171,31 @@ class TestImageDatasets:
             gt_path=str(self.data_root / 'gt' / 'baboon.png'),
             ref_path=str(self.data_root / 'gt' / 'baboon.png'),
             sample_idx=0)
+
+    def test_index_cache(self, tmp_path):
+        kwargs = dict(
+            metainfo=dict(dataset_type='sr_folder_dataset', task_name='sisr'),
+            data_root=self.data_root,
+            data_prefix=dict(img='lq', gt='gt'),
+            filename_tmpl=dict(img='{}_x4'),
+            pipeline=[])
+
+        for ann_file in ['', 'train.txt']:
+            ref_dataset = BasicImageDataset(ann_file=ann_file, **kwargs)
+            dataset = BasicImageDataset(
+                ann_file=ann_file, index_cache_dir=str(tmp_path), **kwargs)
+            assert len(dataset) == len(ref_dataset)
+            for idx in range(len(ref_dataset)):
+                assert dataset[idx] == ref_dataset[idx]
+
+        # other ranks load the manifest saved by rank 0 without listing
+        with patch('mmagic.datasets.data_utils.get_dist_info',
+                   return_value=(1, 2)), \
+                patch('mmagic.datasets.data_utils.barrier') as barrier, \
+                patch.object(BasicImageDataset, '_get_path_list') as mock:
+            dataset = BasicImageDataset(
+                index_cache_dir=str(tmp_path), **kwargs)
+            mock.assert_not_called()
+            barrier.assert_called_once()
+        assert dataset[0] == ref_dataset[0]
+        assert len(list(tmp_path.iterdir())) == 2
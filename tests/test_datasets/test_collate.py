@@ -0,0 +1,83 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import numpy as np
+import torch
+from mmengine.dataset import pseudo_collate
+from torch.utils.data import DataLoader, Dataset
+
+from mmagic.datasets import packed_collate
+from mmagic.datasets.transforms import PackInputs
+from mmagic.models import DataPreprocessor
+from mmagic.registry import FUNCTIONS
+
+
+class _ToyDataset(Dataset):
+
+    def __init__(self, pack_tensor, num_frames=None):
+        self.pack_inputs = PackInputs(keys='img', pack_tensor=pack_tensor)
+        self.num_frames = num_frames
+
+    def __len__(self):
+        return 4
+
+    def __getitem__(self, idx):
+        rng = np.random.RandomState(idx)
+        if self.num_frames is None:
+            img = rng.randint(0, 255, (6, 5, 3), dtype=np.uint8)
+        else:
+            img = [
+                rng.randint(0, 255, (6, 5, 3), dtype=np.uint8)
+                for _ in range(self.num_frames)
+            ]
+        return self.pack_inputs(dict(img=img))
+
+
+def test_packed_collate():
+    assert FUNCTIONS.get('mmagic.packed_collate') is packed_collate
+
+    for num_frames in [None, 1, 3]:
+        ref = pseudo_collate(
+            [_ToyDataset(True, num_frames)[idx] for idx in range(4)])
+        batch = packed_collate(
+            [_ToyDataset(False, num_frames)[idx] for idx in range(4)])
+        assert batch['inputs'].dtype == torch.uint8
+        assert batch['inputs'].is_contiguous()
+        torch.testing.assert_close(batch['inputs'], torch.stack(ref['inputs']))
+        assert len(batch['data_samples']) == 4
+
+    # flipped and gray images
+    img = np.arange(30, dtype=np.uint8).reshape(6, 5)
+    batch = packed_collate([
+        dict(inputs=np.flip(img, axis=1)),
+        dict(inputs=img),
+    ])
+    assert batch['inputs'].shape == (2, 1, 6, 5)
+    torch.testing.assert_close(batch['inputs'][0, 0],
+                               torch.from_numpy(img[:, ::-1].copy()))
+
+    # images with different shapes and other inputs are not collated
+    batch = packed_collate([
+        dict(inputs=dict(img=np.zeros((6, 5, 3)), num_batches=1)),
+        dict(inputs=dict(img=np.zeros((4, 5, 3)), num_batches=1)),
+    ])
+    assert [v.shape for v in batch['inputs']['img']] == [(3, 6, 5), (3, 4, 5)]
+    assert batch['inputs']['num_batches'] == [1, 1]
+
+
+def test_packed_collate_dataloader():
+    data_preprocessor = DataPreprocessor(
+        mean=[0, 0, 0], std=[255, 255, 255], non_blocking=True)
+    ref_preprocessor = DataPreprocessor(mean=[0, 0, 0], std=[255, 255, 255])
+
+    loader = DataLoader(
+        _ToyDataset(False, 3),
+        batch_size=2,
+        num_workers=1,
+        collate_fn=packed_collate)
+    ref_loader = DataLoader(
+        _ToyDataset(True, 3), batch_size=2, collate_fn=pseudo_collate)
+    for batch, ref_batch in zip(loader, ref_loader):
+        assert batch['inputs'].shape == (2, 3, 3, 6, 5)
+        outputs = data_preprocessor(batch)['inputs']
+        ref_outputs = ref_preprocessor(ref_batch)['inputs']
+        assert outputs.dtype == torch.float32
+        torch.testing.assert_close(outputs, ref_outputs)
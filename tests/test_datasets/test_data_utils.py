@@ -1,5 +1,11 @@
 # Copyright (c) OpenMMLab. All rights reserved.
-from mmagic.datasets.data_utils import infer_io_backend
+import os
+from unittest.mock import patch
+
+import numpy as np
+
+from mmagic.datasets.data_utils import (SharedFileCache, infer_io_backend,
+                                        load_or_build_index)
 
 
 def test_infer_io_backend():
@@ -19,4 +25,110 @@ def test_infer_io_backend():
     assert infer_io_backend(path) == 'local'
 
 
+def test_shared_file_cache(tmp_path):
+    cache = SharedFileCache(cache_dir=str(tmp_path), max_size=10)
+    assert 'a' not in cache
+    assert cache.get('a') is None
+
+    assert cache.put('a', b'aaaa')
+    assert 'a' in cache
+    assert cache.get('a') == b'aaaa'
+
+    # the cache is shared by instances with the same directory
+    assert SharedFileCache(cache_dir=str(tmp_path)).get('a') == b'aaaa'
+
+    # entries larger than the cache are not cached
+    assert not cache.put('b', b'b' * 11)
+    assert 'b' not in cache
+
+    # least recently used entries are evicted
+    assert cache.put('b', b'bbbb')
+    os.utime(cache._get_path('b'), (0, 0))
+    assert cache.get('a') == b'aaaa'
+    assert cache.put('c', b'cccc')
+    assert 'a' in cache and 'b' not in cache and 'c' in cache
+
+    cache.clear()
+    assert 'a' not in cache and 'c' not in cache
+
+    # keys of different namespaces do not collide
+    cache_a = SharedFileCache(cache_dir=str(tmp_path), namespace='a')
+    cache_b = SharedFileCache(cache_dir=str(tmp_path), namespace='b')
+    assert cache_a.put('x', b'a') and cache_b.put('x', b'b')
+    assert cache_a.get('x') == b'a' and cache_b.get('x') == b'b'
+
+    # clear only removes the entries of the namespace
+    cache_a.clear()
+    assert 'x' not in cache_a and cache_b.get('x') == b'b'
+    assert cache_b._read_size() == 1
+
+    # the max size is clamped to the free space
+    assert SharedFileCache(
+        cache_dir=str(tmp_path), max_size=2**80).max_size < 2**80
+
+
+def test_shared_file_cache_low_water(tmp_path):
+    cache = SharedFileCache(cache_dir=str(tmp_path), max_size=100)
+    for i in range(20):
+        assert cache.put(str(i), b'x' * 5)
+        os.utime(cache._get_path(str(i)), (i, i))
+    assert cache._read_size() == 100
+
+    # a full cache is evicted to the low-water mark in one scan
+    with patch.object(cache, '_evict', wraps=cache._evict) as evict:
+        assert cache.put('20', b'x' * 5)
+        assert cache.put('21', b'x' * 5)
+    assert evict.call_count == 1
+    assert cache._read_size() == 100
+    assert '1' not in cache and '2' in cache and '21' in cache
+
+
+def test_shared_file_cache_write_error(tmp_path):
+    cache = SharedFileCache(cache_dir=str(tmp_path), max_size=10)
+    # e.g. ENOSPC when the file system is full
+    with patch('os.replace', side_effect=OSError(28, 'No space left')):
+        assert not cache.put('a', b'aaaa')
+    assert 'a' not in cache
+    assert [f for f in os.listdir(tmp_path) if f.endswith('.tmp')] == []
+    assert cache._read_size() == 0
+    assert cache.put('a', b'aaaa')
+
+
 # TODO: add more uts
+
+
+def test_load_or_build_index(tmp_path):
+    data_dir = tmp_path / 'data'
+    data_dir.mkdir()
+    cache_dir = str(tmp_path / 'cache')
+    num_builds = []
+
+    def build():
+        num_builds.append(1)
+        return dict(
+            paths=np.array(sorted(os.listdir(data_dir)), dtype=str),
+            sizes=np.arange(len(os.listdir(data_dir))))
+
+    (data_dir / 'a.png').write_bytes(b'a')
+    index = load_or_build_index(cache_dir, 'test', dict(depth=1), build,
+                                [str(data_dir)])
+    assert index['paths'].tolist() == ['a.png']
+    assert isinstance(index['sizes'], np.memmap)
+    assert len(num_builds) == 1
+
+    # load from the cache
+    index = load_or_build_index(cache_dir, 'test', dict(depth=1), build,
+                                [str(data_dir)])
+    assert index['paths'].tolist() == ['a.png']
+    assert len(num_builds) == 1
+
+    # rebuild when the key or the folder is changed
+    load_or_build_index(cache_dir, 'test', dict(depth=2), build,
+                        [str(data_dir)])
+    assert len(num_builds) == 2
+    (data_dir / 'b.png').write_bytes(b'b')
+    os.utime(data_dir, ns=(0, 10**9))
+    index = load_or_build_index(cache_dir, 'test', dict(depth=1), build,
+                                [str(data_dir)])
+    assert index['paths'].tolist() == ['a.png', 'b.png']
+    assert len(num_builds) == 3
@@ -0,0 +1,90 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import os
+import os.path as osp
+import pickle
+from pathlib import Path
+
+import mmengine
+from mmengine.fileio import get_file_backend
+
+from mmagic.datasets import BasicFramesDataset, ShardBackend, write_shards
+from mmagic.datasets.transforms import LoadImageFromFile
+
+
+def pack(data_root, shard_dir, shard_size=1024**3):
+    files = sorted(mmengine.scandir(data_root, recursive=True))
+    return files, write_shards(data_root, files, shard_dir, shard_size)
+
+
+def test_shard_backend(tmp_path):
+    data_root = str(Path(__file__).parent.parent / 'data' / 'frames')
+    shard_dir = str(tmp_path)
+    files, shards = pack(data_root, shard_dir, shard_size=1)
+    # a new shard is started for each file larger than the shard size
+    assert len(shards) == len(files)
+    assert osp.exists(osp.join(shard_dir, shards[-1]))
+
+    backend = get_file_backend(
+        backend_args=dict(backend='shard', shard_dir=shard_dir))
+    assert isinstance(backend, ShardBackend)
+    for file in files:
+        with open(osp.join(data_root, file), 'rb') as f:
+            assert backend.get(osp.join(shard_dir, file)) == f.read()
+        assert backend.isfile(osp.join(shard_dir, file))
+    assert backend.get_text(osp.join(shard_dir,
+                                     'ann1.txt')).startswith('sequence_1')
+    assert backend.isdir(osp.join(shard_dir, 'sequence', 'gt'))
+    assert not backend.exists(osp.join(shard_dir, 'sequence', 'lq'))
+
+    # list the packed folder in the same way as local folders
+    local_backend = get_file_backend(data_root)
+    for kwargs in [
+            dict(),
+            dict(list_dir=False, suffix='.png', recursive=True),
+            dict(list_file=False, recursive=True)
+    ]:
+        assert sorted(
+            backend.list_dir_or_file(
+                osp.join(shard_dir, 'sequence'), **kwargs)) == sorted(
+                    local_backend.list_dir_or_file(
+                        osp.join(data_root, 'sequence'), **kwargs))
+
+    # shards are reopened after pickling, e.g. in DataLoader workers
+    backend = pickle.loads(pickle.dumps(backend))
+    assert backend.get(osp.join(shard_dir, files[0]))
+
+
+def test_shard_frames_dataset(tmp_path):
+    data_root = str(Path(__file__).parent.parent / 'data' / 'frames')
+    shard_dir = str(tmp_path)
+    pack(data_root, shard_dir)
+
+    def build(root, backend_args=None):
+        return BasicFramesDataset(
+            ann_file='ann3.txt',
+            metainfo=dict(dataset_type='SRVimeo90KDataset', task_name='vsr'),
+            data_root=root,
+            data_prefix=dict(img='sequence', gt='sequence'),
+            backend_args=backend_args,
+            pipeline=[],
+            depth=2,
+            load_frames_list=dict(img=['all'], gt=['00000000.png']))
+
+    backend_args = dict(backend='shard', shard_dir=shard_dir)
+    dataset = build(data_root)
+    shard_dataset = build(shard_dir, backend_args)
+    assert len(shard_dataset) == len(dataset)
+    data, shard_data = dataset[0], shard_dataset[0]
+    assert shard_data['key'] == data['key']
+    assert shard_data['img_path'] == [
+        path.replace(data_root, shard_dir) for path in data['img_path']
+    ]
+
+    # load images from shards
+    loader = LoadImageFromFile(key='img', backend_args=backend_args)
+    results = loader(dict(img_path=shard_data['img_path']))
+    local_results = LoadImageFromFile(key='img')(
+        dict(img_path=data['img_path']))
+    for img, local_img in zip(results['img'], local_results['img']):
+        assert (img == local_img).all()
+    assert results['img_path'][0].startswith(shard_dir + os.sep)
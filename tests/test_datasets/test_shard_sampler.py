@@ -0,0 +1,29 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+from unittest.mock import patch
+
+from mmagic.datasets import ShardShuffleSampler
+
+
+def test_shard_shuffle_sampler():
+    dataset = list(range(10))
+    sampler = ShardShuffleSampler(dataset, seed=0, block_size=4)
+    indices = list(sampler)
+    assert len(sampler) == 10
+    assert sorted(indices) == dataset
+    # samples of each block are adjacent
+    blocks = [idx // 4 for idx in indices]
+    assert sum([a != b for a, b in zip(blocks[:-1], blocks[1:])]) == 2
+
+    # deterministic for the same epoch
+    assert list(sampler) == indices
+    sampler.set_epoch(1)
+    assert sorted(list(sampler)) == dataset
+
+    sampler = ShardShuffleSampler(dataset, shuffle=False, block_size=4)
+    assert list(sampler) == dataset
+
+    # distributed
+    with patch('mmengine.dataset.sampler.get_dist_info', return_value=(1, 3)):
+        sampler = ShardShuffleSampler(dataset, seed=0, block_size=4)
+    assert len(sampler) == 4
+    assert len(list(sampler)) == 4
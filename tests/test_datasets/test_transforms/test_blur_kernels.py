@@ -1,4 +1,6 @@
 # Copyright (c) OpenMMLab. All rights reserved.
+import numpy as np
+
 from mmagic.datasets.transforms import blur_kernels
 
 
@@ -10,3 +12,38 @@ def test_blur_kernels():
     for kernel_type in kernels:
         kernel = blur_kernels.random_mixed_kernels([kernel_type], [1], 5)
         assert kernel.shape == (5, 5)
+
+
+def test_random_mixed_kernels_batch():
+    kernels = [
+        'iso', 'aniso', 'generalized_iso', 'generalized_aniso', 'plateau_iso',
+        'plateau_aniso', 'sinc'
+    ]
+    batch = blur_kernels.random_mixed_kernels_batch(
+        20, kernels, [1 / 7] * 7, 11, noise_range=[0.9, 1.1])
+    assert batch.shape == (20, 11, 11)
+    np.testing.assert_allclose(batch.sum(axis=(1, 2)), 1)
+
+    # same as the kernels generated one by one with fixed parameters
+    for kernel_type in kernels:
+        args = ([kernel_type], [1], 9, [1.5, 1.5], [0.7, 0.7], [0.5, 0.5],
+                [1, 1], [1, 1], [2, 2])
+        batch = blur_kernels.random_mixed_kernels_batch(3, *args)
+        kernel = blur_kernels.random_mixed_kernels(*args)
+        for k in batch:
+            np.testing.assert_allclose(k, kernel, rtol=1e-6, atol=1e-8)
+
+
+def test_generate_kernel_bank(tmp_path):
+    bank = blur_kernels.generate_kernel_bank(
+        8, ['aniso', 'sinc'], [0.5, 0.5], 7, sigma_x_range=[0.5, 2])
+    assert bank.shape == (8, 7, 7)
+    assert bank.dtype == np.float32
+
+    bank = blur_kernels.generate_kernel_bank(
+        8, ['aniso'], [1], 7, bank_dir=str(tmp_path))
+    assert isinstance(bank, np.memmap)
+    bank_reload = blur_kernels.generate_kernel_bank(
+        8, ['aniso'], [1], 7, bank_dir=str(tmp_path))
+    np.testing.assert_array_equal(bank, bank_reload)
+    assert len(list(tmp_path.iterdir())) == 1
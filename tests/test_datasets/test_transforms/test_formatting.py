@@ -105,3 +105,10 @@ def test_pack_inputs():
     gt_bg_tensor = to_tensor(ori_results['bg'])
     gt_bg_tensor = gt_bg_tensor.permute(2, 0, 1)
     assert_tensor_equal(data_sample.gt_bg, gt_bg_tensor)
+
+
+def test_pack_inputs_without_tensor():
+    img = np.random.randint(0, 255, (8, 6, 3), dtype=np.uint8)
+    pack_inputs = PackInputs(keys='img', pack_tensor=False)
+    packed_results = pack_inputs(dict(img=img))
+    assert packed_results['inputs'] is img
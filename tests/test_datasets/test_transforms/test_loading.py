@@ -7,10 +7,12 @@ import pytest
 from mmengine.fileio.backends import LocalBackend
 
 from mmagic.datasets.transforms import (GetSpatialDiscountMask,
-                                        LoadImageFromFile, LoadMask)
+                                        LoadImageFromFile, LoadMask,
+                                        PairedRandomCrop)
+from mmagic.datasets.transforms.loading import LazyImage
 
 
-def test_load_image_from_file():
+def test_load_image_from_file(tmp_path):
 
     path_baboon = Path(
         __file__).parent.parent.parent / 'data' / 'image' / 'gt' / 'baboon.png'
@@ -62,7 +64,7 @@ def test_load_image_from_file():
         ('(key=img, color_type=color, channel_order=bgr, '
          'imdecode_backend=None, use_cache=False, to_float32=False, '
          'to_y_channel=False, save_original_img=False, '
-         'backend_args=None)'))
+         'backend_args=None, lazy=False)'))
     assert isinstance(image_loader.file_backend, LocalBackend)
 
     # test save_original_img
@@ -79,18 +81,21 @@ def test_load_image_from_file():
 
     # test: use_cache
     results = dict(gt_path=path_baboon)
-    config = dict(key='gt', use_cache=True)
+    config = dict(
+        key='gt', use_cache=True, cache_cfg=dict(cache_dir=str(tmp_path)))
     image_loader = LoadImageFromFile(**config)
-    assert image_loader.cache == dict()
+    assert image_loader.cache is not None
     assert repr(image_loader) == (
         image_loader.__class__.__name__ +
         ('(key=gt, color_type=color, channel_order=bgr, '
          'imdecode_backend=None, use_cache=True, to_float32=False, '
          'to_y_channel=False, save_original_img=False, '
-         'backend_args=None)'))
+         'backend_args=None, lazy=False)'))
     results = image_loader(results)
-    assert image_loader.cache is not None
-    assert str(path_baboon) in image_loader.cache
+    cache_key = image_loader._get_cache_key(str(path_baboon))
+    assert cache_key in image_loader.cache
+    # the cache is shared by loaders, e.g. in other DataLoader workers
+    assert cache_key in LoadImageFromFile(**config).cache
     assert results['gt'].shape == (h, w, 3)
     assert results['gt_path'] == path_baboon
     np.testing.assert_almost_equal(results['gt'], img_baboon)
@@ -179,6 +184,134 @@ def test_load_image_from_file():
         assert results['img'] == 'openmmlab:s3://abcd/efg/'
 
 
+def test_load_image_from_file_cache_decoded(tmp_path):
+    path_baboon = Path(
+        __file__).parent.parent.parent / 'data' / 'image' / 'gt' / 'baboon.png'
+    img_baboon = mmcv.imread(str(path_baboon), flag='color')
+
+    config = dict(
+        key='gt',
+        use_cache=True,
+        cache_cfg=dict(cache_dir=str(tmp_path)),
+        cache_decoded=True)
+    image_loader = LoadImageFromFile(**config)
+    results = image_loader(dict(gt_path=str(path_baboon)))
+    np.testing.assert_array_equal(results['gt'], img_baboon)
+    cache_key = image_loader._get_cache_key(str(path_baboon))
+    assert cache_key in image_loader.cache
+
+    # decoded images are read from the cache
+    results = LoadImageFromFile(**config)(dict(gt_path=str(path_baboon)))
+    np.testing.assert_array_equal(results['gt'], img_baboon)
+
+    # decoded images with other color types are cached separately
+    image_loader = LoadImageFromFile(**dict(config, color_type='grayscale'))
+    assert image_loader._get_cache_key(str(path_baboon)) != cache_key
+    results = image_loader(dict(gt_path=str(path_baboon)))
+    assert results['gt'].shape == img_baboon.shape[:2] + (1, )
+
+
+def test_load_image_from_file_cache_lmdb(tmp_path):
+    import lmdb
+    data_root = Path(__file__).parent.parent.parent / 'data' / 'image'
+    # records of the gt and lq databases share the same name
+    for name, path in (('gt', data_root / 'gt' / 'baboon.png'),
+                       ('lq', data_root / 'lq' / 'baboon_x4.png')):
+        with lmdb.open(str(tmp_path / f'{name}.lmdb')) as env:
+            with env.begin(write=True) as txn:
+                txn.put(b'baboon', path.read_bytes())
+    img_gt = mmcv.imread(str(data_root / 'gt' / 'baboon.png'))
+    img_lq = mmcv.imread(str(data_root / 'lq' / 'baboon_x4.png'))
+
+    cache_cfg = dict(cache_dir=str(tmp_path / 'cache'))
+    loaders = [
+        LoadImageFromFile(
+            key=key,
+            use_cache=True,
+            cache_cfg=cache_cfg,
+            backend_args=dict(
+                backend='lmdb', db_path=tmp_path / f'{key}.lmdb'))
+        for key in ('gt', 'lq')
+    ]
+    # read twice to load from the cache
+    for _ in range(2):
+        results = dict(gt_path='baboon.png', lq_path='baboon.png')
+        for loader in loaders:
+            results = loader(results)
+        np.testing.assert_array_equal(results['gt'], img_gt)
+        np.testing.assert_array_equal(results['lq'], img_lq)
+
+
+def test_load_image_from_file_lazy(tmp_path):
+    path_baboon = Path(
+        __file__).parent.parent.parent / 'data' / 'image' / 'gt' / 'baboon.png'
+    path_baboon_x4 = Path(
+        __file__
+    ).parent.parent.parent / 'data' / 'image' / 'lq' / 'baboon_x4.png'
+    img_baboon = mmcv.imread(str(path_baboon), flag='color')
+    img_baboon_x4 = mmcv.imread(str(path_baboon_x4), flag='color')
+    h, w, _ = img_baboon.shape
+    npy_baboon = str(tmp_path / 'baboon.npy')
+    npy_baboon_x4 = str(tmp_path / 'baboon_x4.npy')
+    np.save(npy_baboon, img_baboon)
+    np.save(npy_baboon_x4, img_baboon_x4)
+
+    image_loader = LoadImageFromFile(key='gt', lazy=True)
+    results = image_loader(dict(gt_path=npy_baboon))
+    assert isinstance(results['gt'], LazyImage)
+    assert results['gt'].shape == (h, w, 3)
+    assert results['ori_gt_shape'] == (h, w, 3)
+    np.testing.assert_array_equal(results['gt'][10:50, 20:80, ...],
+                                  img_baboon[10:50, 20:80])
+    np.testing.assert_array_equal(np.asarray(results['gt']), img_baboon)
+    assert repr(image_loader).endswith('lazy=True)')
+
+    # color conversion
+    for config in [
+            dict(channel_order='rgb', to_float32=True),
+            dict(color_type='grayscale'),
+            dict(to_y_channel=True)
+    ]:
+        image_loader = LoadImageFromFile(key='gt', lazy=True, **config)
+        lazy_img = image_loader(dict(gt_path=npy_baboon))['gt']
+        image_loader = LoadImageFromFile(key='gt', **config)
+        img = image_loader(dict(gt_path=str(path_baboon)))['gt']
+        assert lazy_img.shape == img.shape
+        np.testing.assert_allclose(
+            lazy_img[5:20, 7:30, ...], img[5:20, 7:30], atol=1)
+        assert lazy_img[5:20, 7:30, ...].dtype == img.dtype
+
+    # uncompressed TIFF files are stored in 'rgb' order
+    tifffile = pytest.importorskip('tifffile')
+    tif_baboon = str(tmp_path / 'baboon.tif')
+    tifffile.imwrite(tif_baboon, mmcv.bgr2rgb(img_baboon))
+    for config in [dict(), dict(channel_order='rgb')]:
+        image_loader = LoadImageFromFile(key='gt', lazy=True, **config)
+        lazy_img = image_loader(dict(gt_path=tif_baboon))['gt']
+        assert isinstance(lazy_img, LazyImage)
+        image_loader = LoadImageFromFile(key='gt', **config)
+        img = image_loader(dict(gt_path=tif_baboon))['gt']
+        np.testing.assert_array_equal(lazy_img[10:50, 20:80, ...], img[10:50,
+                                                                       20:80])
+
+    # files can not be memory-mapped are decoded as usual
+    image_loader = LoadImageFromFile(key='gt', lazy=True)
+    results = image_loader(dict(gt_path=str(path_baboon)))
+    np.testing.assert_array_equal(results['gt'], img_baboon)
+
+    # crop only reads the required region
+    results = dict(gt_path=npy_baboon, img_path=npy_baboon_x4, scale=4)
+    results = LoadImageFromFile(key='gt', lazy=True)(results)
+    results = LoadImageFromFile(key='img', lazy=True)(results)
+    results = PairedRandomCrop(64)(results)
+    assert isinstance(results['gt'], np.ndarray)
+    assert results['gt'].shape == (64, 64, 3)
+    assert results['img'].shape == (16, 16, 3)
+
+    with pytest.raises(AssertionError):
+        LoadImageFromFile(key='gt', lazy=True, save_original_img=True)
+
+
 def test_dct_mask():
     mask = np.zeros((64, 64, 1))
     mask[20:40, 20:40] = 1.
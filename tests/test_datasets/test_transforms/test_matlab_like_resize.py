@@ -34,4 +34,26 @@ def test_matlab_like_resize():
 
     assert repr(imresize) == imresize.__class__.__name__ \
         + "(keys=['lq'], scale=None, output_shape=(6, 6), " \
-        + 'kernel=bicubic, kernel_width=4.0)'
+        + 'kernel=bicubic, kernel_width=4.0, vectorized=False)'
+
+
+@pytest.mark.parametrize('shape, seed', [((37, 50, 3), 0), ((40, 29), 0),
+                                         ((300, 280, 3), 1)])
+@pytest.mark.parametrize('scale, output_shape', [(0.25, None), (0.5, None),
+                                                 (2, None), (3, None),
+                                                 (None, (17, 61))])
+def test_matlab_like_resize_vectorized(shape, seed, scale, output_shape):
+    img = np.random.RandomState(seed).randint(0, 256, shape).astype(np.uint8)
+
+    results = dict(lq=img)
+    results = MATLABLikeResize(
+        keys=['lq'], scale=scale, output_shape=output_shape)(
+            results)
+    vectorized_results = dict(lq=img)
+    imresize = MATLABLikeResize(
+        keys=['lq'], scale=scale, output_shape=output_shape, vectorized=True)
+    vectorized_results = imresize(vectorized_results)
+    assert vectorized_results['lq'].shape == results['lq'].shape
+    assert vectorized_results['lq'].dtype == results['lq'].dtype
+    # bit-exact, e.g. the same after rounding for uint8
+    np.testing.assert_array_equal(vectorized_results['lq'], results['lq'])
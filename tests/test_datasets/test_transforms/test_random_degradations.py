@@ -1,4 +1,6 @@
 # Copyright (c) OpenMMLab. All rights reserved.
+import pickle
+
 import numpy as np
 import pytest
 
@@ -97,6 +99,27 @@ def test_random_video_compression():
         + "keys=['lq'])"
 
 
+def test_random_video_compression_pooled():
+    results = {}
+    results['lq'] = [np.ones((8, 8, 3)).astype(np.float32)] * 5
+
+    # raw packets with pooled decoders
+    model = RandomVideoCompression(
+        params=dict(
+            codec=['libx264', 'h264', 'mpeg4'],
+            codec_prob=[1 / 3., 1 / 3., 1 / 3.],
+            bitrate=[1e4, 1e5],
+            pooled=True),
+        keys=['lq'])
+    for _ in range(3):
+        results = model(results)
+        assert results['lq'][0].shape == (8, 8, 3)
+        assert results['lq'][0].dtype == np.float32
+        assert len(results['lq']) == 5
+    assert len(model._decoders) > 0
+    assert pickle.loads(pickle.dumps(model))._decoders == dict()
+
+
 def test_random_resize():
     results = {}
     results['lq'] = np.ones((8, 8, 3)).astype(np.float32)
@@ -338,6 +361,46 @@ def test_random_blur():
         + "keys=['lq'])"
 
 
+def test_random_blur_kernel_bank(tmp_path):
+    params = dict(
+        kernel_size=[7, 21],
+        kernel_list=['iso', 'aniso', 'generalized_aniso', 'sinc'],
+        kernel_prob=[0.25, 0.25, 0.25, 0.25],
+        sigma_x=[0.2, 3],
+        sigma_y=[0.2, 3],
+        rotate_angle=[-3.1416, 3.1416],
+        kernel_bank=dict(num_kernels=16))
+    model = RandomBlur(params=params, keys=['lq'])
+    assert set(model.kernel_banks) == {7, 21}
+    assert model.kernel_banks[21].shape == (16, 21, 21)
+
+    # all frames share the same kernel
+    kernels = model.get_kernel(3)
+    assert len(kernels) == 3
+    assert kernels[0] is kernels[1] is kernels[2]
+    assert any(
+        np.allclose(kernels[0], k)
+        for k in model.kernel_banks[kernels[0].shape[0]])
+
+    results = dict(lq=[np.ones((8, 8, 3)).astype(np.float32)] * 2)
+    results = model(results)
+    assert len(results['lq']) == 2
+    np.testing.assert_allclose(results['lq'][0], 1, rtol=1e-5)
+
+    # save and memory-map the bank
+    params['kernel_bank'] = dict(num_kernels=16, bank_dir=str(tmp_path))
+    model = RandomBlur(params=params, keys=['lq'])
+    assert isinstance(model.kernel_banks[7], np.memmap)
+    assert len(list(tmp_path.iterdir())) == 2
+    model_reload = RandomBlur(params=params, keys=['lq'])
+    np.testing.assert_array_equal(model.kernel_banks[7],
+                                  model_reload.kernel_banks[7])
+
+    # kernel steps are not supported
+    with pytest.raises(AssertionError):
+        RandomBlur(params=dict(params, sigma_x_step=0.1), keys=['lq'])
+
+
 def test_degradations_with_shuffle():
     results = {}
     results['lq'] = np.ones((8, 8, 3)).astype(np.uint8)
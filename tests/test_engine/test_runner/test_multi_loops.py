@@ -2,6 +2,7 @@
 from unittest import TestCase
 from unittest.mock import MagicMock
 
+import torch
 from mmengine.evaluator import Evaluator as BaseEvaluator
 
 from mmagic.engine import MultiTestLoop, MultiValLoop
@@ -205,3 +206,46 @@ class TestLoop(TestCase):
     def test_run(self):
         self._test_run(True)  # val
         self._test_run(False)  # test
+
+    def _test_run_with_sample_pool(self, is_val):
+        LOOP_CLS = MultiValLoop if is_val else MultiTestLoop
+        runner = build_mock_runner()
+        step_fn = runner.model.val_step if is_val else runner.model.test_step
+        step_fn.side_effect = lambda data: [
+            dict(fake_img=torch.zeros(3, 4, 4))
+            for _ in range(data['inputs']['num_batches'])
+        ]
+        dataloader = MagicMock()
+
+        def get_samplers(num_batches):
+            metric = MagicMock(
+                SAMPLER_MODE='Generative',
+                sample_model='orig',
+                sample_kwargs=dict(),
+                need_cond_input=False)
+            batch = dict(inputs=dict(num_batches=num_batches))
+            return [[[metric], [batch, batch]]]
+
+        evaluator1 = MagicMock(spec=Evaluator)
+        evaluator1.prepare_samplers = MagicMock(return_value=get_samplers(2))
+        evaluator2 = MagicMock(spec=Evaluator)
+        evaluator2.prepare_samplers = MagicMock(return_value=get_samplers(3))
+        loop = LOOP_CLS(
+            runner=runner,
+            dataloader=[dataloader, dataloader],
+            evaluator=[evaluator1, evaluator2],
+            sample_pool=dict())
+        loop.run()
+
+        # 4 samples for evaluator1, and 2 missing samples for evaluator2
+        num_generated = [
+            call_args[0][0]['inputs']['num_batches']
+            for call_args in step_fn.call_args_list
+        ]
+        assert num_generated == [2, 2, 2]
+        assert len(evaluator2.process.call_args_list[1][0][0]) == 3
+        assert len(loop.sample_pool) == 0
+
+    def test_run_with_sample_pool(self):
+        self._test_run_with_sample_pool(True)  # val
+        self._test_run_with_sample_pool(False)  # test
@@ -0,0 +1,144 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import os
+import os.path as osp
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+import numpy as np
+
+from mmagic.evaluation.functional import FeatureIndex, ShardedFeatureCache
+
+
+def test_sharded_feature_cache():
+    feat = np.random.rand(25, 8).astype(np.float32)
+    with TemporaryDirectory() as tmp_dir:
+        cache_dir = osp.join(tmp_dir, 'cache')
+        cache = ShardedFeatureCache(cache_dir, 'key', shard_size=10)
+        assert not cache.is_complete
+        assert cache.num_finished == 0
+
+        # interrupted after two complete shards
+        cache.add(feat[:7])
+        cache.add(feat[7:22])
+        assert cache.num_finished == 20
+        assert len(os.listdir(cache_dir)) == 3
+
+        # resume from the last complete shard
+        cache = ShardedFeatureCache(cache_dir, 'key', shard_size=10)
+        assert cache.num_finished == 20
+        cache.add(feat[20:])
+        cache.merge(25)
+        assert cache.is_complete
+        assert sorted(
+            os.listdir(cache_dir)) == ['feature.npy', 'manifest.json']
+
+        cache = ShardedFeatureCache(cache_dir, 'key', shard_size=10)
+        loaded = cache.load()
+        assert isinstance(loaded, np.memmap)
+        np.testing.assert_array_equal(loaded, feat)
+
+        mean, cov = cache.get_mean_cov(chunk_size=4)
+        np.testing.assert_allclose(mean, np.mean(feat, 0), rtol=1e-5)
+        np.testing.assert_allclose(cov, np.cov(feat, rowvar=False), rtol=1e-5)
+        assert osp.exists(osp.join(cache_dir, 'mean_cov.npz'))
+        mean_, cov_ = cache.get_mean_cov()
+        np.testing.assert_array_equal(mean, mean_)
+        np.testing.assert_array_equal(cov, cov_)
+
+        # cache with a different key is not complete
+        cache = ShardedFeatureCache(cache_dir, 'other_key')
+        assert not cache.is_complete
+
+
+def test_sharded_feature_cache_empty():
+    with TemporaryDirectory() as tmp_dir:
+        cache_dir = osp.join(tmp_dir, 'cache')
+        cache = ShardedFeatureCache(cache_dir, 'key', shard_size=10)
+        cache.merge(0)
+        assert cache.is_complete
+        assert sorted(
+            os.listdir(cache_dir)) == ['feature.npy', 'manifest.json']
+        assert cache.load().shape[0] == 0
+
+
+def test_sharded_feature_cache_ignore_other_key():
+    feat = np.random.rand(12, 4)
+    with TemporaryDirectory() as tmp_dir:
+        cache = ShardedFeatureCache(tmp_dir, 'key', shard_size=5)
+        cache.add(feat)
+        assert cache.num_finished == 10
+
+        cache = ShardedFeatureCache(tmp_dir, 'other_key', shard_size=5)
+        assert cache.num_finished == 0
+
+        # missing shard breaks the resume chain
+        os.remove(osp.join(tmp_dir, 'rank0-00001.npy'))
+        cache = ShardedFeatureCache(tmp_dir, 'key', shard_size=5)
+        assert cache.num_finished == 5
+
+
+def test_sharded_feature_cache_world_size():
+    feat = np.random.rand(12, 4)
+    with TemporaryDirectory() as tmp_dir:
+        cache = ShardedFeatureCache(tmp_dir, 'key', shard_size=5)
+        cache.add(feat)
+        assert cache.num_finished == 10
+
+        # shards of another world size can not be resumed
+        with patch(
+                'mmagic.evaluation.functional.feature_cache.get_dist_info',
+                return_value=(0, 2)):
+            cache = ShardedFeatureCache(tmp_dir, 'key', shard_size=5)
+        assert cache.num_finished == 0
+        assert not osp.exists(osp.join(tmp_dir, 'rank0-00000.npy'))
+
+
+def test_sharded_feature_cache_not_shared():
+    feat = np.random.rand(12, 4)
+    with TemporaryDirectory() as tmp_dir:
+        cache = ShardedFeatureCache(tmp_dir, 'key', shard_size=5)
+        cache.add(feat)
+
+        # shards of other ranks are not visible, gather them to rank 0
+        def all_gather_object(obj):
+            return [False if isinstance(obj, bool) else obj]
+
+        with patch(
+                'mmagic.evaluation.functional.feature_cache.'
+                'all_gather_object',
+                side_effect=all_gather_object):
+            cache.merge(12)
+        assert sorted(os.listdir(tmp_dir)) == ['feature.npy', 'manifest.json']
+        np.testing.assert_array_equal(cache.load(), feat)
+
+        cache.remove()
+        assert not osp.exists(tmp_dir)
+
+
+def test_feature_index():
+    feat = np.random.rand(10, 4).astype(np.float32)
+    keys = [f'key{i}' for i in range(10)]
+    with TemporaryDirectory() as tmp_dir:
+        index = FeatureIndex(tmp_dir, 'key')
+        assert len(index) == 0
+        index.add(keys[:6], feat[:6])
+        # existing keys are skipped
+        index.add(keys[4:], feat[4:])
+        assert len(index) == 10
+        assert sorted(os.listdir(tmp_dir)) == [
+            'chunk-00000.npy', 'chunk-00001.npy', 'index.json'
+        ]
+
+        index = FeatureIndex(tmp_dir, 'key')
+        assert 'key9' in index
+        query = keys[::-1] + keys[:3]
+        loaded = np.concatenate(list(index.iter_features(query, 4)))
+        np.testing.assert_array_equal(loaded,
+                                      feat[::-1].tolist() + feat[:3].tolist())
+
+        mean, cov = index.get_mean_cov(keys, 3)
+        np.testing.assert_allclose(mean, np.mean(feat, 0), rtol=1e-5)
+        np.testing.assert_allclose(cov, np.cov(feat, rowvar=False), rtol=1e-5)
+
+        index = FeatureIndex(tmp_dir, 'other_key')
+        assert len(index) == 0
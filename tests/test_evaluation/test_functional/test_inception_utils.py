@@ -1,11 +1,18 @@
 # Copyright (c) OpenMMLab. All rights reserved.
-from unittest.mock import MagicMock
+import os
+import os.path as osp
+from tempfile import TemporaryDirectory
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
 
-from torch.utils.data import Dataset
+import numpy as np
+import torch
+from torch.utils.data import DataLoader, Dataset
 
 from mmagic.datasets.transforms import LoadImageFromFile
 from mmagic.evaluation.functional.inception_utils import (
-    get_inception_feat_cache_name_and_args, get_vgg_feat_cache_name_and_args)
+    get_inception_feat_cache_name_and_args, get_vgg_feat_cache_name_and_args,
+    prepare_inception_feat)
 
 
 def test_inception_feat_cache_name_args():
@@ -64,3 +71,144 @@ def test_vgg_feat_cache_name_args():
     # check whether cache name are same with the same inputs
     assert cache_tag_1 == cache_tag_2
     assert args_1 == args_2
+
+
+class ToyFileDataset(Dataset):
+
+    def __init__(self, paths):
+        self.paths = paths
+        self.pipeline = 'toy_pipeline'
+
+    def __len__(self):
+        return len(self.paths)
+
+    def get_data_info(self, idx):
+        return dict(gt_path=self.paths[idx])
+
+    def __getitem__(self, idx):
+        with open(self.paths[idx], 'rb') as file:
+            content = np.frombuffer(file.read(), dtype=np.uint8)
+        return dict(img=torch.from_numpy(content.astype(np.float32)))
+
+
+def test_prepare_inception_feat_incremental():
+    data_preprocessor = MagicMock(side_effect=lambda data, training: dict(
+        data_samples=SimpleNamespace(gt_img=torch.stack(data['img']))))
+    metric = SimpleNamespace(
+        real_nums=-1,
+        real_key='gt_img',
+        inception_style='StyleGAN',
+        inception_pkl=None,
+        inception=MagicMock(),
+        forward_inception=MagicMock(side_effect=lambda img: img))
+
+    with TemporaryDirectory() as tmp_dir:
+        rng = np.random.RandomState(0)
+        paths = []
+        for idx in range(6):
+            paths.append(osp.join(tmp_dir, f'{idx}.bin'))
+            with open(paths[-1], 'wb') as file:
+                file.write(rng.randint(0, 256, 4).astype(np.uint8).tobytes())
+        feats = np.stack([
+            np.fromfile(path, dtype=np.uint8).astype(np.float32)
+            for path in paths
+        ])
+
+        with patch(
+                'mmagic.evaluation.functional.inception_utils.'
+                'MMAGIC_CACHE_DIR', osp.join(tmp_dir, 'cache')):
+            dataloader = DataLoader(ToyFileDataset(paths[:4]), batch_size=2)
+            state = prepare_inception_feat(
+                dataloader,
+                metric,
+                data_preprocessor,
+                capture_mean_cov=True,
+                capture_all=True,
+                incremental=True)
+            assert metric.forward_inception.call_count == 2
+            np.testing.assert_allclose(state['raw_feature'], feats[:4])
+
+            # only extract the features of the new files
+            metric.forward_inception.reset_mock()
+            dataloader = DataLoader(ToyFileDataset(paths), batch_size=2)
+            state = prepare_inception_feat(
+                dataloader,
+                metric,
+                data_preprocessor,
+                capture_mean_cov=True,
+                incremental=True)
+            assert metric.forward_inception.call_count == 1
+            np.testing.assert_allclose(
+                state['real_mean'], np.mean(feats, 0), rtol=1e-6)
+            np.testing.assert_allclose(
+                state['real_cov'], np.cov(feats, rowvar=False), rtol=1e-6)
+
+            # unchanged files are not read again to be hashed
+            metric.forward_inception.reset_mock()
+            with patch('mmengine.fileio.get') as get:
+                state = prepare_inception_feat(
+                    dataloader,
+                    metric,
+                    data_preprocessor,
+                    capture_mean_cov=True,
+                    incremental=True)
+            get.assert_not_called()
+            assert metric.forward_inception.call_count == 0
+
+            # changed files are hashed and extracted again
+            with open(paths[0], 'wb') as file:
+                file.write(bytes([1, 2, 3, 4]))
+            os.utime(paths[0], ns=(0, 10**9))
+            feats[0] = [1, 2, 3, 4]
+            state = prepare_inception_feat(
+                dataloader,
+                metric,
+                data_preprocessor,
+                capture_mean_cov=True,
+                capture_all=True,
+                incremental=True)
+            assert metric.forward_inception.call_count == 1
+            np.testing.assert_allclose(state['raw_feature'], feats)
+
+
+def test_prepare_inception_feat_save_pkl():
+    data_preprocessor = MagicMock(side_effect=lambda data, training: dict(
+        data_samples=SimpleNamespace(gt_img=torch.stack(data['img']))))
+    with TemporaryDirectory() as tmp_dir:
+        inception_pkl = osp.join(tmp_dir, 'inception.pkl')
+        metric = SimpleNamespace(
+            prefix='FID',
+            real_nums=-1,
+            real_key='gt_img',
+            inception_pkl=inception_pkl,
+            inception=MagicMock(),
+            forward_inception=MagicMock(side_effect=lambda img: img))
+        paths = []
+        for idx in range(3):
+            paths.append(osp.join(tmp_dir, f'{idx}.bin'))
+            with open(paths[-1], 'wb') as file:
+                file.write(bytes([idx, idx + 1, idx + 2, idx + 4]))
+        feats = np.stack([
+            np.fromfile(path, dtype=np.uint8).astype(np.float32)
+            for path in paths
+        ])
+
+        dataloader = DataLoader(ToyFileDataset(paths), batch_size=2)
+        state = prepare_inception_feat(
+            dataloader,
+            metric,
+            data_preprocessor,
+            capture_mean_cov=True,
+            capture_all=True)
+        np.testing.assert_allclose(state['raw_feature'], feats)
+
+        # the inception state is saved to the pkl file given by users
+        assert osp.exists(inception_pkl)
+        assert not osp.exists(osp.join(tmp_dir, 'inception'))
+        metric.forward_inception.reset_mock()
+        state = prepare_inception_feat(
+            dataloader, metric, data_preprocessor, capture_mean_cov=True)
+        assert metric.forward_inception.call_count == 0
+        np.testing.assert_allclose(
+            state['real_mean'], np.mean(feats, 0), rtol=1e-6)
+        np.testing.assert_allclose(state['raw_feature'], feats)
@@ -170,6 +170,121 @@ class TestFID(TestCase):
         self.assertTrue('mean' in metric)
         self.assertTrue('cov' in metric)
 
+    def test_online_stats(self):
+        with patch.object(FrechetInceptionDistance, '_load_inception',
+                          self.mock_inception_stylegan):
+            fid = FrechetInceptionDistance(
+                fake_nums=6,
+                real_nums=2,
+                fake_key='fake',
+                inception_pkl=self.inception_pkl)
+            fid_online = FrechetInceptionDistance(
+                fake_nums=6,
+                real_nums=2,
+                fake_key='fake',
+                inception_pkl=self.inception_pkl,
+                online_stats=True)
+        module = MagicMock()
+        module.data_preprocessor = MagicMock()
+        module.data_preprocessor.device = 'cpu'
+        dataloader = MagicMock()
+        fid.prepare(module, dataloader)
+        fid_online.prepare(module, dataloader)
+
+        feats = torch.randn(8, 2048)
+        fid.forward_inception = MagicMock(side_effect=[feats[:4], feats[4:]])
+        fid_online.forward_inception = MagicMock(
+            side_effect=[feats[:4], feats[4:]])
+        for _ in range(2):
+            gen_samples = [
+                DataSample(fake=torch.randn(3, 2, 2)).to_dict()
+                for _ in range(4)
+            ]
+            fid.process(None, gen_samples)
+            fid_online.process(None, gen_samples)
+
+        # only keep statistics of `fake_nums` features
+        self.assertEqual(len(fid_online.fake_results), 0)
+        self.assertEqual(fid_online.fake_feat_num, 6)
+
+        fid.fake_results = fid.fake_results[:6]
+        metric = fid.evaluate()
+        metric_online = fid_online.evaluate()
+        for key in ['fid', 'mean', 'cov']:
+            np.testing.assert_allclose(
+                metric_online[key], metric[key], rtol=1e-4)
+        self.assertIsNone(fid_online.fake_feat_sum)
+        self.assertEqual(fid_online.fake_feat_num, 0)
+
+    def test_online_stats_empty_rank(self):
+        with patch.object(FrechetInceptionDistance, '_load_inception',
+                          self.mock_inception_stylegan):
+            fid = FrechetInceptionDistance(
+                fake_nums=6,
+                real_nums=2,
+                fake_key='fake',
+                inception_pkl=self.inception_pkl,
+                online_stats=True)
+            fid_empty = FrechetInceptionDistance(
+                fake_nums=6,
+                real_nums=2,
+                fake_key='fake',
+                inception_pkl=self.inception_pkl,
+                online_stats=True)
+        module = MagicMock()
+        module.data_preprocessor = MagicMock()
+        module.data_preprocessor.device = 'cpu'
+        dataloader = MagicMock()
+        fid.prepare(module, dataloader)
+        fid_empty.prepare(module, dataloader)
+
+        fid.forward_inception = MagicMock(return_value=torch.randn(6, 2048))
+        gen_samples = [
+            DataSample(fake=torch.randn(3, 2, 2)).to_dict() for _ in range(6)
+        ]
+        fid.process(None, gen_samples)
+
+        # `fid_empty` is a rank without any fake feature, the statistics of
+        # `fid` are reduced from the other rank
+        others = iter([
+            torch.tensor(2048), fid.fake_feat_sum, fid.fake_feat_outer_sum,
+            torch.tensor(6.)
+        ])
+
+        def all_reduce(data, op='sum'):
+            other = next(others).to(data.dtype)
+            if op == 'max':
+                data.copy_(torch.maximum(data, other))
+            else:
+                data.add_(other)
+
+        with patch('mmagic.evaluation.metrics.fid.all_reduce', all_reduce):
+            metric_empty = fid_empty.evaluate()
+        metric = fid.evaluate()
+        for key in ['fid', 'mean', 'cov']:
+            np.testing.assert_allclose(metric_empty[key], metric[key])
+
+        # no rank has fake features
+        with pytest.raises(AssertionError):
+            fid_empty.evaluate()
+
+    def test_sqrtm_backend(self):
+        feat1 = np.random.randn(300, 64)
+        feat2 = np.random.randn(300, 64) * 2 + 1
+        mean1, cov1 = np.mean(feat1, 0), np.cov(feat1, rowvar=False)
+        mean2, cov2 = np.mean(feat2, 0), np.cov(feat2, rowvar=False)
+
+        res_scipy = FrechetInceptionDistance._calc_fid(mean1, cov1, mean2,
+                                                       cov2)
+        res_eigh = FrechetInceptionDistance._calc_fid(
+            mean1, cov1, mean2, cov2, sqrtm_backend='eigh')
+        np.testing.assert_allclose(res_eigh, res_scipy, rtol=1e-6)
+
+        with pytest.raises(AssertionError):
+            with patch.object(FrechetInceptionDistance, '_load_inception',
+                              self.mock_inception_stylegan):
+                FrechetInceptionDistance(fake_nums=2, sqrtm_backend='svd')
+
 
 class TestTransFID:
     inception_pkl = osp.join(
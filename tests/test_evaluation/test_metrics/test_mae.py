@@ -43,6 +43,12 @@ class TestPixelMetrics:
         assert 'MAE' in result
         np.testing.assert_almost_equal(result['MAE'], 0.003921568627)
 
+        # Vectorized MAE
+        mae = MAE(vectorized=True)
+        mae.process(self.data_batch, self.predictions)
+        result = mae.compute_metrics(mae.results)
+        np.testing.assert_almost_equal(result['MAE'], 0.003921568627)
+
         # Masked MAE
         mae = MAE(mask_key='mask', prefix='MAE')
         mae.process(self.data_batch, self.predictions)
@@ -43,6 +43,12 @@ class TestPixelMetrics:
         assert 'MSE' in result
         np.testing.assert_almost_equal(result['MSE'], 0.000015378700496)
 
+        # Vectorized MSE
+        mae = MSE(vectorized=True)
+        mae.process(self.data_batch, self.predictions)
+        result = mae.compute_metrics(mae.results)
+        np.testing.assert_almost_equal(result['MSE'], 0.000015378700496)
+
         # Masked MSE
         mae = MSE(mask_key='mask', prefix='MSE')
         mae.process(self.data_batch, self.predictions)
@@ -44,6 +44,18 @@ def test_niqe():
     assert 'NIQE' in result
     np.testing.assert_almost_equal(result['NIQE'], 5.731541051885604)
 
+    niqe_ = NIQE(vectorized=True)
+    niqe_.process(data_batch, data_samples)
+    result = niqe_.compute_metrics(niqe_.results)
+    np.testing.assert_almost_equal(
+        result['NIQE'], 5.731541051885604, decimal=5)
+
+    niqe_ = NIQE(vectorized=True, nproc=2)
+    niqe_.process(data_batch, data_samples)
+    result = niqe_.compute_metrics(niqe_.results)
+    np.testing.assert_almost_equal(
+        result['NIQE'], 5.731541051885604, decimal=5)
+
     with pytest.raises(AssertionError):
         niqe_ = NIQE(convert_to='a')
 
@@ -80,3 +92,25 @@ def test_calculate_niqe():
         input_order='CHW',
         convert_to='y')
     np.testing.assert_almost_equal(result, 6.10074, decimal=5)
+
+
+def test_calculate_niqe_vectorized():
+    img = mmcv.imread('tests/data/image/gt/baboon.png')
+
+    for crop_border in (0, 6):
+        for convert_to in ('y', 'gray'):
+            result = niqe(
+                img,
+                crop_border=crop_border,
+                input_order='HWC',
+                convert_to=convert_to)
+            result_vec = niqe(
+                img,
+                crop_border=crop_border,
+                input_order='HWC',
+                convert_to=convert_to,
+                vectorized=True)
+            np.testing.assert_almost_equal(result_vec, result, decimal=5)
+
+    result = niqe(img, crop_border=0, input_order='HWC', vectorized=True)
+    np.testing.assert_almost_equal(result, 5.72957, decimal=5)
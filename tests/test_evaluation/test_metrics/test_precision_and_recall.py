@@ -9,6 +9,8 @@ from mmengine.runner import Runner
 from mmagic.datasets import BasicImageDataset
 from mmagic.datasets.transforms import PackInputs
 from mmagic.evaluation import PrecisionAndRecall
+from mmagic.evaluation.metrics.precision_and_recall import (
+    compute_pr_distances, compute_pr_kth_radii, compute_pr_membership)
 from mmagic.models import LSGAN, DataPreprocessor
 from mmagic.models.editors.dcgan import DCGANGenerator
 from mmagic.utils import register_all_modules
@@ -97,3 +99,46 @@ class TestPR:
         pr_score = pr.evaluate()
         print(pr_score)
         assert pr_score['precision'] >= 0 and pr_score['recall'] >= 0
+
+    def test_pr_streaming(self):
+        with patch.object(PrecisionAndRecall, '_load_vgg',
+                          self.mock_vgg_pytorch):
+            pr = PrecisionAndRecall(
+                10,
+                sample_model='orig',
+                auto_save=False,
+                knn_backend='streaming')
+        sampler = pr.get_metric_sampler(self.module, self.dataloader, [pr])
+        pr.prepare(self.module, self.dataloader)
+        for data_batch in sampler:
+            data_samples = self.module.test_step(data_batch)
+            data_samples = [pred.to_dict() for pred in data_samples]
+            pr.process(data_batch, data_samples)
+        pr_score = pr.evaluate()
+        assert pr_score['precision'] >= 0 and pr_score['recall'] >= 0
+
+        with pytest.raises(AssertionError):
+            with patch.object(PrecisionAndRecall, '_load_vgg',
+                              self.mock_vgg_pytorch):
+                PrecisionAndRecall(10, knn_backend='faiss')
+
+
+def test_streaming_knn():
+    torch.manual_seed(0)
+    manifold = torch.randn(50, 8)
+    probes = torch.randn(40, 8)
+
+    distance = compute_pr_distances(manifold, manifold)
+    kth_ref = distance.kthvalue(4).values
+    kth = compute_pr_kth_radii(
+        manifold, k=3, row_batch_size=16, col_batch_size=7)
+    assert torch.allclose(kth, kth_ref, atol=1e-5)
+
+    distance = compute_pr_distances(probes, manifold)
+    pred_ref = (distance <= kth_ref).any(dim=1)
+    pred = compute_pr_membership(
+        probes, manifold, kth_ref, row_batch_size=16, col_batch_size=7)
+    assert (pred == pred_ref).all()
+
+    with pytest.raises(AssertionError):
+        compute_pr_kth_radii(manifold[:3], k=3)
@@ -43,6 +43,44 @@ class TestPixelMetrics:
         assert 'PSNR' in result
         np.testing.assert_almost_equal(result['PSNR'], 48.1308036)
 
+    def test_psnr_vectorized(self):
+
+        psnr_ = PSNR(vectorized=True)
+        psnr_.process(self.data_batch, self.predictions)
+        result = psnr_.compute_metrics(psnr_.results)
+        assert 'PSNR' in result
+        np.testing.assert_almost_equal(result['PSNR'], 48.1308036)
+
+
+def test_psnr_vectorized_video():
+    rng = np.random.RandomState(0)
+    data_samples = []
+    for _ in range(2):
+        gt = rng.randint(0, 256, (3, 3, 24, 24)).astype(np.float32)
+        pred = rng.randint(0, 256, (3, 3, 24, 24)).astype(np.float32)
+        data_samples.append(
+            dict(gt_img=torch.from_numpy(gt), output=dict(pred_img=pred)))
+
+    for convert_to in [None, 'Y']:
+        psnr_ = PSNR(crop_border=2, convert_to=convert_to)
+        psnr_.process(None, data_samples)
+        psnr_vec = PSNR(crop_border=2, convert_to=convert_to, vectorized=True)
+        psnr_vec.process(None, data_samples)
+        np.testing.assert_allclose(
+            psnr_vec.compute_metrics(psnr_vec.results)['PSNR'],
+            psnr_.compute_metrics(psnr_.results)['PSNR'],
+            rtol=1e-5)
+
+    # fall back to the sample wise path if shapes are different
+    data_samples.append(
+        dict(
+            gt_img=torch.ones(3, 16, 16),
+            output=dict(pred_img=torch.ones(3, 16, 16))))
+    psnr_vec = PSNR(vectorized=True)
+    psnr_vec.process(None, data_samples)
+    assert len(psnr_vec.results) == 3
+    assert psnr_vec.results[-1]['PSNR'] == float('inf')
+
 
 def test_psnr():
     img_hw_1 = np.ones((32, 32))
@@ -41,6 +41,33 @@ def test_ssim():
     assert 'SSIM' in result
     np.testing.assert_almost_equal(result['SSIM'], 0.913062377743969)
 
+    ssim_ = SSIM(vectorized=True)
+    ssim_.process(data_batch, data_samples)
+    result = ssim_.compute_metrics(ssim_.results)
+    np.testing.assert_almost_equal(result['SSIM'], 0.913062377743969)
+
+
+def test_ssim_vectorized_video():
+    rng = np.random.RandomState(0)
+    data_samples = []
+    for _ in range(2):
+        gt = rng.randint(0, 256, (3, 3, 32, 32)).astype(np.float32)
+        pred = np.clip(gt + rng.randn(3, 3, 32, 32) * 10, 0, 255)
+        data_samples.append(
+            dict(
+                gt_img=torch.from_numpy(gt),
+                output=dict(pred_img=torch.from_numpy(pred).float())))
+
+    for convert_to in [None, 'Y']:
+        ssim_ = SSIM(crop_border=4, convert_to=convert_to)
+        ssim_.process(None, data_samples)
+        ssim_vec = SSIM(crop_border=4, convert_to=convert_to, vectorized=True)
+        ssim_vec.process(None, data_samples)
+        np.testing.assert_allclose(
+            ssim_vec.compute_metrics(ssim_vec.results)['SSIM'],
+            ssim_.compute_metrics(ssim_.results)['SSIM'],
+            rtol=1e-4)
+
 
 def test_calculate_ssim():
     img_hw_1 = np.ones((32, 32))
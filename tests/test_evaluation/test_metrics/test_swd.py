@@ -6,6 +6,9 @@ import numpy as np
 import torch
 
 from mmagic.evaluation import SlicedWassersteinDistance
+from mmagic.evaluation.metrics.swd import (finalize_descriptors,
+                                           sliced_wasserstein_projected,
+                                           update_reservoir)
 from mmagic.models import DataPreprocessor
 from mmagic.structures import DataSample
 
@@ -85,3 +88,79 @@ class TestSWD(TestCase):
             swd.process(None, fake_samples)
         # fake_nums is -1, all samples (10 * 3 = 30) is processed
         self.assertEqual(swd._num_processed, 30)
+
+    def test_streaming(self):
+        model = MagicMock()
+        model.data_preprocessor = DataPreprocessor()
+        swd = SlicedWassersteinDistance(
+            fake_nums=100, image_shape=(3, 32, 32), streaming=True)
+        swd.prepare(model, None)
+
+        torch.random.manual_seed(42)
+        fake_samples = [
+            DataSample(
+                fake_img=(torch.rand(3, 32, 32) * 255),
+                gt_img=(torch.rand(3, 32, 32) * 255)).to_dict()
+            for _ in range(100)
+        ]
+        for idx in range(0, 100, 25):
+            swd.process(None, fake_samples[idx:idx + 25])
+        self.assertEqual(swd._num_processed, 100)
+        self.assertEqual(swd.real_results[0]['num_seen'], 100 * 128)
+
+        # reservoirs keep all descriptors, the result is exact
+        desc_real = [
+            res['reservoir'][:res['num_seen']].clone()
+            for res in swd.real_results
+        ]
+        desc_fake = [
+            res['reservoir'][:res['num_seen']].clone()
+            for res in swd.fake_results
+        ]
+        target = [
+            sliced_wasserstein_projected(
+                finalize_descriptors(d_real), finalize_descriptors(d_fake),
+                dirs) * 1e3
+            for d_real, d_fake, dirs in zip(desc_real, desc_fake, swd.dirs)
+        ]
+        output = swd.evaluate()
+        np.testing.assert_almost_equal(
+            list(output.values())[:2], target, decimal=3)
+        result = [16.495922580361366, 24.15413036942482, 20.325026474893093]
+        output = [item / 100 for item in output.values()]
+        result = [item / 100 for item in result]
+        np.testing.assert_almost_equal(output, result, decimal=1)
+
+        # results are reset after evaluation
+        swd.process(None, fake_samples[:10])
+        self.assertEqual(swd.real_results[0]['num_seen'], 10 * 128)
+
+        # bounded reservoir
+        swd = SlicedWassersteinDistance(
+            fake_nums=100,
+            image_shape=(3, 32, 32),
+            streaming=True,
+            reservoir_size=1000)
+        swd.process(None, fake_samples)
+        self.assertEqual(swd.fake_results[1]['reservoir'].shape[0], 1000)
+        output = swd.evaluate()
+        self.assertEqual(len(output), 3)
+
+
+def test_update_reservoir():
+    torch.manual_seed(0)
+    reservoir, num_seen = update_reservoir(None, 0, torch.arange(5), 10)
+    assert num_seen == 5
+    assert (reservoir[:5] == torch.arange(5)).all()
+
+    counts = torch.zeros(1000)
+    for _ in range(200):
+        reservoir, num_seen = None, 0
+        for samples in torch.arange(1000).split(64):
+            reservoir, num_seen = update_reservoir(reservoir, num_seen,
+                                                   samples, 100)
+        assert num_seen == 1000
+        assert reservoir.unique().numel() == 100
+        counts[reservoir] += 1
+    # each sample is kept with probability 0.1
+    assert abs(counts[:500].mean() - counts[500:].mean()) < 3
@@ -0,0 +1,106 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import os
+import os.path as osp
+from unittest.mock import MagicMock
+
+import torch
+
+from mmagic.evaluation import GenerativeSamplePool
+from mmagic.structures import DataSample
+
+
+class ToyGenerator:
+
+    def __init__(self):
+        self.num_generated = 0
+
+    def __call__(self, data_batch):
+        num_batches = data_batch['inputs']['num_batches']
+        outputs = []
+        for _ in range(num_batches):
+            self.num_generated += 1
+            fake_img = torch.full((3, 4, 4), self.num_generated + 0.3)
+            outputs.append(
+                DataSample(fake_img=fake_img, idx=self.num_generated))
+        return outputs
+
+
+def get_batch(num_batches):
+    return dict(
+        inputs=dict(
+            sample_model='orig', num_batches=num_batches, sample_kwargs={}))
+
+
+def get_metric(**kwargs):
+    metric = MagicMock(
+        SAMPLER_MODE='Generative',
+        sample_model='orig',
+        sample_kwargs=dict(),
+        need_cond_input=False)
+    for k, v in kwargs.items():
+        setattr(metric, k, v)
+    return metric
+
+
+def test_get_pool_key():
+    key = GenerativeSamplePool.get_pool_key([get_metric()])
+    assert key == GenerativeSamplePool.get_pool_key([get_metric()])
+    assert key != GenerativeSamplePool.get_pool_key(
+        [get_metric(sample_model='ema')])
+    assert key != GenerativeSamplePool.get_pool_key(
+        [get_metric(sample_kwargs=dict(truncation=0.7))])
+    assert GenerativeSamplePool.get_pool_key([get_metric(SAMPLER_MODE='path')
+                                              ]) is None
+    assert GenerativeSamplePool.get_pool_key(
+        [get_metric(need_cond_input=True)]) is None
+    assert GenerativeSamplePool.get_pool_key([None]) is None
+
+
+def test_sample_pool():
+    pool = GenerativeSamplePool()
+    generator = ToyGenerator()
+
+    key = pool.begin([get_metric()])
+    outputs = pool.sample(key, get_batch(4), generator)
+    outputs += pool.sample(key, get_batch(4), generator)
+    assert generator.num_generated == 8
+    assert [o['idx'] for o in outputs] == list(range(1, 9))
+
+    # take the prefix with another batch size, only generate missing samples
+    key = pool.begin([get_metric()])
+    outputs = []
+    for _ in range(4):
+        outputs += pool.sample(key, get_batch(3), generator)
+    assert generator.num_generated == 12
+    assert [o['idx'] for o in outputs] == list(range(1, 13))
+    # images are kept in memory as uint8
+    assert torch.equal(outputs[0]['fake_img'], torch.full((3, 4, 4), 1.))
+    assert outputs[0]['fake_img'].dtype == torch.float32
+    assert pool._samples[key][0]['fake_img'].data.dtype == torch.uint8
+    assert len(pool) == 12
+
+    pool.clear()
+    assert len(pool) == 0
+
+
+def test_sample_pool_spill(tmp_path):
+    spill_dir = str(tmp_path / 'pool')
+    pool = GenerativeSamplePool(spill_dir=spill_dir, chunk_size=3)
+    generator = ToyGenerator()
+
+    key = pool.begin([get_metric()])
+    outputs = pool.sample(key, get_batch(4), generator)
+    assert len(os.listdir(spill_dir)) == 2
+    key = pool.begin([get_metric()])
+    outputs_ = pool.sample(key, get_batch(4), generator)
+    assert generator.num_generated == 4
+    for idx, (output, output_) in enumerate(zip(outputs, outputs_)):
+        # images are spilled as uint8
+        assert torch.equal(output_['fake_img'],
+                           torch.full((3, 4, 4), float(idx + 1)))
+        assert output_['fake_img'].dtype == torch.float32
+        assert torch.equal(output['fake_img'], output_['fake_img'])
+        assert output_['idx'] == idx + 1
+
+    pool.clear()
+    assert osp.exists(spill_dir) and len(os.listdir(spill_dir)) == 0
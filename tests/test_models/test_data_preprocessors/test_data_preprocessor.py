@@ -26,6 +26,10 @@ class TestBaseDataPreprocessor(TestCase):
         assert_allclose(data_preprocessor.pad_value, torch.tensor(10))
         self.assertEqual(data_preprocessor.pad_size_divisor, 16)
         self.assertEqual(data_preprocessor.pad_mode, 'constant')
+        self.assertFalse(data_preprocessor._non_blocking)
+
+        data_preprocessor = DataPreprocessor(non_blocking=True)
+        self.assertTrue(data_preprocessor._non_blocking)
 
         # test non-image-keys
         data_preprocessor = DataPreprocessor(non_image_keys='feature')
@@ -165,6 +169,15 @@ class TestBaseDataPreprocessor(TestCase):
         self.assertTrue((outputs == target_outputs).all())
         self.assertEqual(order, 'RGB')
 
+        # cast uint8 inputs in the conversion
+        inputs_uint8 = torch.randint(0, 256, (2, 3, 5, 5), dtype=torch.uint8)
+        outputs, order = cov_fn(inputs_uint8, 'BGR', 'RGB', torch.float32)
+        self.assertEqual(outputs.dtype, torch.float32)
+        self.assertTrue((outputs == inputs_uint8[:, [2, 1, 0]].float()).all())
+        self.assertEqual(order, 'RGB')
+        outputs, order = cov_fn(inputs_uint8, 'BGR', None, torch.float32)
+        self.assertIs(outputs, inputs_uint8)
+
         # RGB -> None
         target_outputs = inputs.clone()
         outputs, order = cov_fn(inputs, 'RGB', None)
@@ -730,6 +743,21 @@ class TestBaseDataPreprocessor(TestCase):
         data = data_preprocessor(data)
         assert_allclose(data['inputs'], tar_output)
 
+        # 1.1 input is uint8 tensor
+        data = dict(inputs=inputs.to(torch.uint8))
+        data = data_preprocessor(data)
+        self.assertEqual(data['inputs'].dtype, torch.float32)
+        assert_allclose(data['inputs'], tar_output.float())
+
+        # 1.2 input is uint8 tensor with channel order conversion
+        data_preprocessor_rgb = DataPreprocessor(
+            mean=[0, 10, 20], std=[1, 2, 4], output_channel_order='RGB')
+        data = data_preprocessor_rgb(dict(inputs=inputs.to(torch.uint8)))
+        mean = torch.tensor([0., 10., 20.]).view(1, 3, 1, 1)
+        std = torch.tensor([1., 2., 4.]).view(1, 3, 1, 1)
+        assert_allclose(data['inputs'],
+                        (inputs[:, [2, 1, 0]].float() - mean) / std)
+
         # 2. input is list of tensor
         input1 = torch.randn(3, 3, 5)
         input2 = torch.randn(3, 3, 5)
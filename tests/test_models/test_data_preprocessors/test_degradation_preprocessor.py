@@ -0,0 +1,181 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+from unittest.mock import patch
+
+import cv2
+import numpy as np
+import pytest
+import torch
+
+from mmagic.datasets.transforms import RandomBlur
+from mmagic.models.data_preprocessors import DegradationDataPreprocessor
+from mmagic.models.data_preprocessors.degradation_preprocessor import (
+    BatchRandomBlur, BatchRandomNoise, BatchRandomResize)
+from mmagic.structures import DataSample
+
+blur_params = dict(
+    kernel_size=[7, 9, 11, 13, 15, 17, 19, 21],
+    kernel_list=[
+        'iso', 'aniso', 'generalized_iso', 'generalized_aniso', 'plateau_iso',
+        'plateau_aniso', 'sinc'
+    ],
+    kernel_prob=[0.405, 0.225, 0.108, 0.027, 0.108, 0.027, 0.1],
+    sigma_x=[0.2, 3],
+    sigma_y=[0.2, 3],
+    rotate_angle=[-3.1416, 3.1416],
+    beta_gaussian=[0.5, 4],
+    beta_plateau=[1, 2])
+resize_params = dict(
+    resize_mode_prob=[0.2, 0.7, 0.1],
+    resize_scale=[0.15, 1.5],
+    resize_opt=['bilinear', 'area', 'bicubic'],
+    resize_prob=[1 / 3.0, 1 / 3.0, 1 / 3.0])
+noise_params = dict(
+    noise_type=['gaussian', 'poisson'],
+    noise_prob=[0.5, 0.5],
+    gaussian_sigma=[1, 30],
+    gaussian_gray_noise_prob=0.4,
+    poisson_scale=[0.05, 3],
+    poisson_gray_noise_prob=0.4)
+
+
+def test_batch_random_blur():
+    imgs = np.random.rand(3, 32, 32, 3).astype(np.float32) * 255
+    frames = [torch.from_numpy(imgs).permute(0, 3, 1, 2)]
+
+    # kernels of different sizes are padded and applied per sample
+    kernels = [
+        np.ones((3, 3), np.float32) / 9,
+        np.random.rand(7, 7).astype(np.float32),
+        np.random.rand(5, 5).astype(np.float32)
+    ]
+    blur = BatchRandomBlur(blur_params)
+    with patch.object(
+            RandomBlur, 'get_kernel', side_effect=[[k] for k in kernels]):
+        outputs = blur(frames)
+    for img, kernel, output in zip(imgs, kernels, outputs[0]):
+        target = cv2.filter2D(img, -1, kernel)
+        np.testing.assert_allclose(
+            output.permute(1, 2, 0).numpy(), target, rtol=1e-4, atol=1e-3)
+
+    # random kernels for videos
+    frames = [torch.rand(2, 3, 32, 32) * 255 for _ in range(3)]
+    outputs = BatchRandomBlur(blur_params)(frames)
+    assert [output.shape for output in outputs] == [(2, 3, 32, 32)] * 3
+
+    # prob
+    outputs = BatchRandomBlur(dict(blur_params, prob=0))(frames)
+    assert outputs is frames
+
+
+def test_batch_random_resize():
+    frames = [torch.rand(2, 3, 32, 40) * 255 for _ in range(3)]
+    outputs = BatchRandomResize(
+        dict(
+            target_size=(16, 20),
+            resize_opt=['bilinear', 'area', 'bicubic'],
+            resize_prob=[1 / 3.0, 1 / 3.0, 1 / 3.0]))(
+                frames)
+    assert [output.shape for output in outputs] == [(2, 3, 16, 20)] * 3
+
+    # different sizes of frames with resize_step
+    outputs = BatchRandomResize(dict(resize_params, resize_step=0.2))(frames)
+    assert all([output.shape[:2] == (2, 3) for output in outputs])
+
+    with pytest.raises(AssertionError):
+        BatchRandomResize(dict(resize_params, resize_opt=['lanczos']))
+
+
+def test_batch_random_noise():
+    frames = [torch.full((4, 3, 16, 16), 128.) for _ in range(2)]
+    for noise_type in ['gaussian', 'poisson']:
+        for gray_prob in [0, 1]:
+            params = dict(
+                noise_params,
+                noise_type=[noise_type],
+                noise_prob=[1],
+                gaussian_gray_noise_prob=gray_prob,
+                poisson_gray_noise_prob=gray_prob)
+            outputs = BatchRandomNoise(params)(frames)
+            for output in outputs:
+                assert output.shape == (4, 3, 16, 16)
+                assert not torch.equal(output, frames[0])
+                # gray noise is the same for all channels
+                is_gray = torch.equal(output[:, 0], output[:, 1])
+                assert is_gray == bool(gray_prob)
+
+    outputs = BatchRandomNoise(dict(noise_params, prob=0))(frames)
+    assert all([torch.equal(o, f) for o, f in zip(outputs, frames)])
+
+
+def test_degradation_data_preprocessor():
+    degradations = [
+        dict(type='RandomBlur', params=blur_params, keys=['img']),
+        dict(type='RandomResize', params=resize_params, keys=['img']),
+        dict(type='RandomNoise', params=noise_params, keys=['img']),
+        dict(
+            type='RandomJPEGCompression',
+            params=dict(quality=[30, 95]),
+            keys=['img']),
+        dict(
+            type='DegradationsWithShuffle',
+            degradations=[
+                dict(
+                    type='RandomJPEGCompression',
+                    params=dict(quality=[5, 50]),
+                ),
+                [
+                    dict(
+                        type='RandomResize',
+                        params=dict(
+                            target_size=(16, 16),
+                            resize_opt=['bilinear', 'area', 'bicubic'],
+                            resize_prob=[1 / 3., 1 / 3., 1 / 3.]),
+                    ),
+                    dict(
+                        type='RandomBlur',
+                        params=dict(
+                            prob=0.8,
+                            kernel_size=[7, 9, 11],
+                            kernel_list=['sinc'],
+                            kernel_prob=[1],
+                            omega=[3.1416 / 3, 3.1416]),
+                    ),
+                ]
+            ],
+            keys=['img'],
+        ),
+    ]
+    processor = DegradationDataPreprocessor(
+        degradations=degradations,
+        gt_patch_size=32,
+        gt_keys=['gt_img', 'gt_unsharp'],
+        mean=[0., 0., 0.],
+        std=[255., 255., 255.])
+
+    gt = torch.randint(0, 256, (2, 3, 64, 64), dtype=torch.uint8)
+    data = dict(
+        inputs=list(gt.clone()),
+        data_samples=[
+            DataSample(gt_img=img, gt_unsharp=img.clone()) for img in gt
+        ])
+    data = processor(data, training=True)
+    inputs, data_samples = data['inputs'], data['data_samples']
+    assert inputs.shape == (2, 3, 8, 8)
+    assert inputs.min() >= 0 and inputs.max() <= 1
+    assert data_samples.gt_img.shape == (2, 3, 32, 32)
+    assert data_samples.gt_unsharp.shape == (2, 3, 32, 32)
+
+    # videos
+    gt = torch.randint(0, 256, (2, 3, 3, 64, 64), dtype=torch.uint8)
+    data = dict(
+        inputs=gt.clone(), data_samples=[DataSample(gt_img=img) for img in gt])
+    data = processor(data, training=True)
+    assert data['inputs'].shape == (2, 3, 3, 8, 8)
+    assert data['data_samples'].gt_img.shape == (2, 3, 3, 32, 32)
+
+    # no degradation in test
+    data = dict(
+        inputs=list(gt.clone()),
+        data_samples=[DataSample(gt_img=img) for img in gt])
+    data = processor(data, training=False)
+    assert data['inputs'].shape == (2, 3, 3, 64, 64)
@@ -0,0 +1,65 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import csv
+import importlib.util
+import json
+import os.path as osp
+import sys
+from unittest.mock import patch
+
+import mmcv
+import numpy as np
+
+TOOL_PATH = osp.join(
+    osp.dirname(__file__), '..', '..', 'tools', 'analysis_tools',
+    'offline_eval.py')
+
+
+def load_tool():
+    spec = importlib.util.spec_from_file_location('offline_eval', TOOL_PATH)
+    module = importlib.util.module_from_spec(spec)
+    # workers find the functions by the module name
+    sys.modules['offline_eval'] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_offline_eval(tmp_path):
+    offline_eval = load_tool()
+    img = mmcv.imread(
+        osp.join(
+            osp.dirname(__file__), '..', 'data', 'image', 'gt', 'baboon.png'))
+    noise = np.random.RandomState(0).randint(-5, 6, img.shape)
+    pred = np.clip(img.astype(np.int64) + noise, 0, 255).astype(np.uint8)
+    mmcv.imwrite(img, str(tmp_path / 'gt' / 'baboon.png'))
+    mmcv.imwrite(pred, str(tmp_path / 'pred' / 'baboon.png'))
+
+    out_dir = tmp_path / 'out'
+    argv = [
+        'offline_eval.py',
+        str(tmp_path / 'pred'),
+        str(tmp_path / 'gt'), '--metrics', 'PSNR', 'NIQE', '--out-dir',
+        str(out_dir), '--nproc', '1'
+    ]
+    with patch.object(sys, 'argv', argv):
+        args = offline_eval.parse_args()
+        # samples are packed to 'CHW'
+        assert offline_eval.get_metric_cfgs(args) == [
+            dict(type='PSNR', input_order='CHW'),
+            dict(type='NIQE', input_order='CHW')
+        ]
+        offline_eval.main()
+
+    with open(out_dir / 'per_image.csv') as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == ['name', 'PSNR', 'NIQE']
+    assert rows[1][0] == 'baboon'
+    with open(out_dir / 'results.json') as f:
+        results = json.load(f)
+    assert results['PSNR'] == float(rows[1][1])
+    assert 20 < results['PSNR'] < 50
+    # the same as evaluating the 'HWC' image directly
+    from mmagic.evaluation.metrics.niqe import niqe
+    np.testing.assert_allclose(
+        results['NIQE'],
+        niqe(pred, crop_border=0, convert_to='gray'),
+        rtol=1e-5)
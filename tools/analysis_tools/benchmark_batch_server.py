@@ -0,0 +1,106 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import argparse
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from mmagic.apis import BatchInferenceServer
+from mmagic.apis.inferencers import Inferencers
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description='Benchmark latency and throughput of BatchInferenceServer '
+        'under concurrent requests')
+    parser.add_argument('config', help='Config file of the model')
+    parser.add_argument('img', help='Image used by all requests')
+    parser.add_argument('--ckpt', help='Checkpoint file of the model')
+    parser.add_argument(
+        '--task',
+        default='Image Super-Resolution',
+        help='Task of the inferencer')
+    parser.add_argument(
+        '--num-requests', type=int, default=64, help='Number of requests')
+    parser.add_argument(
+        '--concurrency',
+        type=int,
+        default=8,
+        help='Number of clients sending requests concurrently')
+    parser.add_argument(
+        '--max-batch-size', type=int, default=8, help='Maximum batch size')
+    parser.add_argument(
+        '--max-wait-time',
+        type=float,
+        default=0.01,
+        help='Maximum seconds a request waits to be batched')
+    parser.add_argument(
+        '--num-workers',
+        type=int,
+        default=4,
+        help='Number of threads to preprocess and postprocess requests')
+    parser.add_argument('--device', help='Device to run inference, e.g. "cpu"')
+    args = parser.parse_args()
+    return args
+
+
+async def run_clients(infer, args):
+    """Send requests from concurrent clients and record their latencies."""
+    latencies = []
+    counter = iter(range(args.num_requests))
+
+    async def client():
+        for _ in counter:
+            start = time.perf_counter()
+            await infer(img=args.img)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[client() for _ in range(args.concurrency)])
+    return latencies, time.perf_counter() - start
+
+
+def report(name, latencies, elapsed):
+    latencies = np.array(latencies) * 1000
+    print(f'{name:>10}: {len(latencies) / elapsed:.2f} req/s, '
+          f'p50 {np.percentile(latencies, 50):.1f}ms, '
+          f'p99 {np.percentile(latencies, 99):.1f}ms')
+
+
+def main():
+    """
+    Example:
+
+    `python tools/analysis_tools/benchmark_batch_server.py configs/esrgan/esrgan_x4c64b23g32_1xb16-400k_div2k.py tests/data/image/lq/baboon_x4.png --num-requests 64 --concurrency 8` # noqa
+    """
+    args = parse_args()
+    inferencer = Inferencers(args.task, args.config, args.ckpt, args.device)
+    # warm up
+    inferencer(img=args.img)
+
+    async def serial():
+        # requests are served one by one
+        loop = asyncio.get_running_loop()
+        with ThreadPoolExecutor(1) as pool:
+
+            async def infer(**kwargs):
+                return await loop.run_in_executor(pool,
+                                                  lambda: inferencer(**kwargs))
+
+            return await run_clients(infer, args)
+
+    async def batched():
+        async with BatchInferenceServer(
+                inferencer,
+                max_batch_size=args.max_batch_size,
+                max_wait_time=args.max_wait_time,
+                num_workers=args.num_workers) as server:
+            return await run_clients(server.infer, args)
+
+    report('serial', *asyncio.run(serial()))
+    report('batched', *asyncio.run(batched()))
+
+
+if __name__ == '__main__':
+    main()
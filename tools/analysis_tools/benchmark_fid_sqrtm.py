@@ -0,0 +1,63 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import argparse
+import time
+
+import numpy as np
+import torch
+
+from mmagic.evaluation import FrechetInceptionDistance
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description='Benchmark the matrix square root backends of FID')
+    parser.add_argument(
+        '--dim', type=int, default=2048, help='Dimension of the features')
+    parser.add_argument(
+        '--num-samples',
+        type=int,
+        default=10000,
+        help='Number of random features to build the covariances')
+    parser.add_argument(
+        '--repeat', type=int, default=3, help='Number of repeated runs')
+    parser.add_argument(
+        '--device',
+        default='cuda' if torch.cuda.is_available() else 'cpu',
+        help='Device for the \'eigh\' backend')
+    args = parser.parse_args()
+    return args
+
+
+def main():
+    """
+    Example:
+
+    `python tools/analysis_tools/benchmark_fid_sqrtm.py --dim 2048 --device cuda` # noqa
+    """
+    args = parse_args()
+
+    rng = np.random.RandomState(0)
+    stats = []
+    for scale in [1, 1.5]:
+        feat = rng.randn(args.num_samples, args.dim) * scale
+        stats += [np.mean(feat, 0), np.cov(feat, rowvar=False)]
+
+    results = dict()
+    for backend in ['scipy', 'eigh']:
+        times = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            results[backend] = FrechetInceptionDistance._calc_fid(
+                *stats, sqrtm_backend=backend, device=args.device)
+            if args.device.startswith('cuda'):
+                torch.cuda.synchronize()
+            times.append(time.perf_counter() - start)
+        print(f'{backend:>6}: fid={results[backend][0]:.6f}, '
+              f'time={np.mean(times):.3f}s (min {np.min(times):.3f}s)')
+
+    diff = abs(results['scipy'][0] - results['eigh'][0])
+    print(f'Absolute difference of FID: {diff:.3e}')
+
+
+if __name__ == '__main__':
+    main()
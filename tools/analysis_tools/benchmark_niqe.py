@@ -0,0 +1,83 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import argparse
+import time
+from functools import partial
+from multiprocessing import Pool
+
+import mmcv
+import numpy as np
+
+from mmagic.evaluation.metrics import niqe
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description='Benchmark the loop and vectorized NIQE implementations')
+    parser.add_argument(
+        '--img',
+        default='tests/data/image/gt/baboon.png',
+        help='Image to evaluate')
+    parser.add_argument(
+        '--shape',
+        type=int,
+        nargs=2,
+        default=None,
+        help='Resize the image to (height, width) before evaluation')
+    parser.add_argument(
+        '--num-imgs',
+        type=int,
+        default=4,
+        help='Number of images evaluated with the process pool')
+    parser.add_argument(
+        '--nproc', type=int, default=4, help='Number of processes')
+    parser.add_argument(
+        '--repeat', type=int, default=3, help='Number of repeated runs')
+    args = parser.parse_args()
+    return args
+
+
+def timeit(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return result, times
+
+
+def main():
+    """
+    Example:
+
+    `python tools/analysis_tools/benchmark_niqe.py --shape 1080 1920 --nproc 4` # noqa
+    """
+    args = parse_args()
+
+    img = mmcv.imread(args.img)
+    if args.shape is not None:
+        img = mmcv.imresize(img, args.shape[::-1])
+
+    results = dict()
+    for vectorized in [False, True]:
+        name = 'vectorized' if vectorized else 'loop'
+        results[name], times = timeit(
+            lambda: niqe(img, crop_border=0, vectorized=vectorized),
+            args.repeat)
+        print(f'{name:>10}: niqe={float(results[name]):.6f}, '
+              f'time={np.mean(times):.3f}s (min {np.min(times):.3f}s)')
+    diff = abs(results['loop'] - results['vectorized'])
+    print(f'Absolute difference of NIQE: {diff:.3e}')
+
+    niqe_fn = partial(niqe, crop_border=0, vectorized=True)
+    imgs = [img] * args.num_imgs
+    _, times = timeit(lambda: [niqe_fn(i) for i in imgs], args.repeat)
+    print(f'{args.num_imgs} images with 1 process: '
+          f'time={np.mean(times):.3f}s')
+    with Pool(args.nproc) as pool:
+        _, times = timeit(lambda: pool.map(niqe_fn, imgs), args.repeat)
+    print(f'{args.num_imgs} images with {args.nproc} processes: '
+          f'time={np.mean(times):.3f}s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import argparse
+import multiprocessing as mp
+import resource
+import time
+from unittest.mock import patch
+
+import torch
+
+from mmagic.evaluation import PrecisionAndRecall
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description='Benchmark the k-NN backends of PrecisionAndRecall')
+    parser.add_argument(
+        '--num-samples',
+        type=int,
+        nargs='+',
+        default=[10000, 50000, 100000],
+        help='Number of real and fake samples')
+    parser.add_argument(
+        '--dim', type=int, default=4096, help='Dimension of the features')
+    parser.add_argument(
+        '--backends',
+        nargs='+',
+        default=['cdist', 'streaming'],
+        help='k-NN backends to benchmark')
+    parser.add_argument(
+        '--row-batch-size', type=int, default=10000, help='Row batch size')
+    parser.add_argument(
+        '--col-batch-size', type=int, default=10000, help='Col batch size')
+    parser.add_argument(
+        '--device',
+        default='cuda' if torch.cuda.is_available() else 'cpu',
+        help='Device to compute the distances')
+    args = parser.parse_args()
+    return args
+
+
+def run(backend, num_samples, args):
+    """Compute precision and recall in a fresh process so that the peak RSS
+    of each run is measured independently."""
+    with patch.object(
+            PrecisionAndRecall, '_load_vgg', return_value=(None, False)):
+        pr = PrecisionAndRecall(
+            num_samples,
+            collect_device=args.device,
+            row_batch_size=args.row_batch_size,
+            col_batch_size=args.col_batch_size,
+            knn_backend=backend)
+    generator = torch.Generator().manual_seed(0)
+    pr.results_real = torch.randn(
+        num_samples, args.dim, generator=generator).to(args.device)
+    fake_results = list(
+        torch.randn(num_samples, args.dim, generator=generator).split(1))
+
+    start = time.perf_counter()
+    result = pr.compute_metrics(fake_results)
+    if args.device.startswith('cuda'):
+        torch.cuda.synchronize()
+    elapsed = time.perf_counter() - start
+    # ru_maxrss is reported in kilobytes on Linux
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return result, elapsed, peak_rss
+
+
+def main():
+    """
+    Example:
+
+    `python tools/analysis_tools/benchmark_pr_knn.py --num-samples 10000 50000 --device cuda` # noqa
+    """
+    args = parse_args()
+
+    ctx = mp.get_context('spawn')
+    for num_samples in args.num_samples:
+        for backend in args.backends:
+            with ctx.Pool(1) as pool:
+                result, elapsed, peak_rss = pool.apply(run,
+                                                       (backend, num_samples,
+                                                        args))
+            print(f'num_samples={num_samples:>6}, backend={backend:>9}: '
+                  f'precision={result["precision"]:.4f}, '
+                  f'recall={result["recall"]:.4f}, time={elapsed:.2f}s, '
+                  f'peak RSS={peak_rss:.0f}MB')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import argparse
+import time
+
+import numpy as np
+
+from mmagic.datasets.transforms import RandomVideoCompression
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description='Benchmark the container and pooled paths of '
+        'RandomVideoCompression')
+    parser.add_argument(
+        '--shape',
+        type=int,
+        nargs=2,
+        default=[64, 64],
+        help='Shape (height, width) of the frames')
+    parser.add_argument(
+        '--num-frames', type=int, default=15, help='Number of frames per clip')
+    parser.add_argument(
+        '--num-clips', type=int, default=200, help='Number of clips')
+    parser.add_argument(
+        '--codec',
+        nargs='+',
+        default=['libx264', 'h264', 'mpeg4'],
+        help='Codecs to sample from')
+    parser.add_argument(
+        '--bitrate',
+        type=int,
+        nargs=2,
+        default=[10000, 100000],
+        help='Range of the bitrate')
+    args = parser.parse_args()
+    return args
+
+
+def main():
+    """
+    Example:
+
+    `python tools/analysis_tools/benchmark_video_compression.py --shape 64 64 --num-frames 15 --num-clips 200` # noqa
+    """
+    args = parse_args()
+
+    rng = np.random.default_rng(0)
+    clips = [[
+        rng.uniform(0, 255, (*args.shape, 3)).astype(np.float32)
+        for _ in range(args.num_frames)
+    ] for _ in range(8)]
+
+    for pooled in [False, True]:
+        transform = RandomVideoCompression(
+            params=dict(
+                codec=args.codec,
+                codec_prob=[1 / len(args.codec)] * len(args.codec),
+                bitrate=args.bitrate,
+                pooled=pooled),
+            keys=['lq'])
+        # warm up, which also creates the pooled decoders
+        transform(dict(lq=clips[0]))
+
+        start = time.perf_counter()
+        for idx in range(args.num_clips):
+            results = transform(dict(lq=clips[idx % len(clips)]))
+            assert len(results['lq']) == args.num_frames
+        elapsed = time.perf_counter() - start
+        name = 'pooled' if pooled else 'container'
+        print(f'{name:>9}: {args.num_clips / elapsed:.1f} clips/s '
+              f'({elapsed / args.num_clips * 1000:.2f}ms per clip)')
+
+
+if __name__ == '__main__':
+    main()
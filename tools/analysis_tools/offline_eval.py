@@ -0,0 +1,200 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import argparse
+import csv
+import inspect
+import json
+import os.path as osp
+from multiprocessing import Pool
+
+import mmcv
+import numpy as np
+import torch
+from mmengine import Config, mkdir_or_exist, scandir
+from mmengine.registry import init_default_scope
+
+from mmagic.registry import METRICS
+
+IMG_EXTENSIONS = ('.jpg', '.JPG', '.jpeg', '.JPEG', '.png', '.PNG', '.ppm',
+                  '.PPM', '.bmp', '.BMP', '.tif', '.TIF', '.tiff', '.TIFF')
+
+# metrics built in each worker process
+_metrics = None
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description='Evaluate sample-wise metrics on folders of predictions '
+        'and ground truth without model inference')
+    parser.add_argument('pred_dir', help='Folder of the predictions')
+    parser.add_argument('gt_dir', help='Folder of the ground truth')
+    parser.add_argument(
+        '--config',
+        help='Config file, the metrics of `test_evaluator` are evaluated')
+    parser.add_argument(
+        '--metrics',
+        nargs='+',
+        default=['PSNR', 'SSIM'],
+        help='Names of metrics with default arguments. Ignored if `--config` '
+        'is given')
+    parser.add_argument(
+        '--trimap-dir',
+        help='Folder of the trimaps. If given, predictions and ground truth '
+        'are regarded as alpha mattes for matting metrics')
+    parser.add_argument(
+        '--out-dir',
+        default='work_dirs/offline_eval',
+        help='Folder to save the per-image CSV and aggregated results')
+    parser.add_argument(
+        '--nproc', type=int, default=4, help='Number of worker processes')
+    args = parser.parse_args()
+    return args
+
+
+def get_metric_cfgs(args):
+    """Get configs of metrics from the config file or names."""
+    if args.config is None:
+        init_default_scope('mmagic')
+        metric_cfgs = []
+        for name in args.metrics:
+            cfg = dict(type=name)
+            # images are packed to 'CHW' as the outputs of model inference,
+            # while some metrics (e.g. NIQE) assume 'HWC' by default
+            params = inspect.signature(METRICS.get(name)).parameters
+            if 'input_order' in params:
+                cfg['input_order'] = 'CHW'
+            metric_cfgs.append(cfg)
+        return metric_cfgs
+
+    cfg = Config.fromfile(args.config)
+    evaluator = cfg.test_evaluator
+    if isinstance(evaluator, dict) and 'metrics' in evaluator:
+        evaluator = evaluator['metrics']
+    if isinstance(evaluator, dict):
+        evaluator = [evaluator]
+    return list(evaluator)
+
+
+def scan_pairs(pred_dir, gt_dir, trimap_dir=None):
+    """Pair files of the folders by relative path without extension."""
+
+    def scan(folder):
+        files = scandir(folder, suffix=IMG_EXTENSIONS, recursive=True)
+        return {osp.splitext(f)[0]: osp.join(folder, f) for f in files}
+
+    preds, gts = scan(pred_dir), scan(gt_dir)
+    trimaps = scan(trimap_dir) if trimap_dir is not None else None
+    pairs = []
+    for name in sorted(preds):
+        if name not in gts:
+            raise FileNotFoundError(
+                f'Cannot find the ground truth of \'{preds[name]}\' in '
+                f'\'{gt_dir}\'.')
+        trimap = None
+        if trimaps is not None:
+            if name not in trimaps:
+                raise FileNotFoundError(
+                    f'Cannot find the trimap of \'{preds[name]}\' in '
+                    f'\'{trimap_dir}\'.')
+            trimap = trimaps[name]
+        pairs.append((name, preds[name], gts[name], trimap))
+    return pairs
+
+
+def img_to_tensor(img):
+    """Convert an image with shape (H, W) or (H, W, C) to a 'CHW' tensor."""
+    if img.ndim == 2:
+        img = img[..., None]
+    return torch.from_numpy(np.ascontiguousarray(img.transpose(2, 0, 1)))
+
+
+def build_data_sample(pred_path, gt_path, trimap_path=None):
+    """Decode images and pack them in the same format as the outputs of
+    model inference."""
+    if trimap_path is not None:
+        pred_alpha = mmcv.imread(pred_path, flag='grayscale')
+        gt_alpha = mmcv.imread(gt_path, flag='grayscale')
+        trimap = mmcv.imread(trimap_path, flag='grayscale')
+        return dict(
+            ori_alpha=torch.from_numpy(gt_alpha)[None],
+            ori_trimap=torch.from_numpy(trimap)[None],
+            output=dict(pred_alpha=torch.from_numpy(pred_alpha)))
+
+    # images are in 'bgr' order and packed to 'CHW'
+    gt_img = img_to_tensor(mmcv.imread(gt_path, flag='unchanged'))
+    pred_img = img_to_tensor(mmcv.imread(pred_path, flag='unchanged'))
+    return dict(gt_img=gt_img, output=dict(pred_img=pred_img))
+
+
+def init_worker(metric_cfgs):
+    global _metrics
+    init_default_scope('mmagic')
+    _metrics = [METRICS.build(cfg) for cfg in metric_cfgs]
+
+
+def evaluate_pair(pair):
+    """Evaluate all metrics on one pair with
+    :meth:`BaseSampleWiseMetric.process` of each metric."""
+    name, pred_path, gt_path, trimap_path = pair
+    data_sample = build_data_sample(pred_path, gt_path, trimap_path)
+    results = []
+    for metric in _metrics:
+        metric.process([], [data_sample])
+        results.append(metric.results.pop())
+    return name, results
+
+
+def get_column(metric, key):
+    return f'{metric.prefix}/{key}' if metric.prefix else key
+
+
+def main():
+    """
+    Example:
+
+    `python tools/analysis_tools/offline_eval.py work_dirs/pred data/Set5/GTmod12 --config configs/srcnn/srcnn_x4k915_1xb16-1000k_div2k.py --nproc 8` # noqa
+    """
+    args = parse_args()
+
+    metric_cfgs = get_metric_cfgs(args)
+    pairs = scan_pairs(args.pred_dir, args.gt_dir, args.trimap_dir)
+    print(f'Evaluate {len(pairs)} images with {len(metric_cfgs)} metrics.')
+
+    init_worker(metric_cfgs)
+    with Pool(args.nproc, init_worker, (metric_cfgs, )) as pool:
+        outputs = list(
+            pool.imap(
+                evaluate_pair,
+                pairs,
+                chunksize=max(len(pairs) // (args.nproc * 4), 1)))
+
+    mkdir_or_exist(args.out_dir)
+    columns = ['name']
+    for metric, result in zip(_metrics, outputs[0][1] if outputs else []):
+        columns += [get_column(metric, key) for key in result]
+    csv_path = osp.join(args.out_dir, 'per_image.csv')
+    with open(csv_path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        for name, results in outputs:
+            row = [name]
+            for result in results:
+                row += [float(v) for v in result.values()]
+            writer.writerow(row)
+
+    summary = dict()
+    for idx, metric in enumerate(_metrics):
+        metric_results = [results[idx] for _, results in outputs]
+        for key, value in metric.compute_metrics(metric_results).items():
+            summary[get_column(metric, key)] = float(value)
+    json_path = osp.join(args.out_dir, 'results.json')
+    with open(json_path, 'w') as f:
+        json.dump(summary, f, indent=4)
+
+    for key, value in summary.items():
+        print(f'{key}: {value:.4f}')
+    print(f'Per-image results are saved to {csv_path}, aggregated results '
+          f'are saved to {json_path}.')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import argparse
+import os.path as osp
+from multiprocessing import Pool
+
+import mmcv
+import mmengine
+import numpy as np
+
+IMG_EXTENSIONS = ('.jpg', '.JPG', '.jpeg', '.JPEG', '.png', '.PNG', '.ppm',
+                  '.PPM', '.bmp', '.BMP', '.tif', '.TIF', '.tiff', '.TIFF')
+
+
+def convert(src_path, dst_path):
+    """Decode an image and save it as an uncompressed '.npy' file in 'bgr'
+    order, which can be memory-mapped by ``LoadImageFromFile(lazy=True)``."""
+    img = mmcv.imread(src_path, flag='unchanged')
+    np.save(dst_path, np.ascontiguousarray(img))
+
+
+def main():
+    """Convert images in a folder to '.npy' files for lazy region-of-interest
+    loading.
+
+    Usage:
+        python tools/dataset_converters/npy/convert_images_to_npy.py \
+            data/DIV2K/DIV2K_train_HR_sub data/DIV2K/DIV2K_train_HR_sub_npy
+
+    Then set ``img_suffix='.npy'`` for the dataset (or replace the suffix in
+    the annotation file) and ``lazy=True`` for ``LoadImageFromFile``.
+    """
+    parser = argparse.ArgumentParser(
+        description='Convert images to .npy files for lazy loading')
+    parser.add_argument('input_folder', help='Folder of the images')
+    parser.add_argument('output_folder', help='Folder to save .npy files')
+    parser.add_argument(
+        '--n-thread', type=int, default=8, help='Number of processes')
+    args = parser.parse_args()
+
+    files = list(
+        mmengine.scandir(
+            args.input_folder, suffix=IMG_EXTENSIONS, recursive=True))
+    prog_bar = mmengine.ProgressBar(len(files))
+    pool = Pool(args.n_thread)
+    for filename in files:
+        dst_path = osp.join(args.output_folder,
+                            osp.splitext(filename)[0] + '.npy')
+        mmengine.mkdir_or_exist(osp.dirname(dst_path))
+        pool.apply_async(
+            convert, (osp.join(args.input_folder, filename), dst_path),
+            callback=lambda _: prog_bar.update())
+    pool.close()
+    pool.join()
+    print('All processes done.')
+
+
+if __name__ == '__main__':
+    main()
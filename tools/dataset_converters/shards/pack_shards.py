@@ -0,0 +1,52 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import argparse
+import os.path as osp
+
+import mmengine
+
+from mmagic.datasets import write_shards
+
+
+def main():
+    """Pack a dataset folder into large sequential shards with an offset
+    index, which are read by ``ShardBackend``.
+
+    Usage:
+        python tools/dataset_converters/shards/pack_shards.py \
+            data/REDS data/REDS_shards --shard-size 1024
+
+    Files are packed in sorted order, so frames of a clip are adjacent in the
+    shards. Then set ``data_root='data/REDS_shards'`` and
+    ``backend_args=dict(backend='shard', shard_dir='data/REDS_shards')`` for
+    the dataset and the loading transforms. Annotation files in the folder
+    are packed as well. ``ShardShuffleSampler`` is suggested for training.
+    """
+    parser = argparse.ArgumentParser(
+        description='Pack a dataset folder into sequential shards')
+    parser.add_argument('input_folder', help='Folder of the dataset')
+    parser.add_argument(
+        'output_folder', help='Folder to save the shards and the index')
+    parser.add_argument(
+        '--shard-size',
+        type=int,
+        default=1024,
+        help='Size of each shard in MB')
+    parser.add_argument(
+        '--suffix',
+        nargs='+',
+        default=None,
+        help='Suffixes of files to pack. All files are packed by default')
+    args = parser.parse_args()
+
+    assert osp.abspath(args.output_folder) != osp.abspath(args.input_folder), (
+        'The output folder must be different from the input folder.')
+    suffix = tuple(args.suffix) if args.suffix is not None else None
+    files = sorted(
+        mmengine.scandir(args.input_folder, suffix=suffix, recursive=True))
+    shards = write_shards(args.input_folder, files, args.output_folder,
+                          args.shard_size * 1024**2)
+    print(f'Pack {len(files)} files into {len(shards)} shards.')
+
+
+if __name__ == '__main__':
+    main()